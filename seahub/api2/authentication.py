@@ -4,16 +4,11 @@ from rest_framework import status
 from rest_framework.authentication import BaseAuthentication
 from rest_framework.exceptions import APIException
 
-import seaserv
 from seahub.base.accounts import User
 from seahub.constants import GUEST_USER
 from seahub.api2.models import Token, TokenV2
 from seahub.api2.utils import get_client_ip
 from seahub.utils import within_time_range
-try:
-    from seahub.settings import MULTI_TENANCY
-except ImportError:
-    MULTI_TENANCY = False
 
 logger = logging.getLogger(__name__)
 
@@ -84,11 +79,6 @@ class TokenAuthentication(BaseAuthentication):
         except User.DoesNotExist:
             raise AuthenticationFailed('User inactive or deleted')
 
-        if MULTI_TENANCY:
-            orgs = seaserv.get_orgs_by_user(token.user)
-            if orgs:
-                user.org = orgs[0]
-
         self._populate_user_permissions(user)
 
         if user.is_active:
@@ -105,11 +95,6 @@ class TokenAuthentication(BaseAuthentication):
         except User.DoesNotExist:
             raise AuthenticationFailed('User inactive or deleted')
 
-        if MULTI_TENANCY:
-            orgs = seaserv.get_orgs_by_user(token.user)
-            if orgs:
-                user.org = orgs[0]
-
         self._populate_user_permissions(user)
 
         if user.is_active:
@@ -20,6 +20,9 @@ from seahub.api2.status import HTTP_520_OPERATION_FAILED
 from seahub.base.accounts import User
 from seahub.profile.models import Profile
 from seahub.utils import is_valid_username
+from seahub.utils.autocomplete import get_group_scope, \
+    invalidate_autocomplete_index
+from seahub.utils.quota import clear_user_quota_usage_cache
 from seahub.views import get_owned_repo_list
 
 logger = logging.getLogger(__name__)
@@ -89,6 +92,8 @@ class Account(APIView):
         if sharing is not None:
             seafile_api.set_user_share_quota(email, int(sharing))
 
+        clear_user_quota_usage_cache(email)
+
     def _create_account(self, request, email):
         copy = request.DATA.copy()
         copy['email'] = email
@@ -201,6 +206,7 @@ class Account(APIView):
                     # add new user to the group on behalf of the group creator
                     ccnet_threaded_rpc.group_add_member(g.id, g.creator_name,
                                                         to_user)
+                    invalidate_autocomplete_index(get_group_scope(g.id))
 
                 if from_user == g.creator_name:
                     ccnet_threaded_rpc.set_group_creator(g.id, to_user)
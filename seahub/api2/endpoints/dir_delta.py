@@ -0,0 +1,96 @@
+import json
+import logging
+
+from django.http import HttpResponse
+from rest_framework import status
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.throttling import UserRateThrottle
+from rest_framework.views import APIView
+from seaserv import seafile_api
+from pysearpc import SearpcError
+
+from seahub.api2.authentication import TokenAuthentication
+from seahub.api2.utils import api_error, get_file_size
+from seahub.settings import ENABLE_FOLDER_PERM
+from seahub.utils.dir_objects import get_dir_object_delta
+from seahub.views import check_folder_permission, \
+    check_folder_children_permission
+
+logger = logging.getLogger(__name__)
+json_content_type = 'application/json; charset=utf-8'
+
+class DirDeltaEndpoint(APIView):
+    """Get changes of a folder since the folder object ``oid`` a client got
+    last time.
+    """
+    authentication_classes = (TokenAuthentication, SessionAuthentication)
+    permission_classes = (IsAuthenticated, )
+    throttle_classes = (UserRateThrottle, )
+
+    def get(self, request, repo_id, format=None):
+        repo = seafile_api.get_repo(repo_id)
+        if not repo:
+            return api_error(status.HTTP_404_NOT_FOUND, 'Library not found.')
+
+        path = request.GET.get('p', '/')
+        if path[-1] != '/':
+            path = path + '/'
+
+        old_oid = request.GET.get('oid', None)
+        if not old_oid:
+            return api_error(status.HTTP_400_BAD_REQUEST, 'Argument missing.')
+
+        dir_perm = check_folder_permission(request, repo_id, path)
+        if dir_perm is None:
+            return api_error(status.HTTP_403_FORBIDDEN,
+                             'Forbid to access this folder.')
+
+        dir_id = seafile_api.get_dir_id_by_path(repo_id, path.encode('utf-8'))
+        if not dir_id:
+            return api_error(status.HTTP_404_NOT_FOUND, 'Folder not found.')
+
+        added, removed, modified = [], [], []
+        if old_oid != dir_id:
+            try:
+                added, removed, modified = get_dir_object_delta(repo, old_oid,
+                                                                dir_id)
+            except SearpcError as e:
+                # old folder object may be removed by GC, client should get
+                # the whole folder instead
+                logger.error(e)
+                return api_error(status.HTTP_404_NOT_FOUND,
+                                 'Old folder object not found.')
+
+        changed = added + modified
+        if ENABLE_FOLDER_PERM:
+            perms = check_folder_children_permission(request, repo_id, path,
+                    [e.obj_name for e in changed])
+        else:
+            perms = {}
+
+        def to_dict(e):
+            entry = {
+                'type': 'dir' if e.is_dir() else 'file',
+                'name': e.obj_name,
+                'id': e.obj_id,
+                'mtime': e.mtime,
+                'permission': perms.get(e.obj_name, dir_perm),
+            }
+            if not e.is_dir():
+                if repo.version == 0:
+                    entry['size'] = get_file_size(repo.store_id, repo.version,
+                                                  e.obj_id)
+                else:
+                    entry['size'] = e.size
+            return entry
+
+        response = HttpResponse(json.dumps({
+            'oid': dir_id,
+            'added': [to_dict(e) for e in added],
+            'removed': removed,
+            'modified': [to_dict(e) for e in modified],
+        }), status=200, content_type=json_content_type)
+        response['oid'] = dir_id
+        response['dir_perm'] = dir_perm
+        return response
@@ -0,0 +1,135 @@
+import json
+import posixpath
+
+from django.http import HttpResponse
+from rest_framework import status
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.throttling import UserRateThrottle
+from rest_framework.views import APIView
+from seaserv import seafile_api
+
+from seahub.api2.authentication import TokenAuthentication
+from seahub.api2.utils import api_error
+from seahub.base.models import DirentsJob
+from seahub.utils.dirents_job import submit_dirents_job
+from seahub.views import del_dirents, check_folder_permission, \
+    check_folder_children_permission
+
+
+json_content_type = 'application/json; charset=utf-8'
+
+class DirentsBatchDeleteEndpoint(APIView):
+    """Delete multiple files/folders in a folder in one commit.
+    """
+    authentication_classes = (TokenAuthentication, SessionAuthentication)
+    permission_classes = (IsAuthenticated, )
+    throttle_classes = (UserRateThrottle, )
+
+    def post(self, request, repo_id, format=None):
+        repo = seafile_api.get_repo(repo_id)
+        if not repo:
+            return api_error(status.HTTP_404_NOT_FOUND, 'Library not found.')
+
+        parent_dir = request.GET.get('p', None)
+        dirents_names = request.DATA.getlist('dirents_names')
+        if not parent_dir or not dirents_names:
+            return api_error(status.HTTP_400_BAD_REQUEST, 'Argument missing.')
+
+        if seafile_api.get_dir_id_by_path(repo.id, parent_dir) is None:
+            return api_error(status.HTTP_404_NOT_FOUND, 'Folder not found.')
+
+        deleted, undeleted = del_dirents(request, repo.id, parent_dir,
+                                         dirents_names)
+        return HttpResponse(json.dumps({
+            'deleted': deleted,
+            'undeleted': undeleted,
+        }), status=200, content_type=json_content_type)
+
+class DirentsJobsEndpoint(APIView):
+    """Copy/move multiple files/folders in a folder in background.
+    """
+    authentication_classes = (TokenAuthentication, SessionAuthentication)
+    permission_classes = (IsAuthenticated, )
+    throttle_classes = (UserRateThrottle, )
+
+    def post(self, request, format=None):
+        op = request.DATA.get('op', None)
+        src_repo_id = request.DATA.get('src_repo', None)
+        src_dir = request.DATA.get('src_dir', None)
+        dst_repo_id = request.DATA.get('dst_repo', None)
+        dst_dir = request.DATA.get('dst_dir', None)
+        dirents_names = request.DATA.getlist('dirents_names')
+        if not (src_repo_id and src_dir and dst_repo_id and dst_dir and
+                dirents_names):
+            return api_error(status.HTTP_400_BAD_REQUEST, 'Argument missing.')
+
+        if op not in (DirentsJob.OP_COPY, DirentsJob.OP_MOVE):
+            return api_error(status.HTTP_400_BAD_REQUEST,
+                             "op should be 'cp' or 'mv'.")
+
+        if src_repo_id == dst_repo_id and src_dir == dst_dir:
+            return api_error(status.HTTP_400_BAD_REQUEST,
+                             'The destination directory is the same as the source.')
+
+        for obj_name in dirents_names:
+            if src_repo_id == dst_repo_id and \
+                    dst_dir.startswith(posixpath.join(src_dir, obj_name) + '/'):
+                return api_error(status.HTTP_400_BAD_REQUEST,
+                                 'Can not copy/move directory to its subdirectory.')
+
+        if not seafile_api.get_repo(src_repo_id) or \
+                not seafile_api.get_repo(dst_repo_id):
+            return api_error(status.HTTP_404_NOT_FOUND, 'Library not found.')
+
+        if seafile_api.get_dir_id_by_path(src_repo_id, src_dir) is None or \
+                seafile_api.get_dir_id_by_path(dst_repo_id, dst_dir) is None:
+            return api_error(status.HTTP_404_NOT_FOUND, 'Folder not found.')
+
+        if check_folder_permission(request, dst_repo_id, dst_dir) != 'rw':
+            return api_error(status.HTTP_403_FORBIDDEN,
+                             'You do not have permission to access destination folder.')
+
+        failed = []
+        if op == DirentsJob.OP_MOVE:
+            perms = check_folder_children_permission(request, src_repo_id,
+                                                     src_dir, dirents_names)
+            failed = [x for x in dirents_names if perms[x] != 'rw']
+            dirents_names = [x for x in dirents_names if perms[x] == 'rw']
+        elif check_folder_permission(request, src_repo_id, src_dir) is None:
+            return api_error(status.HTTP_403_FORBIDDEN,
+                             'You do not have permission to access source folder.')
+
+        job = submit_dirents_job(request.user.username, op, src_repo_id,
+                                 src_dir, dst_repo_id, dst_dir,
+                                 dirents_names, failed)
+        if job is None:
+            return api_error(status.HTTP_429_TOO_MANY_REQUESTS,
+                             'Another copy/move job is running.')
+
+        return HttpResponse(json.dumps(job.to_dict()), status=200,
+                            content_type=json_content_type)
+
+class DirentsJobEndpoint(APIView):
+    """Get aggregated progress of a copy/move job, or cancel it.
+    """
+    authentication_classes = (TokenAuthentication, SessionAuthentication)
+    permission_classes = (IsAuthenticated, )
+    throttle_classes = (UserRateThrottle, )
+
+    def get(self, request, job_id, format=None):
+        job = DirentsJob.objects.get_user_job(request.user.username, job_id)
+        if job is None:
+            return api_error(status.HTTP_404_NOT_FOUND, 'Job not found.')
+
+        return HttpResponse(json.dumps(job.to_dict()), status=200,
+                            content_type=json_content_type)
+
+    def delete(self, request, job_id, format=None):
+        if not DirentsJob.objects.cancel_user_job(request.user.username,
+                                                  job_id):
+            return api_error(status.HTTP_400_BAD_REQUEST,
+                             'Job not found or already done.')
+
+        return HttpResponse(json.dumps({'success': True}), status=200,
+                            content_type=json_content_type)
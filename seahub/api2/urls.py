@@ -4,7 +4,10 @@ from .views import *
 from .views_misc import ServerInfoView
 from .views_auth import LogoutDeviceView, ClientLoginTokenView
 from .endpoints.dir_shared_items import DirSharedItemsEndpoint
+from .endpoints.dir_delta import DirDeltaEndpoint
 from .endpoints.account import Account
+from .endpoints.dirents import DirentsBatchDeleteEndpoint, \
+    DirentsJobsEndpoint, DirentsJobEndpoint
 
 urlpatterns = patterns('',
     url(r'^ping/$', Ping.as_view()),
@@ -44,7 +47,11 @@ urlpatterns = patterns('',
     url(r'^repos/(?P<repo_id>[-0-9-a-f]{36})/dir/share/$', DirShareView.as_view()),
     url(r'^repos/(?P<repo_id>[-0-9-a-f]{36})/dir/shared_items/$', DirSharedItemsEndpoint.as_view(), name="api2-dir-shared-items"),
     url(r'^repos/(?P<repo_id>[-0-9-a-f]{36})/dir/download/$', DirDownloadView.as_view()),
+    url(r'^repos/(?P<repo_id>[-0-9-a-f]{36})/dir/delta/$', DirDeltaEndpoint.as_view(), name="api2-dir-delta"),
+    url(r'^repos/(?P<repo_id>[-0-9-a-f]{36})/fileops/batch-delete/$', DirentsBatchDeleteEndpoint.as_view(), name="api2-dirents-batch-delete"),
     url(r'^repos/(?P<repo_id>[-0-9-a-f]{36})/thumbnail/$', ThumbnailView.as_view(), name='api2-thumbnail'),
+    url(r'^dirents-jobs/$', DirentsJobsEndpoint.as_view(), name="api2-dirents-jobs"),
+    url(r'^dirents-jobs/(?P<job_id>\d+)/$', DirentsJobEndpoint.as_view(), name="api2-dirents-job"),
     url(r'^starredfiles/', StarredFileView.as_view(), name='starredfiles'),
     url(r'^shared-repos/$', SharedRepos.as_view(), name='sharedrepos'),
     url(r'^shared-repos/(?P<repo_id>[-0-9-a-f]{36})/$', SharedRepo.as_view(), name='sharedrepo'),
@@ -67,6 +74,7 @@ urlpatterns = patterns('',
     url(r'^events/$', EventsView.as_view()),
     url(r'^repo_history_changes/(?P<repo_id>[-0-9a-f]{36})/$', RepoHistoryChange.as_view()),
     url(r'^unseen_messages/$', UnseenMessagesCountView.as_view()),
+    url(r'^notices/seen/$', NoticesSeenView.as_view(), name='api2-notices-seen'),
     url(r'^group/msgs/(?P<group_id>\d+)/$', GroupMsgsView.as_view()),
     url(r'^group/(?P<group_id>\d+)/msg/(?P<msg_id>\d+)/$', GroupMsgView.as_view()),
     url(r'^user/msgs/(?P<id_or_email>[^/]+)/$', UserMsgsView.as_view()),
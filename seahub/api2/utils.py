@@ -15,8 +15,7 @@ from django.http import HttpResponse
 from rest_framework.response import Response
 from rest_framework import status, serializers
 from seaserv import seafile_api, get_commits, server_repo_size, \
-    get_personal_groups_by_user, is_group_user, get_group, seafserv_threaded_rpc
-from pysearpc import SearpcError
+    get_personal_groups_by_user, is_group_user, get_group
 
 from seahub.base.accounts import User
 from seahub.base.templatetags.seahub_tags import email2nickname, \
@@ -25,10 +24,12 @@ from seahub.contacts.models import Contact
 from seahub.group.models import GroupMessage, MessageReply, \
     MessageAttachment, PublicGroup
 from seahub.group.views import is_group_staff
+from seahub.group.utils import fill_group_msgs_replies, \
+    prepare_msg_attachment, gen_msg_attachment_img_url
 from seahub.message.models import UserMessage, UserMsgAttachment
 from seahub.notifications.models import UserNotification
-from seahub.utils import api_convert_desc_link, get_file_type_and_ext, \
-    gen_file_get_url
+from seahub.utils import api_convert_desc_link
+from seahub.utils.commit_diff import get_commit_diff
 from seahub.utils.paginator import Paginator
 from seahub.utils.file_types import IMAGE
 from seahub.api2.models import Token, TokenV2, DESKTOP_PLATFORMS
@@ -82,12 +83,8 @@ def prepare_starred_files(files):
                  'dir' : f.is_dir
                  }
         if not f.is_dir:
-            try:
-                file_id = seafile_api.get_file_id_by_path(f.repo.id, f.path)
-                sfile['oid'] = file_id
-                sfile['size'] = get_file_size(f.repo.store_id, f.repo.version, file_id)
-            except SearpcError, e:
-                pass
+            sfile['oid'] = f.file_id
+            sfile['size'] = f.size
 
         array.append(sfile)
 
@@ -258,50 +255,25 @@ def get_group_msgs(groupid, page, username):
     # Force evaluate queryset to fix some database error for mysql.
     group_msgs.object_list = list(group_msgs.object_list)
 
-    attachments = MessageAttachment.objects.filter(group_message__in=group_msgs.object_list)
-
-    msg_replies = MessageReply.objects.filter(reply_to__in=group_msgs.object_list)
-    reply_to_list = [ r.reply_to_id for r in msg_replies ]
+    fill_group_msgs_replies(group_msgs.object_list)
 
+    attachments = MessageAttachment.objects.get_attachments_by_msgs(
+        [msg.id for msg in group_msgs.object_list])
     for msg in group_msgs.object_list:
-        msg.reply_cnt = reply_to_list.count(msg.id)
-        msg.replies = []
-        for r in msg_replies:
-            if msg.id == r.reply_to_id:
-                msg.replies.append(r)
-        msg.replies = msg.replies[-3:]
+        # only the last attachment is shown
+        atts = [att for att in attachments.get(msg.id, [])
+                if prepare_msg_attachment(att)]
+        if not atts:
+            continue
 
-        for att in attachments:
-            if att.group_message_id != msg.id:
-                continue
+        att = atts[-1]
+        # Load to discuss page if attachment is a image and from recommend.
+        if getattr(att, 'filetype', None) == IMAGE:
+            att.img_url = gen_msg_attachment_img_url(att, username)
+            if not att.img_url:
+                att.err = 'File does not exist'
 
-            # Attachment name is file name or directory name.
-            # If is top directory, use repo name instead.
-            path = att.path
-            if path == '/':
-                repo = seafile_api.get_repo(att.repo_id)
-                if not repo:
-                    # TODO: what should we do here, tell user the repo
-                    # is no longer exists?
-                    continue
-                att.name = repo.name
-            else:
-                path = path.rstrip('/') # cut out last '/' if possible
-                att.name = os.path.basename(path)
-
-            # Load to discuss page if attachment is a image and from recommend.
-            if att.attach_type == 'file' and att.src == 'recommend':
-                att.filetype, att.fileext = get_file_type_and_ext(att.name)
-                if att.filetype == IMAGE:
-                    att.obj_id = seafile_api.get_file_id_by_path(att.repo_id, path)
-                    if not att.obj_id:
-                        att.err = 'File does not exist'
-                    else:
-                        att.token = seafile_api.get_fileserver_access_token(
-                            att.repo_id, att.obj_id, 'view', username)
-                        att.img_url = gen_file_get_url(att.token, att.name)
-
-            msg.attachment = att
+        msg.attachment = att
 
     return group_msgs
 
@@ -485,23 +457,19 @@ def get_client_ip(request):
 def get_diff_details(repo_id, commit1, commit2):
     result = defaultdict(list)
 
-    diff_result = seafserv_threaded_rpc.get_diff(repo_id, commit1, commit2)
-    if not diff_result:
-        return result
-
-    for d in diff_result:
-        if d.status == 'add':
-            result['added_files'].append(d.name)
-        elif d.status == 'del':
-            result['deleted_files'].append(d.name)
-        elif d.status == 'mov':
-            result['renamed_files'].extend((d.name, d.new_name))
-        elif d.status == 'mod':
-            result['modified_files'].append(d.name)
-        elif d.status == 'newdir':
-            result['added_dirs'].append(d.name)
-        elif d.status == 'deldir':
-            result['deleted_dirs'].append(d.name)
+    for status, name, new_name in get_commit_diff(repo_id, commit1, commit2):
+        if status == 'add':
+            result['added_files'].append(name)
+        elif status == 'del':
+            result['deleted_files'].append(name)
+        elif status == 'mov':
+            result['renamed_files'].extend((name, new_name))
+        elif status == 'mod':
+            result['modified_files'].append(name)
+        elif status == 'newdir':
+            result['added_dirs'].append(name)
+        elif status == 'deldir':
+            result['deleted_dirs'].append(name)
 
     return result
 
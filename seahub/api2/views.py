@@ -6,6 +6,7 @@ import json
 import datetime
 import posixpath
 import re
+import itertools
 from dateutil.relativedelta import relativedelta
 from urllib2 import unquote, quote
 
@@ -38,10 +39,13 @@ from .utils import is_repo_writable, is_repo_accessible, \
     get_groups, get_group_and_contacts, prepare_events, \
     get_person_msgs, api_group_check, get_email, get_timestamp, \
     get_group_message_json, get_group_msgs, get_group_msgs_json, get_diff_details, \
-    json_response, to_python_boolean, is_seafile_pro
+    json_response, to_python_boolean, is_seafile_pro, get_client_ip
 from seahub.avatar.templatetags.avatar_tags import api_avatar_url, avatar
 from seahub.avatar.templatetags.group_avatar_tags import api_grp_avatar_url, \
         grp_avatar
+from seahub.auth.utils import get_login_failed_attempts, \
+    get_pair_login_failed_attempts, incr_login_failed_attempts, \
+    clear_login_failed_attempts
 from seahub.base.accounts import User
 from seahub.base.models import FileDiscuss, UserStarredFiles, DeviceToken
 from seahub.base.templatetags.seahub_tags import email2nickname, \
@@ -66,15 +70,23 @@ from seahub.share.models import PrivateFileDirShare, FileShare, OrgFileShare, \
 from seahub.share.signals import share_repo_to_user_successful
 from seahub.share.views import list_shared_repos
 from seahub.utils import gen_file_get_url, gen_token, gen_file_upload_url, \
-    check_filename_with_rename, is_valid_username, EVENTS_ENABLED, \
-    get_user_events, EMPTY_SHA1, get_ccnet_server_addr_port, is_pro_version, \
+    check_filename_with_rename, FilenameAllocator, is_valid_username, \
+    EVENTS_ENABLED, get_user_events, EMPTY_SHA1, get_ccnet_server_addr_port, \
+    is_pro_version, \
     gen_block_get_url, get_file_type_and_ext, HAS_FILE_SEARCH, \
     gen_file_share_link, gen_dir_share_link, is_org_context, gen_shared_link, \
     get_org_user_events, calculate_repos_last_modify, send_perm_audit_msg, \
     gen_shared_upload_link, convert_cmmt_desc_link
+from seahub.utils.file_revisions import get_file_revisions, \
+    get_file_revisions_page
+from seahub.utils.perm import get_perm_resolver
 from seahub.utils.repo import get_sub_repo_abbrev_origin_path
 from seahub.utils.star import star_file, unstar_file
 from seahub.utils.file_types import IMAGE, DOCUMENT
+from seahub.utils.autocomplete import get_autocomplete_index, get_org_scope, \
+    get_group_scope, invalidate_autocomplete_index
+from seahub.utils.dir_objects import list_dir_object
+from seahub.utils.json_stream import json_stream_response, wants_ndjson
 from seahub.utils.timeutils import utc_to_local
 from seahub.views import validate_owner, is_registered_user, check_file_lock, \
     group_events_data, get_diff, create_default_library, get_owned_repo_list, \
@@ -122,6 +134,18 @@ from constance import config
 logger = logging.getLogger(__name__)
 json_content_type = 'application/json; charset=utf-8'
 
+# max number of entries returned when listing dirs recursively
+API_RECURSIVE_DIR_MAX_ENTRIES = getattr(settings,
+        'API_RECURSIVE_DIR_MAX_ENTRIES', 10000)
+
+# failed login attempts (of both web and api) of a username from an ip after
+# which token login is refused, clients can not show a captcha like web login
+# does
+API_LOGIN_ATTEMPT_LIMIT = getattr(settings, 'API_LOGIN_ATTEMPT_LIMIT', 10)
+# failed login attempts of any usernames from an ip after which token login
+# from the ip is refused, higher since users may share an ip
+API_LOGIN_IP_ATTEMPT_LIMIT = getattr(settings, 'API_LOGIN_IP_ATTEMPT_LIMIT', 50)
+
 # Define custom HTTP status code. 4xx starts from 440, 5xx starts from 520.
 HTTP_440_REPO_PASSWD_REQUIRED = 440
 HTTP_441_REPO_PASSWD_MAGIC_REQUIRED = 441
@@ -179,12 +203,24 @@ class ObtainAuthToken(APIView):
     renderer_classes = (renderers.JSONRenderer,)
 
     def post(self, request):
+        login_id = request.DATA.get('username', '')
+        ip = get_client_ip(request)
+        # only block the username from this ip, failures from other ips
+        # (e.g. of someone else guessing the password) don't lock user out
+        if get_pair_login_failed_attempts(login_id, ip) >= \
+           API_LOGIN_ATTEMPT_LIMIT or \
+           get_login_failed_attempts(ip=ip) >= API_LOGIN_IP_ATTEMPT_LIMIT:
+            return api_error(status.HTTP_429_TOO_MANY_REQUESTS,
+                             'Too many failed login attempts.')
+
         context = { 'request': request }
         serializer = AuthTokenSerializer(data=request.DATA, context=context)
         if serializer.is_valid():
             key = serializer.object
+            clear_login_failed_attempts(login_id, ip)
             return Response({'token': key})
 
+        incr_login_failed_attempts(username=login_id, ip=ip)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 ########## Accounts
@@ -302,13 +338,17 @@ class SearchUser(APIView):
         if request.cloud_mode:
             if is_org_context(request):
                 url_prefix = request.user.org.url_prefix
-                users = seaserv.get_org_users_by_url_prefix(url_prefix, -1, -1)
 
-                searched_users = filter(lambda u: q in u.email, users)
-                # 'user__in' for only get profile of user in org
-                # 'nickname__contains' for search by nickname
-                searched_profiles = Profile.objects.filter(Q(user__in=[u.email for u in users]) & \
-                                                           Q(nickname__contains=q)).values('user')
+                # search by email and nickname in the cached index of active
+                # org users, which are only got when it is not cached
+                index = get_autocomplete_index(
+                    get_org_scope(request.user.org.org_id),
+                    lambda: [u.email for u in
+                             seaserv.get_org_users_by_url_prefix(url_prefix, -1, -1)
+                             if u.is_active])
+                for email, nickname in index.search(q, 10, exclude=username,
+                                                    contains=True):
+                    search_result.append(email)
             elif ENABLE_GLOBAL_ADDRESSBOOK:
                 searched_users = get_searched_users(q)
                 searched_profiles = Profile.objects.filter(nickname__contains=q).values('user')
@@ -502,10 +542,37 @@ class Repos(APIView):
         if not UserOptions.objects.is_sub_lib_enabled(email):
             filter_by['sub'] = False
 
-        repos_json = []
+        # list repos first, and build entries of them while streaming
+        owned_repos, sub_repos, shared_repos = [], [], []
+        group_repos, public_repos = [], []
         if filter_by['mine']:
             owned_repos = get_owned_repo_list(request)
-            owned_repos.sort(lambda x, y: cmp(y.last_modify, x.last_modify))
+            owned_repos.sort(key=lambda r: r.last_modify, reverse=True)
+
+        if filter_by['sub']:
+            sub_repos = get_virtual_repos_by_owner(request)
+            sub_repos.sort(key=lambda r: r.last_modify, reverse=True)
+
+        if filter_by['shared']:
+            shared_repos = get_share_in_repo_list(request, -1, -1)
+            shared_repos.sort(key=lambda r: r.last_modify, reverse=True)
+
+        if filter_by['group']:
+            groups = get_groups_by_user(request)
+            group_repos = get_group_repos(request, groups)
+            group_repos.sort(key=lambda r: r.last_modify, reverse=True)
+
+        if filter_by['org'] and request.user.permissions.can_view_org():
+            public_repos = list_inner_pub_repos(request)
+
+        # RPCs are done before the response starts, only encoding is streamed
+        for r in shared_repos:
+            r.password_need = is_passwd_set(r.repo_id, email)
+            r.owner_nickname = email2nickname(r.user)
+        group_repo_perms = dict([(r.id, check_permission(r.id, email))
+                                 for r in group_repos])
+
+        def iter_repos():
             for r in owned_repos:
                 # do not return virtual repos
                 if r.is_virtual:
@@ -530,19 +597,12 @@ class Repos(APIView):
                     repo["enc_version"] = r.enc_version
                     repo["magic"] = r.magic
                     repo["random_key"] = r.random_key
-                repos_json.append(repo)
-
-        if filter_by['sub']:
-            # compose abbrev origin path for display
-            sub_repos = []
-            sub_repos = get_virtual_repos_by_owner(request)
-            for repo in sub_repos:
-                repo.abbrev_origin_path = get_sub_repo_abbrev_origin_path(
-                    repo.origin_repo_name, repo.origin_path)
+                yield repo
 
-            sub_repos.sort(lambda x, y: cmp(y.last_modify, x.last_modify))
             for r in sub_repos:
-                # print r._dict
+                # compose abbrev origin path for display
+                r.abbrev_origin_path = get_sub_repo_abbrev_origin_path(
+                    r.origin_repo_name, r.origin_path)
                 repo = {
                     "type": "repo",
                     "id": r.id,
@@ -564,19 +624,15 @@ class Repos(APIView):
                     repo["enc_version"] = r.enc_version
                     repo["magic"] = r.magic
                     repo["random_key"] = r.random_key
-                repos_json.append(repo)
+                yield repo
 
-        if filter_by['shared']:
-            shared_repos = get_share_in_repo_list(request, -1, -1)
-            shared_repos.sort(lambda x, y: cmp(y.last_modify, x.last_modify))
             for r in shared_repos:
-                r.password_need = is_passwd_set(r.repo_id, email)
                 repo = {
                     "type": "srepo",
                     "id": r.repo_id,
                     "owner": r.user,
                     "name": r.repo_name,
-                    "owner_nickname": email2nickname(r.user),
+                    "owner_nickname": r.owner_nickname,
                     "desc": r.repo_desc,
                     "mtime": r.last_modify,
                     "mtime_relative": translate_seahub_time(r.last_modify),
@@ -591,12 +647,8 @@ class Repos(APIView):
                     repo["enc_version"] = r.enc_version
                     repo["magic"] = r.magic
                     repo["random_key"] = r.random_key
-                repos_json.append(repo)
+                yield repo
 
-        if filter_by['group']:
-            groups = get_groups_by_user(request)
-            group_repos = get_group_repos(request, groups)
-            group_repos.sort(lambda x, y: cmp(y.last_modify, x.last_modify))
             for r in group_repos:
                 repo = {
                     "type": "grepo",
@@ -608,17 +660,15 @@ class Repos(APIView):
                     "mtime": r.last_modify,
                     "size": r.size,
                     "encrypted": r.encrypted,
-                    "permission": check_permission(r.id, email),
+                    "permission": group_repo_perms[r.id],
                     "root": r.root,
                 }
                 if r.encrypted:
                     repo["enc_version"] = r.enc_version
                     repo["magic"] = r.magic
                     repo["random_key"] = r.random_key
-                repos_json.append(repo)
+                yield repo
 
-        if filter_by['org'] and request.user.permissions.can_view_org():
-            public_repos = list_inner_pub_repos(request)
             for r in public_repos:
                 repo = {
                     "type": "grepo",
@@ -640,10 +690,9 @@ class Repos(APIView):
                     repo["enc_version"] = r.enc_version
                     repo["magic"] = r.magic
                     repo["random_key"] = r.random_key
-                repos_json.append(repo)
+                yield repo
 
-        response = HttpResponse(json.dumps(repos_json), status=200,
-                                content_type=json_content_type)
+        response = json_stream_response(iter_repos(), wants_ndjson(request))
         response["enable_encrypted_library"] = config.ENABLE_ENCRYPTED_LIBRARY
         return response
 
@@ -1193,26 +1242,44 @@ class UpdateBlksLinkView(APIView):
         url = gen_file_upload_url(token, 'update-blks-api')
         return Response(url)
 
-def get_dir_recursively(username, repo_id, path, all_dirs):
-    path_id = seafile_api.get_dir_id_by_path(repo_id, path)
-    dirs = seafserv_threaded_rpc.list_dir_with_perm(repo_id, path,
-            path_id, username, -1, -1)
-
-    for dirent in dirs:
-        if stat.S_ISDIR(dirent.mode):
-            entry = {}
-            entry["type"] = 'dir'
-            entry["parent_dir"] = path
-            entry["id"] = dirent.obj_id
-            entry["name"] = dirent.obj_name
-            entry["mtime"] = dirent.mtime
-            entry["permission"] = dirent.permission
-            all_dirs.append(entry)
+def iter_dirs_recursively(username, repo, path, dir_id, permission,
+                          max_depth=None):
+    """Yield all sub dirs of ``path``, depth first. Sub dirs of a dir are
+    yielded together, sorted by name.
 
-            sub_path = posixpath.join(path, dirent.obj_name)
-            get_dir_recursively(username, repo_id, sub_path, all_dirs)
+    The tree is walked by dir id with an explicit stack. Dir objects are read
+    from cache unless folder permission is enabled, in which case permission
+    of each dir is got from ``list_dir_with_perm``. ``permission`` is the
+    permission of ``path``. Dirs deeper than ``max_depth`` are not listed.
+    """
+    stack = [(path, dir_id, permission, 1)]
+    while stack:
+        parent_dir, parent_id, parent_perm, depth = stack.pop()
+        if settings.ENABLE_FOLDER_PERM:
+            dirents = seafserv_threaded_rpc.list_dir_with_perm(repo.id,
+                    parent_dir, parent_id, username, -1, -1) or []
+        else:
+            dirents = list_dir_object(repo, parent_id)
+
+        sub_dirs = [d for d in dirents if stat.S_ISDIR(d.mode)]
+        sub_dirs.sort(key=lambda d: d.obj_name.lower())
+        children = []
+        for dirent in sub_dirs:
+            perm = getattr(dirent, 'permission', None) or parent_perm
+            yield {
+                "type": 'dir',
+                "parent_dir": parent_dir,
+                "id": dirent.obj_id,
+                "name": dirent.obj_name,
+                "mtime": dirent.mtime,
+                "permission": perm,
+            }
+            if max_depth is None or depth < max_depth:
+                children.append((posixpath.join(parent_dir, dirent.obj_name),
+                                 dirent.obj_id, perm, depth + 1))
 
-    return all_dirs
+        # push in reverse so that the first sibling is walked first
+        stack.extend(reversed(children))
 
 def get_dir_entrys_by_id(request, repo, path, dir_id, request_type=None):
     """ Get dirents in a dir
@@ -1231,18 +1298,41 @@ def get_dir_entrys_by_id(request, repo, path, dir_id, request_type=None):
         return api_error(HTTP_520_OPERATION_FAILED,
                          "Failed to list dir.")
 
+    # remember permission of every dirent for later checks in this request
+    get_perm_resolver(request.user).seed_dirents(repo.id, path, dirs)
+
+    # sort dirents by name before building entries, dirs go first
     dir_list, file_list = [], []
     for dirent in dirs:
-        dtype = "file"
+        if stat.S_ISDIR(dirent.mode):
+            dir_list.append(dirent)
+        else:
+            file_list.append(dirent)
+    dir_list.sort(key=lambda d: d.obj_name.lower())
+    file_list.sort(key=lambda d: d.obj_name.lower())
+
+    if request_type == 'f':
+        dentrys = file_list
+    elif request_type == 'd':
+        dentrys = dir_list
+    else:
+        dentrys = dir_list + file_list
+
+    # sizes of files in v0 libraries are got before the response starts,
+    # only encoding is streamed
+    if repo.version == 0:
+        for dirent in dentrys:
+            if not stat.S_ISDIR(dirent.mode):
+                dirent.size = get_file_size(repo.store_id, repo.version,
+                                            dirent.obj_id)
+
+    def to_entry(dirent):
         entry = {}
         if stat.S_ISDIR(dirent.mode):
-            dtype = "dir"
+            entry["type"] = "dir"
         else:
-            if repo.version == 0:
-                entry["size"] = get_file_size(repo.store_id, repo.version,
-                                              dirent.obj_id)
-            else:
-                entry["size"] = dirent.size
+            entry["type"] = "file"
+            entry["size"] = dirent.size
 
             if is_pro_version():
                 entry["is_locked"] = dirent.is_locked
@@ -1253,30 +1343,16 @@ def get_dir_entrys_by_id(request, repo, path, dir_id, request_type=None):
                 else:
                     entry["locked_by_me"] = False
 
-        entry["type"] = dtype
         entry["name"] = dirent.obj_name
         entry["id"] = dirent.obj_id
         entry["mtime"] = dirent.mtime
         entry["permission"] = dirent.permission
-        if dtype == 'dir':
-            dir_list.append(entry)
-        else:
-            file_list.append(entry)
-
-    dir_list.sort(lambda x, y: cmp(x['name'].lower(), y['name'].lower()))
-    file_list.sort(lambda x, y: cmp(x['name'].lower(), y['name'].lower()))
-
-    if request_type == 'f':
-        dentrys = file_list
-    elif request_type == 'd':
-        dentrys = dir_list
-    else:
-        dentrys = dir_list + file_list
+        return entry
 
-    response = HttpResponse(json.dumps(dentrys), status=200,
-                            content_type=json_content_type)
+    response = json_stream_response((to_entry(d) for d in dentrys),
+                                    wants_ndjson(request))
     response["oid"] = dir_id
-    response["dir_perm"] = seafile_api.check_permission_by_path(repo.id, path, username)
+    response["dir_perm"] = check_folder_permission(request, repo.id, path)
     return response
 
 def get_shared_link(request, repo_id, path):
@@ -1407,14 +1483,15 @@ class OpDeleteView(APIView):
                              'File or directory not found.')
 
         parent_dir_utf8 = parent_dir.encode('utf-8')
-        for file_name in file_names.split(':'):
-            file_name = unquote(file_name.encode('utf-8'))
-            try:
-                seafile_api.del_file(repo_id, parent_dir_utf8,
-                                     file_name, username)
-            except SearpcError, e:
-                return api_error(HTTP_520_OPERATION_FAILED,
-                                 "Failed to delete file.")
+        multi_files = '\t'.join([unquote(x.encode('utf-8')) for x in
+                                  file_names.split(':')])
+        try:
+            # delete all files in one commit
+            seafile_api.del_file(repo_id, parent_dir_utf8, multi_files,
+                                 username)
+        except SearpcError, e:
+            return api_error(HTTP_520_OPERATION_FAILED,
+                             "Failed to delete file.")
 
         return reloaddir_if_necessary (request, repo, parent_dir_utf8)
 
@@ -1454,10 +1531,10 @@ class OpMoveView(APIView):
                              'The destination directory is the same as the source.')
 
         parent_dir_utf8 = parent_dir.encode('utf-8')
+        name_allocator = FilenameAllocator(dst_repo, dst_dir)
         for file_name in file_names.split(':'):
             file_name = unquote(file_name.encode('utf-8'))
-            new_filename = check_filename_with_rename_utf8(dst_repo, dst_dir,
-                                                           file_name)
+            new_filename = name_allocator.allocate(file_name)
             try:
                 seafile_api.move_file(repo_id, parent_dir_utf8, file_name,
                                       dst_repo, dst_dir, new_filename,
@@ -1508,10 +1585,10 @@ class OpCopyView(APIView):
             return api_error(status.HTTP_400_BAD_REQUEST, 'Path does not exist.')
 
         parent_dir_utf8 = parent_dir.encode('utf-8')
+        name_allocator = FilenameAllocator(dst_repo, dst_dir)
         for file_name in file_names.split(':'):
             file_name = unquote(file_name.encode('utf-8'))
-            new_filename = check_filename_with_rename_utf8(dst_repo, dst_dir,
-                                                           file_name)
+            new_filename = name_allocator.allocate(file_name)
             try:
                 seafile_api.copy_file(repo_id, parent_dir_utf8, file_name,
                                       dst_repo, dst_dir, new_filename,
@@ -2047,17 +2124,35 @@ class FileHistory(APIView):
         if path is None:
             return api_error(status.HTTP_400_BAD_REQUEST, 'Path is missing.')
 
+        repo = get_repo(repo_id)
+        if not repo:
+            return api_error(status.HTTP_404_NOT_FOUND, 'Library not found.')
+
+        # return all revisions if neither `cursor` nor `per_page` is given
+        cursor = request.GET.get('cursor', None)
+        per_page = request.GET.get('per_page', None)
         try:
-            commits = seafserv_threaded_rpc.list_file_revisions(repo_id, path,
-                                                                -1, -1)
+            per_page = int(per_page) if per_page else None
+        except ValueError:
+            return api_error(status.HTTP_400_BAD_REQUEST,
+                             'per_page should be an integer.')
+
+        try:
+            if cursor or per_page:
+                commits, next_cursor = get_file_revisions_page(
+                    repo, path, cursor, per_page)
+            else:
+                commits, next_cursor = get_file_revisions(repo, path), None
         except SearpcError as e:
             logger.error(e)
             return api_error(status.HTTP_500_INTERNAL_SERVER_ERROR, "Internal error")
 
-        if not commits:
+        if not commits and not cursor:
             return api_error(status.HTTP_404_NOT_FOUND, 'File not found.')
 
-        return HttpResponse(json.dumps({"commits": commits}, cls=SearpcObjEncoder), status=200, content_type=json_content_type)
+        return HttpResponse(json.dumps({"commits": commits,
+                                        "next_cursor": next_cursor}),
+                            status=200, content_type=json_content_type)
 
 class FileSharedLinkView(APIView):
     """
@@ -2216,13 +2311,35 @@ class DirView(APIView):
                             "If you want to get recursive dir entries, you should set 'recursive' argument as '1'.")
 
                 if recursive == '1':
-                    username = request.user.username
-                    dir_list = get_dir_recursively(username, repo_id, path, [])
-                    dir_list.sort(lambda x, y: cmp(x['name'].lower(), y['name'].lower()))
-                    response = HttpResponse(json.dumps(dir_list), status=200,
-                                            content_type=json_content_type)
+                    max_depth = request.GET.get('max_depth', None)
+                    limit = request.GET.get('limit', None)
+                    try:
+                        max_depth = int(max_depth) if max_depth else None
+                        limit = int(limit) if limit else API_RECURSIVE_DIR_MAX_ENTRIES
+                    except ValueError:
+                        return api_error(status.HTTP_400_BAD_REQUEST,
+                                "'max_depth' and 'limit' should be integers.")
+                    if (max_depth is not None and max_depth < 1) or limit < 1:
+                        return api_error(status.HTTP_400_BAD_REQUEST,
+                                "'max_depth' and 'limit' should be positive.")
+                    limit = min(limit, API_RECURSIVE_DIR_MAX_ENTRIES)
+
+                    # dirs are got before the response starts, so that an
+                    # error is not sent after a partial listing
+                    dir_perm = check_folder_permission(request, repo_id, path)
+                    try:
+                        dirs = list(itertools.islice(iter_dirs_recursively(
+                            request.user.username, repo, path, dir_id,
+                            dir_perm, max_depth), limit))
+                    except SearpcError as e:
+                        logger.error(e)
+                        return api_error(HTTP_520_OPERATION_FAILED,
+                                         "Failed to list dir.")
+
+                    response = json_stream_response(dirs,
+                                                    wants_ndjson(request))
                     response["oid"] = dir_id
-                    response["dir_perm"] = seafile_api.check_permission_by_path(repo_id, path, username)
+                    response["dir_perm"] = dir_perm
                     return response
 
             return get_dir_entrys_by_id(request, repo, path, dir_id, request_type)
@@ -2745,9 +2862,7 @@ class SharedFileDetailView(APIView):
         try:
             file_id = seafserv_threaded_rpc.get_file_id_by_path(repo_id,
                                                                 path.encode('utf-8'))
-            commits = seafserv_threaded_rpc.list_file_revisions(repo_id, path,
-                                                                -1, -1)
-            c = commits[0]
+            c = get_file_revisions(repo, path)[0]
         except SearpcError, e:
             return api_error(HTTP_520_OPERATION_FAILED,
                              "Failed to get file id by path.")
@@ -2765,7 +2880,7 @@ class SharedFileDetailView(APIView):
         entry["type"] = "file"
         entry["name"] = file_name
         entry["id"] = file_id
-        entry["mtime"] = c.ctime
+        entry["mtime"] = c["ctime"]
         entry["repo_id"] = repo_id
         entry["path"] = path
 
@@ -2803,9 +2918,7 @@ class PrivateSharedFileDetailView(APIView):
         try:
             file_id = seafserv_threaded_rpc.get_file_id_by_path(repo_id,
                                                                 path.encode('utf-8'))
-            commits = seafserv_threaded_rpc.list_file_revisions(repo_id, path,
-                                                                -1, -1)
-            c = commits[0]
+            c = get_file_revisions(repo, path)[0]
 
         except SearpcError, e:
             return api_error(HTTP_520_OPERATION_FAILED,
@@ -2823,7 +2936,7 @@ class PrivateSharedFileDetailView(APIView):
         entry["type"] = "file"
         entry["name"] = file_name
         entry["id"] = file_id
-        entry["mtime"] = c.ctime
+        entry["mtime"] = c["ctime"]
         entry["repo_id"] = repo_id
         entry["path"] = path
         entry["shared_by"] = shared_by
@@ -2849,30 +2962,35 @@ class SharedLinksView(APIView):
     def get(self, request, format=None):
         username = request.user.username
 
-        fileshares = FileShare.objects.filter(username=username)
-        p_fileshares = []           # personal file share
-        for fs in fileshares:
-            if is_personal_repo(fs.repo_id):  # only list files in personal repos
-                r = seafile_api.get_repo(fs.repo_id)
-                if not r:
-                    fs.delete()
-                    continue
+        # links are validated before the response starts, only encoding is
+        # streamed. Links whose file/dir is deleted or moved are removed by
+        # ``clean_dead_links`` command, links of removed libraries are skipped.
+        links = list(FileShare.objects.filter(username=username))
+
+        # check each library once
+        repos = {}
+        for repo_id in set([x.repo_id for x in links]):
+            # only list files in personal repos
+            if is_personal_repo(repo_id):
+                repos[repo_id] = seafile_api.get_repo(repo_id)
+
+        fileshares = []
+        for fs in links:
+            r = repos.get(fs.repo_id)
+            if not r:
+                continue
 
-                if fs.s_type == 'f':
-                    if seafile_api.get_file_id_by_path(r.id, fs.path) is None:
-                        fs.delete()
-                        continue
-                    fs.filename = os.path.basename(fs.path)
-                    fs.shared_link = gen_file_share_link(fs.token)
-                else:
-                    if seafile_api.get_dir_id_by_path(r.id, fs.path) is None:
-                        fs.delete()
-                        continue
-                    fs.filename = os.path.basename(fs.path.rstrip('/'))
-                    fs.shared_link = gen_dir_share_link(fs.token)
-                fs.repo = r
-                p_fileshares.append(fs)
-        return HttpResponse(json.dumps({"fileshares": p_fileshares}, cls=FileShareEncoder), status=200, content_type=json_content_type)
+            if fs.s_type == 'f':
+                fs.filename = os.path.basename(fs.path)
+                fs.shared_link = gen_file_share_link(fs.token)
+            else:
+                fs.filename = os.path.basename(fs.path.rstrip('/'))
+                fs.shared_link = gen_dir_share_link(fs.token)
+            fs.repo = r
+            fileshares.append(fs)
+
+        return json_stream_response(fileshares, wants_ndjson(request),
+                                    cls=FileShareEncoder, key='fileshares')
 
     def delete(self, request, format=None):
         token = request.GET.get('t', None)
@@ -2962,8 +3080,8 @@ class SharedDirView(APIView):
             else:
                 file_list.append(entry)
 
-        dir_list.sort(lambda x, y: cmp(x['name'].lower(), y['name'].lower()))
-        file_list.sort(lambda x, y: cmp(x['name'].lower(), y['name'].lower()))
+        dir_list.sort(key=lambda x: x['name'].lower())
+        file_list.sort(key=lambda x: x['name'].lower())
         dentrys = dir_list + file_list
 
         content_type = 'application/json; charset=utf-8'
@@ -3291,6 +3409,18 @@ class UnseenMessagesCountView(APIView):
                 }
         return Response(ret)
 
+class NoticesSeenView(APIView):
+    authentication_classes = (TokenAuthentication, SessionAuthentication)
+    permission_classes = (IsAuthenticated,)
+    throttle_classes = (UserRateThrottle, )
+
+    def post(self, request, format=None):
+        """Mark all unseen notices of current user as seen.
+        """
+        username = request.user.username
+        count = UserNotification.objects.seen_all_user_notifications(username)
+        return Response({'success': True, 'count': count})
+
 ########## Groups related
 class Groups(APIView):
     authentication_classes = (TokenAuthentication, SessionAuthentication)
@@ -3468,6 +3598,7 @@ class GroupMembers(APIView):
 
         try:
             ccnet_threaded_rpc.group_add_member(group.id, request.user.username, user_name)
+            invalidate_autocomplete_index(get_group_scope(group.id))
         except SearpcError, e:
             return api_error(status.HTTP_500_INTERNAL_SERVER_ERROR, 'Unable to add user to group')
 
@@ -3493,6 +3624,7 @@ class GroupMembers(APIView):
 
         try:
             ccnet_threaded_rpc.group_remove_member(group.id, request.user.username, user_name)
+            invalidate_autocomplete_index(get_group_scope(group.id))
         except SearpcError, e:
             return api_error(status.HTTP_500_INTERNAL_SERVER_ERROR, 'Unable to add user to group')
 
@@ -50,6 +50,8 @@ class AnonymousUser(object):
     is_staff = False
     is_active = False
     is_superuser = False
+    org = None
+    joined_groups = []
     _groups = EmptyManager()
     _user_permissions = EmptyManager()
 
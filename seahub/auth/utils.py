@@ -0,0 +1,80 @@
+from django.conf import settings
+
+from seahub.utils.rate_limit import get_rate_limiter
+
+LOGIN_ATTEMPT_PREFIX = 'UserLoginAttempt_'
+
+# failed login attempts of both web and api, by username, by ip and by
+# username and ip together
+login_attempt_limiter = get_rate_limiter(LOGIN_ATTEMPT_PREFIX,
+                                         settings.LOGIN_ATTEMPT_LIMIT,
+                                         settings.LOGIN_ATTEMPT_TIMEOUT)
+
+def _get_pair_key(username, ip):
+    return '%s_%s' % (username, ip)
+
+def get_login_failed_attempts(username=None, ip=None):
+    """Get login failed attempts base on username and ip.
+    If both username and ip are provided, return the max value.
+
+    Arguments:
+    - `username`:
+    - `ip`:
+    """
+    if username is None and ip is None:
+        return 0
+
+    username_attempts = ip_attempts = 0
+
+    if username:
+        username_attempts = login_attempt_limiter.get(username)
+
+    if ip:
+        ip_attempts = login_attempt_limiter.get(ip)
+
+    return max(username_attempts, ip_attempts)
+
+def get_pair_login_failed_attempts(username, ip):
+    """Get login failed attempts of username from ip.
+
+    Unlike ``get_login_failed_attempts``, failures of the username from other
+    ips are not counted, so they can not lock the user out.
+    """
+    if not username or not ip:
+        return 0
+
+    return login_attempt_limiter.get(_get_pair_key(username, ip))
+
+def incr_login_failed_attempts(username=None, ip=None):
+    """Increase login failed attempts by 1 for username, ip and both.
+
+    Arguments:
+    - `username`:
+    - `ip`:
+
+    Returns new value of failed attempts.
+    """
+    username_attempts = 1
+    ip_attempts = 1
+
+    if username:
+        username_attempts = login_attempt_limiter.incr(username)
+
+    if ip:
+        ip_attempts = login_attempt_limiter.incr(ip)
+
+    if username and ip:
+        login_attempt_limiter.incr(_get_pair_key(username, ip))
+
+    return max(username_attempts, ip_attempts)
+
+def clear_login_failed_attempts(username, ip):
+    """Clear login failed attempts records.
+
+    Arguments:
+    - `username`:
+    - `ip`:
+    """
+    login_attempt_limiter.clear(username)
+    login_attempt_limiter.clear(ip)
+    login_attempt_limiter.clear(_get_pair_key(username, ip))
@@ -5,7 +5,6 @@ from datetime import datetime
 from django.conf import settings
 # Avoid shadowing the login() view below.
 from django.views.decorators.csrf import csrf_protect
-from django.core.cache import cache
 from django.core.urlresolvers import reverse
 from django.contrib import messages
 from django.shortcuts import render_to_response
@@ -22,6 +21,8 @@ from seahub.auth.decorators import login_required
 from seahub.auth.forms import AuthenticationForm, CaptchaAuthenticationForm
 from seahub.auth.forms import PasswordResetForm, SetPasswordForm, PasswordChangeForm
 from seahub.auth.tokens import default_token_generator
+from seahub.auth.utils import get_login_failed_attempts, \
+    incr_login_failed_attempts, clear_login_failed_attempts
 from seahub.base.accounts import User
 from seahub.utils import is_ldap_user
 from seahub.utils.http import is_safe_url
@@ -34,8 +35,6 @@ from seahub.password_session import update_session_auth_hash
 # Get an instance of a logger
 logger = logging.getLogger(__name__)
 
-LOGIN_ATTEMPT_PREFIX = 'UserLoginAttempt_'
-
 def log_user_in(request, user, redirect_to):
     # Ensure the user-originating redirection url is safe.
     if not is_safe_url(url=redirect_to, host=request.get_host()):
@@ -47,69 +46,11 @@ def log_user_in(request, user, redirect_to):
     if request.session.test_cookie_worked():
         request.session.delete_test_cookie()
 
-    _clear_login_failed_attempts(request)
+    clear_login_failed_attempts(request.user.username,
+                                get_remote_ip(request))
 
     return HttpResponseRedirect(redirect_to)
 
-def _get_login_failed_attempts(username=None, ip=None):
-    """Get login failed attempts base on username and ip.
-    If both username and ip are provided, return the max value.
-
-    Arguments:
-    - `username`:
-    - `ip`:
-    """
-    if username is None and ip is None:
-        return 0
-
-    username_attempts = ip_attempts = 0
-
-    if username:
-        username_attempts = cache.get(LOGIN_ATTEMPT_PREFIX + username, 0)
-
-    if ip:
-        ip_attempts = cache.get(LOGIN_ATTEMPT_PREFIX + ip, 0)
-
-    return max(username_attempts, ip_attempts)
-
-def _incr_login_faied_attempts(username=None, ip=None):
-    """Increase login failed attempts by 1 for both username and ip.
-
-    Arguments:
-    - `username`:
-    - `ip`:
-
-    Returns new value of failed attempts.
-    """
-    timeout = settings.LOGIN_ATTEMPT_TIMEOUT
-    username_attempts = 1
-    ip_attempts = 1
-
-    if username:
-        try:
-            username_attempts = cache.incr(LOGIN_ATTEMPT_PREFIX + username)
-        except ValueError:
-            cache.set(LOGIN_ATTEMPT_PREFIX + username, 1, timeout)
-
-    if ip:
-        try:
-            ip_attempts = cache.incr(LOGIN_ATTEMPT_PREFIX + ip)
-        except ValueError:
-            cache.set(LOGIN_ATTEMPT_PREFIX + ip, 1, timeout)
-
-    return max(username_attempts, ip_attempts)
-
-def _clear_login_failed_attempts(request):
-    """Clear login failed attempts records.
-
-    Arguments:
-    - `request`:
-    """
-    username = request.user.username
-    ip = get_remote_ip(request)
-    cache.delete(LOGIN_ATTEMPT_PREFIX + username)
-    cache.delete(LOGIN_ATTEMPT_PREFIX + ip)
-
 @csrf_protect
 @never_cache
 def login(request, template_name='registration/login.html',
@@ -123,7 +64,7 @@ def login(request, template_name='registration/login.html',
 
     redirect_to = request.REQUEST.get(redirect_field_name, '')
     ip = get_remote_ip(request)
-    failed_attempt = _get_login_failed_attempts(ip=ip)
+    failed_attempt = get_login_failed_attempts(ip=ip)
 
     if request.method == "POST":
         username = urlquote(request.REQUEST.get('username', '').strip())
@@ -139,7 +80,7 @@ def login(request, template_name='registration/login.html',
                 return log_user_in(request, form.get_user(), redirect_to)
             else:
                 # show page with captcha and increase failed login attempts
-                _incr_login_faied_attempts(username=username, ip=ip)
+                incr_login_failed_attempts(username=username, ip=ip)
         else:
             form = authentication_form(data=request.POST)
             if form.is_valid():
@@ -148,8 +89,8 @@ def login(request, template_name='registration/login.html',
                 return log_user_in(request, form.get_user(), redirect_to)
             else:
                 login = urlquote(request.REQUEST.get('login', '').strip())
-                failed_attempt = _incr_login_faied_attempts(username=login,
-                                                            ip=ip)
+                failed_attempt = incr_login_failed_attempts(username=login,
+                                                           ip=ip)
 
                 if failed_attempt >= settings.LOGIN_ATTEMPT_LIMIT:
                     logger.warn('Login attempt limit reached, email/username: %s, ip: %s, attemps: %d' %
@@ -90,7 +90,6 @@ class UserManager(object):
         user.is_staff = emailuser.is_staff
         user.is_active = emailuser.is_active
         user.ctime = emailuser.ctime
-        user.org = emailuser.org
         user.source = emailuser.source
         user.role = emailuser.role
         user.source = emailuser.source
@@ -120,11 +119,17 @@ class UserPermissions(object):
         return False if CLOUD_MODE else True
 
 class User(object):
+    """A ccnet user.
+
+    ``org``, ``joined_groups`` and ``permissions`` are loaded on first
+    access and kept for the lifetime of the object, which is usually one
+    request. Names of attributes loaded by RPC are appended to
+    ``loaded_attrs``.
+    """
     is_staff = False
     is_active = False
     is_superuser = False
     groups = []
-    org = None
     objects = UserManager()
 
     class DoesNotExist(Exception):
@@ -133,7 +138,44 @@ class User(object):
     def __init__(self, email):
         self.username = email
         self.email = email
-        self.permissions = UserPermissions(self)
+        self.loaded_attrs = []
+
+    def _get_org(self):
+        if '_org' not in self.__dict__:
+            self._org = None
+            if MULTI_TENANCY:
+                orgs = seaserv.get_orgs_by_user(self.username)
+                self.loaded_attrs.append('org')
+                if orgs:
+                    self._org = orgs[0]
+        return self._org
+
+    def _set_org(self, org):
+        self._org = org
+
+    org = property(_get_org, _set_org)
+
+    def _get_joined_groups(self):
+        if '_joined_groups' not in self.__dict__:
+            if CLOUD_MODE and self.org is not None:
+                self._joined_groups = seaserv.get_org_groups_by_user(
+                    self.org.org_id, self.username)
+            else:
+                self._joined_groups = seaserv.get_personal_groups_by_user(
+                    self.username)
+            self.loaded_attrs.append('joined_groups')
+        return self._joined_groups
+
+    def _set_joined_groups(self, groups):
+        self._joined_groups = groups
+
+    joined_groups = property(_get_joined_groups, _set_joined_groups)
+
+    @property
+    def permissions(self):
+        if '_permissions' not in self.__dict__:
+            self._permissions = UserPermissions(self)
+        return self._permissions
 
     def __unicode__(self):
         return self.username
@@ -290,7 +332,6 @@ class AuthBackend(object):
         user.is_staff = emailuser.is_staff
         user.is_active = emailuser.is_active
         user.ctime = emailuser.ctime
-        user.org = emailuser.org
         user.source = emailuser.source
         user.role = emailuser.role
         user.source = emailuser.source
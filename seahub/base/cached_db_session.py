@@ -0,0 +1,47 @@
+# encoding: utf-8
+"""
+Cached, database-backed sessions which are only written on real changes.
+
+Sessions are read from the default cache and fall back to database. Unlike
+``django.contrib.sessions.backends.cached_db``, a session is written to
+cache and database only when its data differs from what was loaded, so that
+requests re-assigning unchanged values do not re-save the session row.
+
+Usage::
+
+    SESSION_ENGINE = 'seahub.base.cached_db_session'
+
+Number of writes of current request is kept in ``request.session.write_count``
+and logged at DEBUG level.
+"""
+import copy
+import logging
+
+from django.contrib.sessions.backends.cached_db import SessionStore as \
+    CachedDBStore
+
+# Get an instance of a logger
+logger = logging.getLogger(__name__)
+
+class SessionStore(CachedDBStore):
+    def __init__(self, session_key=None):
+        super(SessionStore, self).__init__(session_key)
+        self._loaded_data = None
+        self.write_count = 0
+
+    def load(self):
+        data = super(SessionStore, self).load()
+        # copy, so that values changed in place are not taken as unchanged
+        self._loaded_data = copy.deepcopy(data)
+        return data
+
+    def save(self, must_create=False):
+        data = self._get_session(no_load=must_create)
+        if not must_create and data == self._loaded_data:
+            return
+
+        super(SessionStore, self).save(must_create)
+        self._loaded_data = copy.deepcopy(data)
+        self.write_count += 1
+        logger.debug('Session %s written, %d writes in this request.' % (
+            self.session_key, self.write_count))
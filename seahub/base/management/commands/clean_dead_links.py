@@ -0,0 +1,31 @@
+# encoding: utf-8
+import logging
+from optparse import make_option
+
+from django.core.management.base import BaseCommand
+
+from pysearpc import SearpcError
+
+from seahub.utils.dead_links import get_link_repo_ids, clean_dead_links
+
+# Get an instance of a logger
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = 'Delete download/upload links, private shares and starred files whose library or file/dir is removed. Only libraries changed since last run are checked.'
+    label = "base_clean_dead_links"
+
+    option_list = BaseCommand.option_list + (
+        make_option('--all', action='store_true', dest='all', default=False,
+            help='Check all libraries, including those not changed since last run.'),
+    )
+
+    def handle(self, *args, **options):
+        deleted = 0
+        for repo_id in get_link_repo_ids():
+            try:
+                deleted += clean_dead_links(repo_id, force=options['all'])
+            except SearpcError as e:
+                logger.error(e)
+
+        self.stdout.write('Deleted %d dead links.' % deleted)
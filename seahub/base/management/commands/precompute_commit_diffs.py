@@ -0,0 +1,77 @@
+# encoding: utf-8
+import logging
+import time
+from optparse import make_option
+
+from django.core.management.base import BaseCommand
+
+from seaserv import seafile_api
+from pysearpc import SearpcError
+
+from seahub.utils.commit_diff import get_commit_diff
+
+# Get an instance of a logger
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = 'Compute and cache diff of latest commits of libraries changed recently, so that history pages of active libraries are fast.'
+    label = "base_precompute_commit_diffs"
+
+    option_list = BaseCommand.option_list + (
+        make_option('--commits', dest='commits', type='int', default=20,
+            help='Number of latest commits of a library to compute diff for.'),
+        make_option('--hours', dest='hours', type='int', default=24,
+            help='Only libraries changed in this number of hours are computed.'),
+        make_option('--max-repos', dest='max_repos', type='int', default=500,
+            help='Max number of libraries to compute, most recently changed first.'),
+    )
+
+    # libraries are listed in pages of this size
+    REPOS_PAGE_SIZE = 1000
+
+    def _get_changed_repos(self, since):
+        """Return unencrypted libraries whose last modification time is not
+        older than ``since``, most recently changed first.
+        """
+        repos = []
+        start = 0
+        while True:
+            page = seafile_api.get_repo_list(start, self.REPOS_PAGE_SIZE)
+            for repo in page:
+                if repo.encrypted:
+                    continue
+                # checked against latest commit later if it is unknown
+                last_modify = getattr(repo, 'last_modify', None)
+                if last_modify is None or last_modify >= since:
+                    repos.append(repo)
+            if len(page) < self.REPOS_PAGE_SIZE:
+                break
+            start += self.REPOS_PAGE_SIZE
+
+        repos.sort(key=lambda r: getattr(r, 'last_modify', None) or 0,
+                   reverse=True)
+        return repos
+
+    def handle(self, *args, **options):
+        since = time.time() - options['hours'] * 60 * 60
+        count = 0
+        repos_count = 0
+        for repo in self._get_changed_repos(since):
+            if repos_count >= options['max_repos']:
+                break
+
+            try:
+                commits = seafile_api.get_commit_list(repo.id, 0,
+                                                      options['commits'])
+                if not commits or commits[0].ctime < since:
+                    continue
+
+                repos_count += 1
+                for c in commits:
+                    get_commit_diff(repo.id, '', c.id)
+                    count += 1
+            except SearpcError as e:
+                logger.error(e)
+
+        self.stdout.write('Computed diff of %d commits in %d libraries.' % (
+            count, repos_count))
@@ -0,0 +1,54 @@
+# encoding: utf-8
+import logging
+from optparse import make_option
+
+from django.core.management.base import BaseCommand
+
+from pysearpc import SearpcError
+
+from seahub.share.models import FileShare, UploadLinkShare
+from seahub.utils.share_link_summary import get_link_summaries, is_stale, \
+    get_link_type, refresh_link_summary
+
+# Get an instance of a logger
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = 'Refresh cached summaries (existence and size of files/dirs) of download and upload links, so that user info pages of sysadmin are fast.'
+    label = "base_refresh_share_link_summaries"
+
+    option_list = BaseCommand.option_list + (
+        make_option('--all', action='store_true', dest='all', default=False,
+            help='Refresh all summaries, instead of only stale ones.'),
+        make_option('--batch', dest='batch', type='int', default=500,
+            help='Number of links whose summaries are read from cache at once.'),
+    )
+
+    def _refresh(self, links, refresh_all):
+        summaries = get_link_summaries(links)
+        refreshed = 0
+        for link in links:
+            summary = summaries.get((get_link_type(link), link.token))
+            if not refresh_all and summary is not None and \
+               not is_stale(summary):
+                continue
+
+            try:
+                refresh_link_summary(link)
+                refreshed += 1
+            except SearpcError as e:
+                logger.error(e)
+        return refreshed
+
+    def handle(self, *args, **options):
+        refreshed = 0
+        for model in (FileShare, UploadLinkShare):
+            links = []
+            for link in model.objects.all().iterator():
+                links.append(link)
+                if len(links) >= options['batch']:
+                    refreshed += self._refresh(links, options['all'])
+                    links = []
+            refreshed += self._refresh(links, options['all'])
+
+        self.stdout.write('Refreshed %d summaries.' % refreshed)
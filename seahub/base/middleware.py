@@ -1,6 +1,6 @@
-from django.core.cache import cache
+import logging
 
-import seaserv
+from django.core.cache import cache
 
 from seahub.notifications.models import Notification
 from seahub.notifications.utils import refresh_cache
@@ -8,41 +8,30 @@ try:
     from seahub.settings import CLOUD_MODE
 except ImportError:
     CLOUD_MODE = False
-try:
-    from seahub.settings import MULTI_TENANCY
-except ImportError:
-    MULTI_TENANCY = False
+
+# Get an instance of a logger
+logger = logging.getLogger(__name__)
 
 class BaseMiddleware(object):
     """
-    Middleware that add organization, group info to user.
+    Middleware that add cloud mode info to request, and logs attributes of
+    user loaded by RPC in a request.
+
+    Organization and group info of user are loaded on first access, see
+    ``seahub.base.accounts.User``.
     """
 
     def process_request(self, request):
-        username = request.user.username
-        request.user.org = None
-
-        if CLOUD_MODE:
-            request.cloud_mode = True
-
-            if MULTI_TENANCY:
-                orgs = seaserv.get_orgs_by_user(username)
-                if orgs:
-                    request.user.org = orgs[0]
-        else:
-            request.cloud_mode = False
-
-        if CLOUD_MODE and request.user.org is not None:
-            org_id = request.user.org.org_id
-            request.user.joined_groups = seaserv.get_org_groups_by_user(
-                org_id, username)
-        else:
-            request.user.joined_groups = seaserv.get_personal_groups_by_user(
-                username)
-
+        request.cloud_mode = True if CLOUD_MODE else False
         return None
 
     def process_response(self, request, response):
+        if logger.isEnabledFor(logging.DEBUG):
+            user = getattr(request, 'user', None)
+            loaded_attrs = getattr(user, 'loaded_attrs', None)
+            if loaded_attrs:
+                logger.debug('%s: user attributes loaded by RPC: %s' % (
+                    request.path, ', '.join(loaded_attrs)))
         return response
 
 class InfobarMiddleware(object):
@@ -1,6 +1,9 @@
 import datetime
 import logging
 import json
+import os
+from django.conf import settings
+from django.core.cache import cache
 from django.db import models, IntegrityError
 from django.utils import timezone
 
@@ -9,13 +12,22 @@ from seaserv import seafile_api
 
 from seahub.auth.signals import user_logged_in
 from seahub.group.models import GroupMessage
-from seahub.utils import calc_file_path_hash, within_time_range
+from seahub.utils import calc_file_path_hash, within_time_range, \
+    normalize_cache_key
 from fields import LowerCaseCharField
 
 
 # Get an instance of a logger
 logger = logging.getLogger(__name__)
 
+STARRED_FILES_CACHE_PREFIX = getattr(settings, 'STARRED_FILES_CACHE_PREFIX',
+                                     'STARRED_FILES_')
+STARRED_FILES_CACHE_TIMEOUT = getattr(settings, 'STARRED_FILES_CACHE_TIMEOUT',
+                                      24 * 60 * 60)
+# seconds after which a pending/running copy/move job without heartbeat, e.g.
+# whose web worker is restarted, is taken as failed
+DIRENTS_JOB_STALE_TIME = getattr(settings, 'DIRENTS_JOB_STALE_TIME', 5 * 60)
+
 class UuidObjidMap(models.Model):
     """
     Model used for store crocdoc uuid and file object id mapping.
@@ -65,68 +77,111 @@ class StarredFile(object):
             self.name = path.split('/')[-1]
 
 class UserStarredFilesManager(models.Manager):
+    def _get_cache_key(self, username):
+        return normalize_cache_key(username, STARRED_FILES_CACHE_PREFIX)
+
+    def clear_cache(self, username):
+        """Clear cached dirents of a user's starred files, called when a file
+        is starred or unstarred.
+        """
+        cache.delete(self._get_cache_key(username))
+
+    def _list_starred_dirents(self, repo, paths):
+        """Get ``(obj_id, mtime, size)`` of ``paths`` in a library, with one
+        dir listing per parent dir.
+
+        Return a dict of path and its dirent, which is None if the path does
+        not exist, and whether all parent dirs are listed.
+        """
+        parent_dirs = {}
+        for path in paths:
+            parent_dir, name = os.path.split(path.rstrip('/'))
+            parent_dirs.setdefault(parent_dir, {})[name] = path
+
+        dirents = {}
+        ok = True
+        for parent_dir, names in parent_dirs.items():
+            try:
+                listing = seafile_api.list_dir_by_path(
+                    repo.id, parent_dir.encode('utf-8'))
+            except SearpcError as e:
+                logger.error(e)
+                ok = False
+                continue
+
+            for path in names.values():
+                dirents[path] = None
+            for d in listing or []:
+                path = names.get(d.obj_name)
+                if path is not None:
+                    dirents[path] = (d.obj_id, d.mtime, getattr(d, 'size', 0))
+        return dirents, ok
+
     def get_starred_files_by_username(self, username):
         """Get a user's starred files.
 
-        Arguments:
-        - `self`:
-        - `username`:
+        Starred files are grouped by library and parent dir, and each group
+        is resolved with one dir listing. The result is cached per user, and
+        re-calculated for a library whose head commit is changed.
         """
         starred_files = super(UserStarredFilesManager, self).filter(
             email=username, org_id=-1)
 
-        ret = []
-        repo_cache = {}
+        repo_paths = {}
         for sfile in starred_files:
+            paths = repo_paths.setdefault(sfile.repo_id, set())
+            if sfile.path != '/':
+                paths.add(sfile.path)
+
+        key = self._get_cache_key(username)
+        cached = cache.get(key) or {}
+        to_cache = {}           # repo id => (head commit id, dirents)
+        repos = {}
+        dirents = {}
+        for repo_id, paths in repo_paths.items():
             # repo still exists?
-            if repo_cache.has_key(sfile.repo_id):
-                repo = repo_cache[sfile.repo_id]
-            else:
-                try:
-                    repo = seafile_api.get_repo(sfile.repo_id)
-                except SearpcError:
-                    continue
-                if repo is not None:
-                    repo_cache[sfile.repo_id] = repo
-                else:
-                    sfile.delete()
-                    continue
+            try:
+                repo = seafile_api.get_repo(repo_id)
+            except SearpcError as e:
+                logger.error(e)
+                continue
+            if repo is None:
+                # removed by ``clean_dead_links`` command
+                continue
+            repos[repo_id] = repo
+
+            head_cmmt_id, repo_dirents = cached.get(repo_id, (None, {}))
+            ok = True
+            if head_cmmt_id != repo.head_cmmt_id or \
+               not paths.issubset(repo_dirents):
+                repo_dirents, ok = self._list_starred_dirents(repo, paths)
+            dirents[repo_id] = repo_dirents
+            if ok:
+                to_cache[repo_id] = (repo.head_cmmt_id, repo_dirents)
+        cache.set(key, to_cache, STARRED_FILES_CACHE_TIMEOUT)
 
-            # file still exists?
-            file_id = ''
-            size = -1
-            if sfile.path != "/":
-                try:
-                    file_id = seafile_api.get_file_id_by_path(sfile.repo_id,
-                                                              sfile.path)
-                    # size = seafile_api.get_file_size(file_id)
-                except SearpcError:
-                    continue
-                if not file_id:
-                    sfile.delete()
-                    continue
-
-            f = StarredFile(sfile.org_id, repo, file_id, sfile.path,
-                            sfile.is_dir, 0) # TODO: remove ``size`` from StarredFile
-            ret.append(f)
+        ret = []
+        for sfile in starred_files:
+            repo = repos.get(sfile.repo_id)
+            if repo is None:
+                continue
 
-        '''Calculate files last modification time'''
-        for sfile in ret:
-            if sfile.is_dir:
+            if sfile.path == '/':
+                ret.append(StarredFile(sfile.org_id, repo, '', sfile.path,
+                                       sfile.is_dir, 0))
                 continue
 
-            try:
-                # get real path for sub repo
-                real_path = sfile.repo.origin_path + sfile.path if sfile.repo.origin_path else sfile.path
-                dirent = seafile_api.get_dirent_by_path(sfile.repo.store_id,
-                                                        real_path)
-                if dirent:
-                    sfile.last_modified = dirent.mtime
-                else:
-                    sfile.last_modified = 0
-            except SearpcError as e:
-                logger.error(e)
-                sfile.last_modified = 0
+            # file still exists?
+            dirent = dirents[sfile.repo_id].get(sfile.path)
+            if dirent is None:
+                continue
+
+            obj_id, mtime, size = dirent
+            f = StarredFile(sfile.org_id, repo, obj_id, sfile.path,
+                            sfile.is_dir, size)
+            if not sfile.is_dir:
+                f.last_modified = mtime
+            ret.append(f)
 
         ret.sort(lambda x, y: cmp(y.last_modified, x.last_modified))
 
@@ -255,3 +310,129 @@ class ClientLoginToken(models.Model):
 
     def __unicode__(self):
         return "/".join(self.username, self.token)
+
+########## copy/move jobs
+class DirentsJobManager(models.Manager):
+    def add_job(self, username, op, src_repo_id, src_path, dst_repo_id,
+                dst_path, obj_names, failed=None):
+        """Add a job to copy/move ``obj_names`` in ``src_path``, ``failed``
+        is a list of names already failed, e.g. for lack of permission.
+        """
+        failed = failed or []
+        job = self.model(username=username, op=op,
+                         src_repo_id=src_repo_id, src_path=src_path,
+                         dst_repo_id=dst_repo_id, dst_path=dst_path,
+                         objs=json.dumps(obj_names),
+                         total=len(obj_names) + len(failed),
+                         failed=len(failed),
+                         result=json.dumps({'success': [], 'failed': failed}))
+        job.save()
+        return job
+
+    def has_active_job(self, username):
+        """Whether a user has a pending/running job which is not stale.
+        """
+        mtime = timezone.now() - datetime.timedelta(
+            seconds=DIRENTS_JOB_STALE_TIME)
+        return self.filter(username=username, mtime__gte=mtime).exclude(
+            status=DirentsJob.STATUS_DONE).exists()
+
+    def get_user_job(self, username, job_id):
+        """Get a job of a user, a stale job is marked as done first.
+        """
+        try:
+            job = self.get(pk=job_id, username=username)
+        except (DirentsJob.DoesNotExist, ValueError):
+            return None
+
+        if job.is_stale():
+            self.fail_stale_job(job)
+        return job
+
+    def fail_stale_job(self, job):
+        """Mark a job whose runner is gone as done, objects not copied/moved
+        yet are taken as failed.
+        """
+        result = job.get_result()
+        handled = set(result['success'] + result['failed'] +
+                      result.get('canceled', []))
+        result['failed'] += [x for x in job.get_objs() if x not in handled]
+
+        job.status = DirentsJob.STATUS_DONE
+        job.failed = len(result['failed'])
+        job.result = json.dumps(result)
+        # only if no heartbeat in the meantime
+        self.filter(pk=job.pk, mtime=job.mtime).update(
+            status=job.status, failed=job.failed, result=job.result)
+
+    def cancel_user_job(self, username, job_id):
+        """Ask a pending/running job to stop, objects being copied/moved are
+        still finished. Returns ``False`` if the job is not found or done.
+        """
+        try:
+            jobs = self.filter(pk=job_id, username=username, status__in=[
+                DirentsJob.STATUS_PENDING, DirentsJob.STATUS_RUNNING])
+            return jobs.update(status=DirentsJob.STATUS_CANCELING) > 0
+        except ValueError:
+            return False
+
+class DirentsJob(models.Model):
+    """
+    Copy/move of multiple files/dirs, run in background.
+    """
+    OP_COPY = 'cp'
+    OP_MOVE = 'mv'
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_CANCELING = 'canceling'
+    STATUS_DONE = 'done'
+
+    username = LowerCaseCharField(max_length=255, db_index=True)
+    op = models.CharField(max_length=2)
+    src_repo_id = models.CharField(max_length=36)
+    src_path = models.TextField()
+    dst_repo_id = models.CharField(max_length=36)
+    dst_path = models.TextField()
+    objs = models.TextField()
+    status = models.CharField(max_length=10, default=STATUS_PENDING)
+    total = models.IntegerField(default=0)
+    completed = models.IntegerField(default=0)
+    failed = models.IntegerField(default=0)
+    total_bytes = models.BigIntegerField(default=0)
+    done_bytes = models.BigIntegerField(default=0)
+    result = models.TextField()
+    ctime = models.DateTimeField(default=timezone.now)
+    # heartbeat of the runner
+    mtime = models.DateTimeField(default=timezone.now)
+
+    objects = DirentsJobManager()
+
+    def get_objs(self):
+        return json.loads(self.objs)
+
+    def get_result(self):
+        return json.loads(self.result)
+
+    def is_stale(self):
+        if self.status == self.STATUS_DONE:
+            return False
+        return not within_time_range(self.mtime, timezone.now(),
+                                     DIRENTS_JOB_STALE_TIME)
+
+    def to_dict(self):
+        """Progress of the job, and names succeeded/failed (and canceled, if
+        the job is canceled) when done.
+        """
+        d = {
+            'job_id': self.pk,
+            'op': self.op,
+            'status': self.status,
+            'total': self.total,
+            'completed': self.completed,
+            'failed': self.failed,
+            'total_bytes': self.total_bytes,
+            'done_bytes': self.done_bytes,
+        }
+        if self.status == self.STATUS_DONE:
+            d['result'] = self.get_result()
+        return d
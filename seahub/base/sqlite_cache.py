@@ -0,0 +1,238 @@
+# encoding: utf-8
+"""
+SQLite cache backend.
+
+Entries are kept in a few SQLite files (shards) in the cache directory, each
+with a primary key on cache key and an index on expire time, so that get/set
+do not depend on the number of entries. Files are opened in WAL mode, which
+lets multiple worker processes read while one of them writes.
+
+Expired entries are removed every ``CULL_EVERY`` writes of a shard, and the
+entries which expire first are culled when a shard has more than its part of
+``MAX_ENTRIES``.
+
+Usage::
+
+    CACHES = {
+        'default': {
+            'BACKEND': 'seahub.base.sqlite_cache.SQLiteCache',
+            'LOCATION': '/tmp/seahub_cache',
+            'OPTIONS': {
+                'MAX_ENTRIES': 1000000,
+                'SHARDS': 8,
+            }
+        }
+    }
+"""
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+from django.core.cache.backends.base import BaseCache
+from django.utils.encoding import force_bytes
+
+# max number of host parameters in a SQLite statement is 999
+_MAX_PARAMS = 500
+
+@contextmanager
+def _transaction(conn, mode=''):
+    conn.execute('BEGIN %s' % mode)
+    try:
+        yield conn
+    except:
+        conn.execute('ROLLBACK')
+        raise
+    conn.execute('COMMIT')
+
+class SQLiteCache(BaseCache):
+    def __init__(self, location, params):
+        BaseCache.__init__(self, params)
+        options = params.get('OPTIONS', {})
+        self._dir = location
+        self._shards = int(options.get('SHARDS', 8))
+        self._cull_every = int(options.get('CULL_EVERY', 1000))
+        self._shard_max_entries = max(self._max_entries // self._shards, 1)
+        self._local = threading.local()
+        if not os.path.exists(self._dir):
+            try:
+                os.makedirs(self._dir)
+            except OSError:
+                # created by another process
+                pass
+
+    def _conn(self, shard):
+        """Return connection to ``shard`` of this thread and process.
+        """
+        local = self._local
+        if getattr(local, 'pid', None) != os.getpid():
+            local.pid = os.getpid()
+            local.conns = {}
+            local.writes = {}
+
+        conn = local.conns.get(shard)
+        if conn is None:
+            path = os.path.join(self._dir, 'cache_%d.db' % shard)
+            conn = sqlite3.connect(path, timeout=10, isolation_level=None)
+            conn.text_factory = str
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('CREATE TABLE IF NOT EXISTS cache ('
+                         'key TEXT PRIMARY KEY, value BLOB, expires REAL)')
+            conn.execute('CREATE INDEX IF NOT EXISTS cache_expires '
+                         'ON cache (expires)')
+            local.conns[shard] = conn
+        return conn
+
+    def _make_key(self, key, version):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return force_bytes(key)
+
+    def _shard(self, key):
+        return zlib.crc32(key) % self._shards
+
+    def _group_by_shard(self, keys):
+        shards = {}
+        for key in keys:
+            shards.setdefault(self._shard(key), []).append(key)
+        return shards
+
+    def _expires(self, timeout):
+        if timeout is None:
+            timeout = self.default_timeout
+        return time.time() + timeout
+
+    def _dumps(self, value):
+        return sqlite3.Binary(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+
+    def _written(self, shard, conn, count=1):
+        """Remove expired entries and cull the shard every ``CULL_EVERY``
+        writes.
+        """
+        writes = self._local.writes.get(shard, 0) + count
+        if writes < self._cull_every:
+            self._local.writes[shard] = writes
+            return
+        self._local.writes[shard] = 0
+
+        conn.execute('DELETE FROM cache WHERE expires < ?', (time.time(), ))
+        num = conn.execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+        if num > self._shard_max_entries:
+            cull_num = num // self._cull_frequency if self._cull_frequency else num
+            conn.execute('DELETE FROM cache WHERE key IN (SELECT key FROM '
+                         'cache ORDER BY expires LIMIT ?)', (cull_num, ))
+
+    def add(self, key, value, timeout=None, version=None):
+        key = self._make_key(key, version)
+        shard = self._shard(key)
+        conn = self._conn(shard)
+        with _transaction(conn):
+            conn.execute('DELETE FROM cache WHERE key = ? AND expires < ?',
+                         (key, time.time()))
+            cursor = conn.execute('INSERT OR IGNORE INTO cache VALUES (?, ?, ?)',
+                                  (key, self._dumps(value),
+                                   self._expires(timeout)))
+        self._written(shard, conn)
+        return cursor.rowcount == 1
+
+    def get(self, key, default=None, version=None):
+        key = self._make_key(key, version)
+        row = self._conn(self._shard(key)).execute(
+            'SELECT value FROM cache WHERE key = ? AND expires >= ?',
+            (key, time.time())).fetchone()
+        if row is None:
+            return default
+        return pickle.loads(str(row[0]))
+
+    def set(self, key, value, timeout=None, version=None):
+        key = self._make_key(key, version)
+        shard = self._shard(key)
+        conn = self._conn(shard)
+        conn.execute('INSERT OR REPLACE INTO cache VALUES (?, ?, ?)',
+                     (key, self._dumps(value), self._expires(timeout)))
+        self._written(shard, conn)
+
+    def delete(self, key, version=None):
+        key = self._make_key(key, version)
+        self._conn(self._shard(key)).execute(
+            'DELETE FROM cache WHERE key = ?', (key, ))
+
+    def has_key(self, key, version=None):
+        key = self._make_key(key, version)
+        row = self._conn(self._shard(key)).execute(
+            'SELECT 1 FROM cache WHERE key = ? AND expires >= ?',
+            (key, time.time())).fetchone()
+        return row is not None
+
+    def incr(self, key, delta=1, version=None):
+        key = self._make_key(key, version)
+        conn = self._conn(self._shard(key))
+        # lock the shard, so that concurrent incr are not lost
+        with _transaction(conn, 'IMMEDIATE'):
+            row = conn.execute(
+                'SELECT value FROM cache WHERE key = ? AND expires >= ?',
+                (key, time.time())).fetchone()
+            if row is None:
+                raise ValueError("Key '%s' not found" % key)
+            new_value = pickle.loads(str(row[0])) + delta
+            conn.execute('UPDATE cache SET value = ? WHERE key = ?',
+                         (self._dumps(new_value), key))
+        return new_value
+
+    def get_many(self, keys, version=None):
+        """Get values of ``keys`` with one query per shard.
+        """
+        key_map = {}
+        for k in keys:
+            key = self._make_key(k, version)
+            key_map[key] = k
+
+        now = time.time()
+        result = {}
+        for shard, shard_keys in self._group_by_shard(key_map.keys()).items():
+            conn = self._conn(shard)
+            for i in range(0, len(shard_keys), _MAX_PARAMS):
+                chunk = shard_keys[i:i + _MAX_PARAMS]
+                rows = conn.execute(
+                    'SELECT key, value FROM cache WHERE expires >= ? AND '
+                    'key IN (%s)' % ','.join(['?'] * len(chunk)),
+                    [now] + chunk)
+                for key, value in rows:
+                    result[key_map[key]] = pickle.loads(str(value))
+        return result
+
+    def set_many(self, data, timeout=None, version=None):
+        """Set ``data`` with one transaction per shard.
+        """
+        expires = self._expires(timeout)
+        rows = {}
+        for k, value in data.items():
+            key = self._make_key(k, version)
+            rows.setdefault(self._shard(key), []).append(
+                (key, self._dumps(value), expires))
+
+        for shard, shard_rows in rows.items():
+            conn = self._conn(shard)
+            with _transaction(conn):
+                conn.executemany('INSERT OR REPLACE INTO cache VALUES (?, ?, ?)',
+                                 shard_rows)
+            self._written(shard, conn, len(shard_rows))
+
+    def delete_many(self, keys, version=None):
+        keys = [self._make_key(k, version) for k in keys]
+        for shard, shard_keys in self._group_by_shard(keys).items():
+            conn = self._conn(shard)
+            with _transaction(conn):
+                conn.executemany('DELETE FROM cache WHERE key = ?',
+                                 [(k, ) for k in shard_keys])
+
+    def clear(self):
+        for shard in range(self._shards):
+            self._conn(shard).execute('DELETE FROM cache')
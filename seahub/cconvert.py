@@ -18,20 +18,37 @@
 import sys,os
 import re
 import string
+
+ASCII_PUNCTUATIONS = frozenset("'\"`~!@#$%^&*()=+[]{}\\|;:,.<>/?")
+CJK_PUNCTUATIONS = frozenset("－—！#＃%％&＆（）*，、。：；？？　@＠＼{｛｜}｝~～‘’“”《》【】+＋=＝×￥·…　".decode("utf-8"))
+
 class CConvert:
+	# char -> pinyin index, shared by all instances and loaded on first use
+	_index = None
+
 	def __init__(self):
 		self.has_shengdiao = False
 		self.just_shengmu  = False
 		self.spliter = '-'
-		"Load data table"
+
+	@classmethod
+	def loadIndex(cls):
+		"Load data table into a dict of char and its first pinyin"
+		if cls._index is not None:
+			return cls._index
 		try:
 			fp=open(os.path.join(os.path.dirname(__file__), 'convert-utf-8.txt'))
 		except IOError:
 			print "Can't load data from convert-utf-8.txt\nPlease make sure this file exists."
 			sys.exit(1)
 		else:
-			self.data=fp.read().decode("utf-8")# decoded data to unicode
+			data=fp.read().decode("utf-8")# decoded data to unicode
 			fp.close()
+		index = {}
+		for m in re.finditer("^(.)([0-9a-zA-Z]+)", data, re.M):
+			index.setdefault(m.group(1), m.group(2))
+		cls._index = index
+		return index
 	
 	def convert1(self, strIn):
 		"Convert Unicode strIn to PinYin"
@@ -63,16 +80,16 @@ class CConvert:
 	def getIndex(self, strIn):
 		"Convert single Unicode to PinYin from index"
 		if strIn==' ':return self.spliter
-		if set(strIn).issubset("'\"`~!@#$%^&*()=+[]{}\\|;:,.<>/?"):return self.spliter # or return ""
-		if set(strIn).issubset("－—！#＃%％&＆（）*，、。：；？？　@＠＼{｛｜}｝~～‘’“”《》【】+＋=＝×￥·…　".decode("utf-8")):return ""
-		pos=re.search("^"+strIn+"([0-9a-zA-Z]+)", self.data, re.M)
-		if pos==None:
+		if set(strIn).issubset(ASCII_PUNCTUATIONS):return self.spliter # or return ""
+		if set(strIn).issubset(CJK_PUNCTUATIONS):return ""
+		py=self.loadIndex().get(strIn)
+		if py==None:
 			return strIn
 		else:
 			if not self.just_shengmu:
-				return pos.group(1)
+				return py
 			else:
-				return pos.group(1)[:1]
+				return py[:1]
 	
 	def convert(self, strIn):
 		"Convert Unicode strIn to PinYin"
@@ -2,6 +2,7 @@ import datetime
 import os
 import re
 from django.db import models
+from django.db.models import Count
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 
@@ -17,11 +18,57 @@ class GroupMessage(models.Model):
     message = models.CharField(max_length=2048)
     timestamp = models.DateTimeField(default=datetime.datetime.now)
 
+class MessageReplyManager(models.Manager):
+    def count_replies_by_msgs(self, msg_ids):
+        """Count replies of each group message.
+
+        Returns a dict of ``{msg_id: reply_count}``, messages without reply
+        are not included.
+        """
+        qs = super(MessageReplyManager, self).filter(
+            reply_to__in=msg_ids).values('reply_to').annotate(
+            cnt=Count('id')).order_by()
+        return dict([(e['reply_to'], e['cnt']) for e in qs])
+
+    def get_last_replies_by_msgs(self, msg_ids, limit=3):
+        """Get at most ``limit`` latest replies of each group message, in
+        one query.
+
+        Returns a dict of ``{msg_id: [reply, ...]}``, replies are ordered
+        from old to new.
+        """
+        table = self.model._meta.db_table
+        qs = super(MessageReplyManager, self).filter(
+            reply_to__in=msg_ids).extra(where=[
+                '(SELECT COUNT(*) FROM %(t)s r WHERE r.reply_to_id = '
+                '%(t)s.reply_to_id AND r.id > %(t)s.id) < %%s' % {'t': table}
+                ], params=[limit]).order_by('id')
+
+        ret = {}
+        for r in qs:
+            ret.setdefault(r.reply_to_id, []).append(r)
+        return ret
+
 class MessageReply(models.Model):
     reply_to = models.ForeignKey(GroupMessage)
     from_email = LowerCaseCharField(max_length=255)
     message = models.CharField(max_length=2048)
     timestamp = models.DateTimeField(default=datetime.datetime.now)
+    objects = MessageReplyManager()
+
+class MessageAttachmentManager(models.Manager):
+    def get_attachments_by_msgs(self, msg_ids):
+        """Get attachments of each group message.
+
+        Returns a dict of ``{msg_id: [attachment, ...]}``.
+        """
+        qs = super(MessageAttachmentManager, self).filter(
+            group_message__in=msg_ids)
+
+        ret = {}
+        for att in qs:
+            ret.setdefault(att.group_message_id, []).append(att)
+        return ret
 
 class MessageAttachment(models.Model):
     """
@@ -32,6 +79,7 @@ class MessageAttachment(models.Model):
     attach_type = models.CharField(max_length=5) # `file` or `dir`
     path = models.TextField()
     src = models.CharField(max_length=20) # `recommend` or `filecomment`
+    objects = MessageAttachmentManager()
 
 class PublicGroup(models.Model):
     """
@@ -7,11 +7,13 @@ from views import group_info, group_members, group_member_operations, group_add_
     group_wiki_page_new, group_wiki_page_edit, group_wiki_pages, \
     group_wiki_page_delete, group_wiki_use_lib, group_remove, group_dismiss, group_quit, \
     group_make_public, group_revoke_public, group_transfer, group_toggle_modules, \
-    group_add_discussion, group_rename, group_add, ajax_add_group_member
+    group_add_discussion, group_rename, group_add, ajax_add_group_member, \
+    group_discuss_img_urls
 
 urlpatterns = patterns('',
     url(r'^(?P<group_id>\d+)/$', group_info, name='group_info'),
     url(r'^(?P<group_id>\d+)/discuss/$', group_discuss, name='group_discuss'),
+    url(r'^(?P<group_id>\d+)/discuss/img-urls/$', group_discuss_img_urls, name='group_discuss_img_urls'),
     url(r'^(?P<group_id>\d+)/wiki/$', group_wiki, name='group_wiki'),
     url(r'^(?P<group_id>\d+)/wiki/(?P<page_name>[^/]+)/$', group_wiki, name='group_wiki'),
     url(r'^(?P<group_id>\d+)/wiki_pages/$', group_wiki_pages, name='group_wiki_pages'),
@@ -1,6 +1,12 @@
 # -*- coding: utf-8 -*-
+import os
 import re
 
+from seaserv import seafile_api
+
+from seahub.group.models import MessageReply
+from seahub.utils import gen_file_get_url, get_file_type_and_ext
+
 class BadGroupNameError(Exception):
     pass
 
@@ -17,3 +23,49 @@ def validate_group_name(group_name):
         return False
     return re.match('^[\w\s-]+$', group_name, re.U)
 
+
+def fill_group_msgs_replies(group_msgs, last_n=3):
+    """Set ``reply_cnt`` and the last ``last_n`` ``replies`` of each group
+    message, using one aggregate query and one query for the replies.
+    """
+    msg_ids = [msg.id for msg in group_msgs]
+    reply_cnts = MessageReply.objects.count_replies_by_msgs(msg_ids)
+    last_replies = MessageReply.objects.get_last_replies_by_msgs(msg_ids,
+                                                                 last_n)
+    for msg in group_msgs:
+        msg.reply_cnt = reply_cnts.get(msg.id, 0)
+        msg.replies = last_replies.get(msg.id, [])
+
+def prepare_msg_attachment(att):
+    """Set ``name`` of a group message attachment, and ``filetype``,
+    ``fileext`` if it is a recommended file.
+
+    Returns ``False`` if the attached library no longer exists.
+    """
+    # Attachment name is file name or directory name.
+    # If is top directory, use repo name instead.
+    if att.path == '/':
+        repo = seafile_api.get_repo(att.repo_id)
+        if not repo:
+            return False
+        att.name = repo.name
+    else:
+        att.name = os.path.basename(att.path.rstrip('/'))
+
+    if att.attach_type == 'file' and att.src == 'recommend':
+        att.filetype, att.fileext = get_file_type_and_ext(att.name)
+    return True
+
+def gen_msg_attachment_img_url(att, username):
+    """Generate fileserver url of an image attachment prepared by
+    ``prepare_msg_attachment``.
+
+    Returns ``None`` if the file does not exist.
+    """
+    obj_id = seafile_api.get_file_id_by_path(att.repo_id, att.path.rstrip('/'))
+    if not obj_id:
+        return None
+
+    token = seafile_api.get_fileserver_access_token(att.repo_id, obj_id,
+                                                    'view', username)
+    return gen_file_get_url(token, att.name)
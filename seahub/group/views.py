@@ -37,7 +37,8 @@ from seahub.base.models import FileDiscuss
 from seahub.contacts.models import Contact
 from seahub.contacts.signals import mail_sended
 from seahub.group.utils import validate_group_name, BadGroupNameError, \
-    ConflictGroupNameError
+    ConflictGroupNameError, fill_group_msgs_replies, prepare_msg_attachment, \
+    gen_msg_attachment_img_url
 from seahub.notifications.models import UserNotification
 from seahub.wiki import get_group_wiki_repo, get_group_wiki_page, convert_wiki_link,\
     get_wiki_pages
@@ -46,8 +47,9 @@ from seahub.wiki.utils import clean_page_name
 from seahub.settings import SITE_ROOT, SITE_NAME
 from seahub.shortcuts import get_first_object_or_none
 from seahub.utils import render_error, render_permission_error, string2list, \
-    gen_file_get_url, get_file_type_and_ext, \
     calc_file_path_hash, is_valid_username, send_html_email, is_org_context
+from seahub.utils.autocomplete import get_autocomplete_index, \
+    get_group_scope, invalidate_autocomplete_index
 from seahub.utils.file_types import IMAGE
 from seahub.utils.paginator import Paginator
 from seahub.views import is_registered_user
@@ -357,6 +359,7 @@ def group_transfer(request, group_id):
     if email != username:
         if not is_group_user(group_id, email):
             ccnet_threaded_rpc.group_add_member(group_id, username, email)
+            invalidate_autocomplete_index(get_group_scope(group_id))
 
         ccnet_threaded_rpc.set_group_creator(group_id, email)
 
@@ -425,6 +428,7 @@ def group_quit(request, group_id):
 
     try:
         ccnet_threaded_rpc.quit_group(group_id_int, request.user.username)
+        invalidate_autocomplete_index(get_group_scope(group_id_int))
         seafserv_threaded_rpc.remove_repo_group(group_id_int,
                                                 request.user.username)
     except SearpcError, e:
@@ -686,6 +690,7 @@ def ajax_add_group_member(request, group_id):
             try:
                 ccnet_threaded_rpc.group_add_member(group.id,
                                                     username, email)
+                invalidate_autocomplete_index(get_group_scope(group.id))
             except SearpcError, e:
                 result['error'] = _(e.msg)
                 return HttpResponse(json.dumps(result), status=500,
@@ -713,6 +718,7 @@ def ajax_add_group_member(request, group_id):
             try:
                 ccnet_threaded_rpc.group_add_member(group.id,
                                                     username, email)
+                invalidate_autocomplete_index(get_group_scope(group.id))
             except SearpcError, e:
                 result['error'] = _(e.msg)
                 return HttpResponse(json.dumps(result), status=500,
@@ -742,6 +748,7 @@ def ajax_add_group_member(request, group_id):
             try:
                 ccnet_threaded_rpc.group_add_member(group.id,
                                                     username, email)
+                invalidate_autocomplete_index(get_group_scope(group.id))
             except SearpcError, e:
                 result['error'] = _(e.msg)
                 return HttpResponse(json.dumps(result), status=500,
@@ -853,6 +860,7 @@ def group_add_admin(request, group_id):
                 ccnet_threaded_rpc.group_add_member(group_id,
                                                     request.user.username,
                                                     member_name)
+                invalidate_autocomplete_index(get_group_scope(group_id))
                 ccnet_threaded_rpc.group_set_admin(group_id, member_name)
             except SearpcError, e:
                 result['error'] = _(e.msg)
@@ -906,6 +914,7 @@ def group_remove_member(request, group_id, user_name):
         ccnet_threaded_rpc.group_remove_member(group.id,
                                                request.user.username,
                                                user_name)
+        invalidate_autocomplete_index(get_group_scope(group.id))
         seafserv_threaded_rpc.remove_repo_group(group.id, user_name)
         messages.success(request, _(u'Operation succeeded.'))
     except SearpcError, e:
@@ -1110,8 +1119,11 @@ def attention(request):
     gids = request.GET.get('gids', '')
     result = []
 
-    members = []
-    for gid in gids.split('_'):
+    found = set()
+    for gid in (gids.split('_') if name_str else []):
+        if len(result) >= 10:   # Return at most 10 results.
+            break
+
         try:
             gid = int(gid)
         except ValueError:
@@ -1120,27 +1132,13 @@ def attention(request):
         if not is_group_user(gid, user):
             continue
 
-        # Get all group users
-        members += get_group_members(gid)
-
-    member_names = []
-    for m in members:
-        if len(result) == 10:   # Return at most 10 results.
-            break
-
-        if m.user_name == user:
-            continue
-
-        if m.user_name in member_names:
-            # Remove duplicated member names
-            continue
-        else:
-            member_names.append(m.user_name)
-
-        from seahub.base.templatetags.seahub_tags import email2nickname, char2pinyin
-        nickname = email2nickname(m.user_name)
-        pinyin = char2pinyin(nickname)
-        if nickname.startswith(name_str) or pinyin.startswith(name_str):
+        # members are only got when the index of group is not cached
+        index = get_autocomplete_index(get_group_scope(gid),
+                lambda: [m.user_name for m in get_group_members(gid)])
+        for email, nickname in index.search(name_str, 10, exclude=user):
+            if email in found or len(result) >= 10:
+                continue
+            found.add(email)
             result.append({'contact_name': nickname})
 
     content_type = 'application/json; charset=utf-8'
@@ -1234,50 +1232,20 @@ def group_discuss(request, group):
     # Force evaluate queryset to fix some database error for mysql.
     group_msgs.object_list = list(group_msgs.object_list)
 
-    msg_attachments = MessageAttachment.objects.filter(group_message__in=group_msgs.object_list)
-
-    msg_replies = MessageReply.objects.filter(reply_to__in=group_msgs.object_list)
-    reply_to_list = [ r.reply_to_id for r in msg_replies ]
+    fill_group_msgs_replies(group_msgs.object_list)
 
+    msg_attachments = MessageAttachment.objects.get_attachments_by_msgs(
+        [msg.id for msg in group_msgs.object_list])
     for msg in group_msgs.object_list:
-        msg.reply_cnt = reply_to_list.count(msg.id)
-        msg.replies = []
-        for r in msg_replies:
-            if msg.id == r.reply_to_id:
-                msg.replies.append(r)
-        msg.replies = msg.replies[-3:]
-
         msg.attachments = []
-        for att in msg_attachments:
-            if att.group_message_id != msg.id:
+        for att in msg_attachments.get(msg.id, []):
+            if not prepare_msg_attachment(att):
+                # TODO: what should we do here, tell user the repo
+                # is no longer exists?
                 continue
 
-            # Attachment name is file name or directory name.
-            # If is top directory, use repo name instead.
-            path = att.path
-            if path == '/':
-                repo = get_repo(att.repo_id)
-                if not repo:
-                    # TODO: what should we do here, tell user the repo
-                    # is no longer exists?
-                    continue
-                att.name = repo.name
-            else:
-                path = path.rstrip('/') # cut out last '/' if possible
-                att.name = os.path.basename(path)
-
-            # Load to discuss page if attachment is a image and from recommend.
-            if att.attach_type == 'file' and att.src == 'recommend':
-                att.filetype, att.fileext = get_file_type_and_ext(att.name)
-                if att.filetype == IMAGE:
-                    att.obj_id = get_file_id_by_path(att.repo_id, path)
-                    if not att.obj_id:
-                        att.err = _(u'File does not exist')
-                    else:
-                        att.token = seafile_api.get_fileserver_access_token(
-                            att.repo_id, att.obj_id, 'view', username)
-                        att.img_url = gen_file_get_url(att.token, att.name)
-
+            # Image attachments are loaded to discuss page lazily, see
+            # ``group_discuss_img_urls``.
             msg.attachments.append(att)
 
     # get available modules(wiki, etc)
@@ -1293,6 +1261,44 @@ def group_discuss(request, group):
             "mods_available": mods_available,
             }, context_instance=RequestContext(request))
 
+@group_check
+def group_discuss_img_urls(request, group):
+    """Generate urls of image attachments in group discussion page in
+    batch. Access is checked the same way as ``group_discuss``.
+    """
+    if not request.is_ajax() or group.is_pub:
+        raise Http404
+
+    content_type = 'application/json; charset=utf-8'
+    username = request.user.username
+
+    att_ids = []
+    for att_id in request.GET.getlist('att_id')[:100]:
+        try:
+            att_ids.append(int(att_id))
+        except ValueError:
+            continue
+
+    result = {}
+    img_urls = {}
+    for att in MessageAttachment.objects.filter(
+            id__in=att_ids, group_message__group_id=group.id):
+        if not prepare_msg_attachment(att) or \
+                getattr(att, 'filetype', None) != IMAGE:
+            result[att.id] = {'error': _(u'File does not exist')}
+            continue
+
+        key = (att.repo_id, att.path)
+        if key not in img_urls:
+            img_urls[key] = gen_msg_attachment_img_url(att, username)
+
+        if img_urls[key] is None:
+            result[att.id] = {'error': _(u'File does not exist')}
+        else:
+            result[att.id] = {'url': img_urls[key]}
+
+    return HttpResponse(json.dumps(result), content_type=content_type)
+
 @group_staff_required
 @group_check
 def group_toggle_modules(request, group):
@@ -45,3 +45,24 @@ def msg_info_list(msgs, user):
                         reverse=True)
 
     return sorted_msg
+
+def conversation_info_list(conversations):
+    """Fill last message and time of each conversation returned by
+    ``UserMessage.objects.get_user_conversations``, in the same format as
+    ``msg_info_list``. Only the last messages of the given conversations
+    are fetched, so pass in one page of conversations.
+    """
+    from seahub.message.models import UserMessage
+
+    last_msgs = UserMessage.objects.in_bulk(
+        [x[1]['last_msg_id'] for x in conversations])
+
+    ret = []
+    for email, conv in conversations:
+        msg = last_msgs.get(conv['last_msg_id'])
+        if msg is None:
+            continue
+        ret.append((email, {'not_read': conv['not_read'],
+                            'last_msg': msg.message,
+                            'last_time': msg.timestamp}))
+    return ret
@@ -2,7 +2,7 @@
 import datetime
 
 from django.db import models
-from django.db.models import Q
+from django.db.models import Q, Count, Max
 
 from seahub.base.fields import LowerCaseCharField
 from seahub.message.signals import user_message_sent
@@ -17,6 +17,45 @@ class UserMessageManager(models.Manager):
             (Q(from_email=username) & Q(sender_deleted_at__isnull=True))
             ).order_by('to_email')
 
+    def get_user_conversations(self, username):
+        """List people the user has talked with. Messages are grouped and
+        counted in database, instead of loading every message of the user.
+
+        **Returns**
+
+        [
+        (u'foo@foo.com', {'last_msg_id': 12, 'not_read': 2}),
+        (u'bar@bar.com', {'last_msg_id': 10, 'not_read': 0}),
+        ...
+        ]
+
+        ordered by the last message of each conversation, newest first.
+        """
+        received = super(UserMessageManager, self).filter(
+            to_email=username, recipient_deleted_at__isnull=True)
+        sent = super(UserMessageManager, self).filter(
+            from_email=username, sender_deleted_at__isnull=True)
+
+        conversations = {}
+        for e in received.values('from_email').annotate(
+                last_msg_id=Max('message_id')).order_by():
+            conversations[e['from_email']] = {
+                'last_msg_id': e['last_msg_id'], 'not_read': 0}
+
+        for e in sent.values('to_email').annotate(
+                last_msg_id=Max('message_id')).order_by():
+            conv = conversations.setdefault(e['to_email'], {
+                    'last_msg_id': e['last_msg_id'], 'not_read': 0})
+            conv['last_msg_id'] = max(conv['last_msg_id'], e['last_msg_id'])
+
+        # served by index on (to_email, ifread)
+        for e in received.filter(ifread=0).values('from_email').annotate(
+                not_read=Count('message_id')).order_by():
+            conversations[e['from_email']]['not_read'] = e['not_read']
+
+        return sorted(conversations.items(),
+                      key=lambda x: x[1]['last_msg_id'], reverse=True)
+
     def get_messages_between_users(self, user1, user2):
         """List messages between two users.
         If a msg is sent from ``user1`` to ``user2``, and deleted by ``user1``,
@@ -46,6 +85,14 @@ class UserMessageManager(models.Manager):
             Q(from_email=user1)&Q(to_email=user2)&Q(ifread=0)
             ).update(ifread=1)
 
+    def update_unread_messages_by_senders(self, senders, user):
+        """Set ``ifread`` field to 1 for all messages that from any of
+        ``senders`` to ``user``.
+        """
+        super(UserMessageManager, self).filter(
+            Q(from_email__in=senders)&Q(to_email=user)&Q(ifread=0)
+            ).update(ifread=1)
+
     def count_unread_messages_by_user(self, user):
         """Count a user's unread messages.
         """
@@ -64,6 +111,9 @@ class UserMessage(models.Model):
     recipient_deleted_at = models.DateTimeField(null=True, blank=True)
     objects = UserMessageManager()
 
+    class Meta:
+        index_together = [['to_email', 'ifread']]
+
     def __unicode__(self):
         return "%s|%s|%s" % (self.from_email, self.to_email, self.message)
 
@@ -11,7 +11,7 @@ from django.core.paginator import EmptyPage, InvalidPage
 from django.utils.translation import ugettext as _
 
 from models import UserMessage, UserMsgAttachment
-from message import msg_info_list
+from message import msg_info_list, conversation_info_list
 from seahub.auth.decorators import login_required, login_required_ajax
 from seahub.base.accounts import User
 from seahub.base.decorators import user_mods_check
@@ -29,15 +29,32 @@ def message_list(request):
     """
     username = request.user.username
 
-    messages = UserMessage.objects.get_messages_related_to_user(username)
-    msgs = msg_info_list(messages, username)
+    conversations = UserMessage.objects.get_user_conversations(username)
 
     total_unread = 0
-    for msg in msgs:
-        total_unread += msg[1]['not_read']
+    for conv in conversations:
+        total_unread += conv[1]['not_read']
+
+    '''paginate'''
+    paginator = Paginator(conversations, 25)
+    # Make sure page request is an int. If not, deliver first page.
+    try:
+        page = int(request.GET.get('page', '1'))
+    except ValueError:
+        page = 1
+
+    # If page request (9999) is out of range, deliver last page of results.
+    try:
+        msgs_page = paginator.page(page)
+    except (EmptyPage, InvalidPage):
+        msgs_page = paginator.page(paginator.num_pages)
+    msgs_page.page_range = paginator.get_page_range(msgs_page.number)
+
+    msgs = conversation_info_list(msgs_page.object_list)
 
     return render_to_response('message/all_msg_list.html', {
             'msgs': msgs,
+            'msgs_page': msgs_page,
             'total_unread': total_unread,
         }, context_instance=RequestContext(request))
 
@@ -64,26 +81,6 @@ def user_msg_list(request, id_or_email):
         return HttpResponseRedirect(reverse('edit_profile'))
 
     msgs = UserMessage.objects.get_messages_between_users(username, to_email)
-    if msgs:
-        # update ``ifread`` field of messages
-        UserMessage.objects.update_unread_messages(to_email, username)
-
-        attachments = UserMsgAttachment.objects.list_attachments_by_user_msgs(msgs)
-        for msg in msgs:
-            msg.attachments = []
-            for att in attachments:
-                if att.user_msg != msg:
-                    continue
-
-                pfds = att.priv_file_dir_share
-                if pfds is None: # in case that this attachment is unshared.
-                    continue
-
-                att.repo_id = pfds.repo_id
-                att.path = pfds.path
-                att.name = os.path.basename(pfds.path.rstrip('/'))
-                att.token = pfds.token
-                msg.attachments.append(att) 
 
     '''paginate'''
     paginator = Paginator(msgs, 15)
@@ -101,6 +98,29 @@ def user_msg_list(request, id_or_email):
     person_msgs.page_range = paginator.get_page_range(person_msgs.number)
     person_msgs.object_list = list(person_msgs.object_list)
 
+    if person_msgs.object_list:
+        # update ``ifread`` field of messages
+        UserMessage.objects.update_unread_messages(to_email, username)
+
+        # only attach attachments of messages in current page
+        page_msgs = person_msgs.object_list
+        attachments = UserMsgAttachment.objects.list_attachments_by_user_msgs(
+            page_msgs).select_related('priv_file_dir_share')
+        msg_atts = {}
+        for att in attachments:
+            pfds = att.priv_file_dir_share
+            if pfds is None: # in case that this attachment is unshared.
+                continue
+
+            att.repo_id = pfds.repo_id
+            att.path = pfds.path
+            att.name = os.path.basename(pfds.path.rstrip('/'))
+            att.token = pfds.token
+            msg_atts.setdefault(att.user_msg_id, []).append(att)
+
+        for msg in page_msgs:
+            msg.attachments = msg_atts.get(msg.message_id, [])
+
     UserNotification.objects.seen_user_msg_notices(username, to_email)
     return render_to_response("message/user_msg_list.html", {
             "person_msgs": person_msgs,
@@ -4,8 +4,9 @@ import os
 import json
 import logging
 
+from django.core.cache import cache
 from django.db import models
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.forms import ModelForm, Textarea
 from django.utils.http import urlquote
 from django.utils.html import escape
@@ -16,6 +17,9 @@ from seaserv import seafile_api
 
 from seahub.base.fields import LowerCaseCharField
 from seahub.base.templatetags.seahub_tags import email2nickname
+from seahub.notifications.settings import UNSEEN_NOTICES_CACHE_PREFIX, \
+    UNSEEN_NOTICES_CACHE_TIMEOUT
+from seahub.utils import normalize_cache_key
 
 # Get an instance of a logger
 logger = logging.getLogger(__name__)
@@ -72,7 +76,15 @@ def user_msg_to_json(message, msg_from):
 def group_join_request_to_json(username, group_id, join_request_msg):
     return json.dumps({'username': username, 'group_id': group_id,
                        'join_request_msg': join_request_msg})
-    
+
+def get_unseen_notices_cache_key(username):
+    return normalize_cache_key(username, UNSEEN_NOTICES_CACHE_PREFIX)
+
+def clear_unseen_notices_cache(username):
+    """Reset cached unseen notices count of a user.
+    """
+    cache.delete(get_unseen_notices_cache_key(username))
+
 class UserNotificationManager(models.Manager):
     def _add_user_notification(self, to_user, msg_type, detail):
         """Add generic user notification.
@@ -124,14 +136,52 @@ class UserNotificationManager(models.Manager):
         self.get_user_notifications(username).delete()
         
     def count_unseen_user_notifications(self, username):
+        """Count unseen notices of a user, the result is cached until
+        notices of the user are changed.
+
+        Arguments:
+        - `self`:
+        - `username`:
         """
-        
+        key = get_unseen_notices_cache_key(username)
+        count = cache.get(key)
+        if count is None:
+            count = super(UserNotificationManager, self).filter(
+                to_user=username, seen=False).count()
+            cache.set(key, count, UNSEEN_NOTICES_CACHE_TIMEOUT)
+        return count
+
+    def seen_all_user_notifications(self, username):
+        """Mark all unseen notices of a user as seen with one query, and
+        mark messages from senders of the user message notices as read.
+
+        NOTE: ``pre_save`` and ``post_save`` signals will not be sent.
+
         Arguments:
         - `self`:
         - `username`:
+
+        Returns number of notices marked as seen.
         """
-        return super(UserNotificationManager, self).filter(
-            to_user=username, seen=False).count()
+        unseen_notices = super(UserNotificationManager, self).filter(
+            to_user=username, seen=False)
+
+        msg_senders = set()
+        for detail in unseen_notices.filter(
+                msg_type=MSG_TYPE_USER_MESSAGE).values_list('detail', flat=True):
+            try:
+                msg_from = json.loads(detail)['msg_from']
+            except (ValueError, KeyError, TypeError):
+                msg_from = detail  # Compatible with existing records
+            msg_senders.add(msg_from)
+
+        count = unseen_notices.update(seen=True)
+        if msg_senders:
+            UserMessage.objects.update_unread_messages_by_senders(
+                list(msg_senders), username)
+
+        clear_unseen_notices_cache(username)
+        return count
         
     def bulk_add_group_msg_notices(self, to_users, detail):
         """Efficiently add group message notices.
@@ -148,6 +198,8 @@ class UserNotificationManager(models.Manager):
                                           detail=detail
                                           ) for m in to_users ]
         UserNotification.objects.bulk_create(user_notices)
+        for m in to_users:
+            clear_unseen_notices_cache(m)
 
     def seen_group_msg_notices(self, to_user, group_id):
         """Mark group message notices of a user as seen.
@@ -176,6 +228,7 @@ class UserNotificationManager(models.Manager):
             super(UserNotificationManager, self).filter(
                 to_user=to_user, msg_type=MSG_TYPE_GRPMSG_REPLY,
                 seen=False).update(seen=True)
+            clear_unseen_notices_cache(to_user)
         else:
             notifs = super(UserNotificationManager, self).filter(
                 to_user=to_user, msg_type=MSG_TYPE_GRPMSG_REPLY,
@@ -749,6 +802,11 @@ from seahub.share.signals import share_repo_to_user_successful
 from seahub.message.models import UserMessage
 from seahub.message.signals import user_message_sent
 
+@receiver(post_save, sender=UserNotification)
+@receiver(post_delete, sender=UserNotification)
+def clear_unseen_notices_cache_cb(sender, instance, **kwargs):
+    clear_unseen_notices_cache(instance.to_user)
+
 @receiver(upload_file_successful)
 def add_upload_file_msg_cb(sender, **kwargs):
     """Notify repo owner when others upload files to his/her folder from shared link.
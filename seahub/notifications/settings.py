@@ -1,3 +1,7 @@
 from django.conf import settings
 
 NOTIFICATION_CACHE_TIMEOUT = getattr(settings, 'NOTIFICATION_CACHE_TIMEOUT', 0)
+
+# Cache of unseen notices count of each user, refreshed when notices change.
+UNSEEN_NOTICES_CACHE_PREFIX = getattr(settings, 'UNSEEN_NOTICES_CACHE_PREFIX', 'UNSEEN_NOTICES_')
+UNSEEN_NOTICES_CACHE_TIMEOUT = getattr(settings, 'UNSEEN_NOTICES_CACHE_TIMEOUT', 24 * 60 * 60)
@@ -23,7 +23,9 @@ def update_session_auth_hash(request, user):
     then make sure that `user` the same as `request.user`.
     """
     if not hasattr(request, 'user') or request.user == user:
-        request.session[PASSWORD_HASH_KEY] = get_password_hash(user)
+        password_hash = get_password_hash(user)
+        if request.session.get(PASSWORD_HASH_KEY) != password_hash:
+            request.session[PASSWORD_HASH_KEY] = password_hash
 
 
 @receiver(user_logged_in)
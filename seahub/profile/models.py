@@ -3,6 +3,7 @@ import logging
 from django.conf import settings
 from django.db import models
 from django.core.cache import cache
+from django.db.models.signals import post_init, post_save
 from django.dispatch import receiver
 
 from seahub.base.fields import LowerCaseCharField
@@ -137,3 +138,20 @@ def clean_email_id_cache(sender, **kwargs):
     user = kwargs['user']
     key = normalize_cache_key(user.email, EMAIL_ID_CACHE_PREFIX)
     cache.set(key, user.id, EMAIL_ID_CACHE_TIMEOUT)
+
+@receiver(post_init, sender=Profile)
+def remember_nickname(sender, **kwargs):
+    instance = kwargs['instance']
+    instance._loaded_nickname = instance.nickname
+
+@receiver(post_save, sender=Profile)
+def clean_autocomplete_cache(sender, **kwargs):
+    """Rebuild autocomplete indexes of groups and orgs of the user if
+    nickname is changed.
+    """
+    from seahub.utils.autocomplete import invalidate_user_autocomplete_indexes
+
+    instance = kwargs['instance']
+    if kwargs['created'] or instance.nickname != instance._loaded_nickname:
+        invalidate_user_autocomplete_indexes(instance.user)
+        instance._loaded_nickname = instance.nickname
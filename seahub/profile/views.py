@@ -21,6 +21,8 @@ from seahub.base.templatetags.seahub_tags import email2nickname
 from seahub.contacts.models import Contact
 from seahub.options.models import UserOptions, CryptoOptionNotSetError
 from seahub.utils import is_ldap_user
+from seahub.utils.autocomplete import get_org_scope, \
+    invalidate_autocomplete_index
 from seahub.views import get_owned_repo_list
 
 @login_required
@@ -166,6 +168,7 @@ def delete_user_account(request):
     if is_org_context(request):
         org_id = request.user.org.org_id
         seaserv.ccnet_threaded_rpc.remove_org_user(org_id, username)
+        invalidate_autocomplete_index(get_org_scope(org_id))
 
     return HttpResponseRedirect(settings.LOGIN_URL)
 
@@ -320,6 +320,11 @@ CACHES = {
     }
 }
 
+# File based cache gets slower to write as it grows. To keep cache entries in
+# sharded SQLite files instead, use:
+# CACHES['default']['BACKEND'] = 'seahub.base.sqlite_cache.SQLiteCache'
+# CACHES['default']['LOCATION'] = os.path.join(CACHE_DIR, 'seahub_cache_db')
+
 # rest_framwork
 REST_FRAMEWORK = {
     'DEFAULT_THROTTLE_RATES': {
@@ -430,10 +435,21 @@ LOGGING = {
 #Login Attempt
 LOGIN_ATTEMPT_LIMIT = 3
 LOGIN_ATTEMPT_TIMEOUT = 15 * 60 # in seconds (default: 15 minutes)
+# Where failed login attempts are counted, `memory` or `cache`.
+# `memory` keeps counts in each worker process, at most RATE_LIMITER_MAX_KEYS
+# keys, so with N worker processes up to N times the limit may be allowed.
+# `cache` shares counts among worker processes, but each counted username/ip
+# takes up to two cache entries, use it only with memcached, not with the file
+# based cache.
+RATE_LIMITER_BACKEND = 'memory'
 
 # Age of cookie, in seconds (default: 1 day).
 SESSION_COOKIE_AGE = 24 * 60 * 60
 
+# Sessions are stored in database by default. To read sessions from cache and
+# only write them to database when changed, use:
+# SESSION_ENGINE = 'seahub.base.cached_db_session'
+
 # Days of remembered login info (deafult: 7 days)
 LOGIN_REMEMBER_DAYS = 7
 
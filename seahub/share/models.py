@@ -31,7 +31,10 @@ def set_share_link_access(request, token, is_upload_link=False):
     """
     if request.session:
         link_key = _get_link_key(token, is_upload_link)
-        request.session[link_key] = True
+        # only assign when not granted yet, re-assigning marks session as
+        # modified and re-saves it
+        if not request.session.get(link_key, False):
+            request.session[link_key] = True
     else:
         # should never reach here in normal case
         logger.warn('Failed to remember shared link password, request.session'
@@ -534,29 +534,32 @@ def list_shared_repos(request):
 @login_required
 @user_mods_check
 def list_shared_links(request):
-    """List shared links, and remove invalid links(file/dir is deleted or moved).
+    """List shared links.
+
+    Links whose file/dir is deleted or moved are removed by
+    ``clean_dead_links`` command, links of removed libraries are skipped.
     """
     username = request.user.username
+    fileshares = list(FileShare.objects.filter(username=username))
+    uploadlinks = list(UploadLinkShare.objects.filter(username=username))
+
+    # get each library once
+    repos = {}
+    for link in fileshares + uploadlinks:
+        if link.repo_id not in repos:
+            repos[link.repo_id] = seafile_api.get_repo(link.repo_id)
 
     # download links
-    fileshares = FileShare.objects.filter(username=username)
     fs_files, fs_dirs = [], []
     for fs in fileshares:
-        r = seafile_api.get_repo(fs.repo_id)
+        r = repos[fs.repo_id]
         if not r:
-            fs.delete()
             continue
 
         if fs.is_file_share_link():
-            if seafile_api.get_file_id_by_path(r.id, fs.path) is None:
-                fs.delete()
-                continue
             fs.filename = os.path.basename(fs.path)
             fs.shared_link = gen_file_share_link(fs.token)
         else:
-            if seafile_api.get_dir_id_by_path(r.id, fs.path) is None:
-                fs.delete()
-                continue
             if fs.path != '/':
                 fs.filename = os.path.basename(fs.path.rstrip('/'))
             else:
@@ -572,15 +575,10 @@ def list_shared_links(request):
     fs_dirs.sort(lambda x, y: cmp(x.filename, y.filename))
 
     # upload links
-    uploadlinks = UploadLinkShare.objects.filter(username=username)
     p_uploadlinks = []
     for link in uploadlinks:
-        r = seafile_api.get_repo(link.repo_id)
+        r = repos[link.repo_id]
         if not r:
-            link.delete()
-            continue
-        if seafile_api.get_dir_id_by_path(r.id, link.path) is None:
-            link.delete()
             continue
         if link.path != '/':
             link.dir_name = os.path.basename(link.path.rstrip('/'))
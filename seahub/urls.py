@@ -140,6 +140,8 @@ urlpatterns = patterns(
     url(r'^ajax/repo/(?P<repo_id>[-0-9a-f]{36})/dir/cp/$', cp_dir, name='cp_dir'),
     url(r'^ajax/repo/(?P<repo_id>[-0-9a-f]{36})/dir/sub_repo/$', sub_repo, name='sub_repo'),
     url(r'^ajax/cp_progress/$', get_cp_progress, name='get_cp_progress'),
+    url(r'^ajax/dirents-job/progress/$', get_dirents_job_progress, name='get_dirents_job_progress'),
+    url(r'^ajax/dirents-job/cancel/$', cancel_dirents_job, name='cancel_dirents_job'),
     url(r'^ajax/cancel_cp/$', cancel_cp, name='cancel_cp'),
     url(r'^ajax/repo/(?P<repo_id>[-0-9a-f]{36})/file/new/$', new_file, name='new_file'),
     url(r'^ajax/repo/(?P<repo_id>[-0-9a-f]{36})/file/rename/$', rename_dirent, name='rename_file'),
@@ -220,6 +222,7 @@ urlpatterns = patterns(
     url(r'^sys/useradmin/ldap/$', sys_user_admin_ldap, name='sys_useradmin_ldap'),
     url(r'^sys/useradmin/ldap/imported$', sys_user_admin_ldap_imported, name='sys_useradmin_ldap_imported'),
     url(r'^sys/useradmin/admins/$', sys_user_admin_admins, name='sys_useradmin_admins'),
+    url(r'^sys/useradmin/quota-usage/$', sys_users_quota_usage, name='sys_users_quota_usage'),
     url(r'^sys/groupadmin/$', sys_group_admin, name='sys_group_admin'),
     url(r'^sys/groupadmin/(?P<group_id>\d+)/$', sys_admin_group_info, name='sys_admin_group_info'),
     url(r'^sys/orgadmin/$', sys_org_admin, name='sys_org_admin'),
@@ -235,6 +238,7 @@ urlpatterns = patterns(
     url(r'^sys/publinkadmin/$', sys_publink_admin, name='sys_publink_admin'),
     url(r'^sys/publink/remove/$', sys_publink_remove, name='sys_publink_remove'),
     url(r'^sys/uploadlink/remove/$', sys_upload_link_remove, name='sys_upload_link_remove'),
+    url(r'^sys/sharelink/summaries/$', sys_share_link_summaries, name='sys_share_link_summaries'),
     url(r'^sys/notificationadmin/', notification_list, name='notification_list'),
     url(r'^sys/sudo/', sys_sudo_mode, name='sys_sudo_mode'),
     url(r'^sys/check-license/', sys_check_license, name='sys_check_license'),
@@ -246,39 +246,66 @@ def is_ldap_user(user):
     """
     return user.source == 'LDAP' or user.source == 'LDAPImport'
 
-def check_filename_with_rename(repo_id, parent_dir, filename):
-    cmmts = seafile_api.get_commit_list(repo_id, 0, 1)
-    latest_commit = cmmts[0] if cmmts else None
-    if not latest_commit:
-        return ''
-    # TODO: what if parrent_dir does not exist?
-    dirents = seafile_api.list_dir_by_commit_and_path(repo_id, latest_commit.id,
-                                                      parent_dir.encode('utf-8'))
-
-    def no_duplicate(name):
+class FilenameAllocator(object):
+    """Allocate non-conflicting names in a dir, e.g. ``a (1).txt`` when
+    ``a.txt`` already exists.
+
+    The dir is listed only once, names handed out are reserved, so one
+    allocator can be used for a batch of copy/move/create operations in the
+    same dir.
+    """
+    def __init__(self, repo_id, parent_dir):
+        self.repo_id = repo_id
+        self.parent_dir = parent_dir
+        self._names = None
+        self._next_suffix = {}  # (base, ext) -> suffix to try first
+
+    def _to_unicode(self, name):
+        return name.decode('utf-8') if isinstance(name, str) else name
+
+    def _load(self):
+        self._names = set()
+        cmmts = seafile_api.get_commit_list(self.repo_id, 0, 1)
+        latest_commit = cmmts[0] if cmmts else None
+        if not latest_commit:
+            return False
+
+        # TODO: what if parrent_dir does not exist?
+        dirents = seafile_api.list_dir_by_commit_and_path(
+            self.repo_id, latest_commit.id, self.parent_dir.encode('utf-8'))
         for dirent in dirents:
-            if dirent.obj_name == name:
-                return False
+            self._names.add(self._to_unicode(dirent.obj_name))
         return True
 
-    def make_new_name(filename, i):
-        base, ext = os.path.splitext(filename)
-        if ext:
-            new_base = "%s (%d)" % (base, i)
-            return new_base + ext
-        else:
-            return "%s (%d)" % (filename, i)
+    def allocate(self, filename):
+        """Return ``filename`` or ``filename`` with the smallest suffix that
+        does not exist in the dir, and reserve it.
+        """
+        if self._names is None and not self._load():
+            self._names = None
+            return ''
 
-    if no_duplicate(filename):
-        return filename
-    else:
-        i = 1
+        name = self._to_unicode(filename)
+        if name not in self._names:
+            self._names.add(name)
+            return filename
+
+        base, ext = os.path.splitext(name)
+        i = self._next_suffix.get((base, ext), 1)
         while True:
-            new_name = make_new_name (filename, i)
-            if no_duplicate(new_name):
-                return new_name
-            else:
-                i += 1
+            new_name = u"%s (%d)%s" % (base, i, ext)
+            if new_name not in self._names:
+                break
+            i += 1
+
+        self._next_suffix[(base, ext)] = i + 1
+        self._names.add(new_name)
+        if isinstance(filename, str):
+            return new_name.encode('utf-8')
+        return new_name
+
+def check_filename_with_rename(repo_id, parent_dir, filename):
+    return FilenameAllocator(repo_id, parent_dir).allocate(filename)
 
 def get_user_repos(username, org_id=None):
     """
@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+"""
+Autocomplete index of users, used to search group members and org users
+by prefix of email, nickname or pinyin of nickname.
+
+A built index is kept in process memory by its scope (a group or an org) and
+a version of the scope, users of the scope are only got when the index is not
+kept. At most ``AUTOCOMPLETE_MAX_INDEXES`` indexes are kept and the least
+recently used ones are dropped. Indexes are not put in the shared cache,
+since a large one is slow to unpickle on every keystroke and may be too
+large for memcached.
+
+Only the version of a scope is kept in the shared cache, so that all worker
+processes see it. The version is bumped when users are added to or removed
+from the scope in seahub, or when a nickname of its users is changed.
+Changes made outside seahub (e.g. by LDAP sync) show up when the index
+expires after ``AUTOCOMPLETE_CACHE_TIMEOUT``.
+"""
+import logging
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+import seaserv
+from seaserv import ccnet_threaded_rpc
+from pysearpc import SearpcError
+
+from seahub.cconvert import CConvert
+from seahub.profile.models import Profile
+from seahub.utils import normalize_cache_key
+
+AUTOCOMPLETE_CACHE_PREFIX = getattr(settings, 'AUTOCOMPLETE_CACHE_PREFIX',
+                                    'AUTOCOMPLETE_')
+AUTOCOMPLETE_CACHE_TIMEOUT = getattr(settings, 'AUTOCOMPLETE_CACHE_TIMEOUT',
+                                     60 * 60)
+AUTOCOMPLETE_VERSION_TIMEOUT = 30 * 24 * 60 * 60
+# max number of indexes kept in each process
+AUTOCOMPLETE_MAX_INDEXES = getattr(settings, 'AUTOCOMPLETE_MAX_INDEXES', 50)
+
+# Get an instance of a logger
+logger = logging.getLogger(__name__)
+
+_cc = CConvert()
+_cc.spliter = ''
+
+# scope -> (version, build time, index)
+_indexes = OrderedDict()
+_indexes_lock = threading.Lock()
+
+class AutocompleteIndex(object):
+    """Sorted prefix keys of a list of users.
+
+    ``users`` is a list of ``(email, nickname)``.
+    """
+    def __init__(self, users):
+        self.users = users
+        keys = []
+        for i, (email, nickname) in enumerate(users):
+            for key in set([email.lower(), nickname.lower(),
+                            _cc.convert(nickname).lower()]):
+                keys.append((key, i))
+        keys.sort()
+        self.keys = keys
+
+    def search(self, q, limit=10, exclude=None, contains=False):
+        """Return at most ``limit`` users whose email, nickname or pinyin of
+        nickname starts with ``q``. If there are not enough of them and
+        ``contains`` is True, users whose email or nickname contains ``q``
+        are added.
+        """
+        q = q.lower()
+        seen = set()
+        result = []
+
+        def add(i):
+            if i in seen or self.users[i][0] == exclude:
+                return
+            seen.add(i)
+            result.append(self.users[i])
+
+        pos = bisect_left(self.keys, (q, ))
+        while pos < len(self.keys) and len(result) < limit:
+            key, i = self.keys[pos]
+            if not key.startswith(q):
+                break
+            add(i)
+            pos += 1
+
+        if contains:
+            for i, (email, nickname) in enumerate(self.users):
+                if len(result) >= limit:
+                    break
+                if q in email.lower() or q in nickname.lower():
+                    add(i)
+
+        return result
+
+def get_nicknames(emails):
+    """Return a dict of email and nickname of ``emails`` in one query.
+    """
+    nicknames = dict(Profile.objects.filter(user__in=emails).exclude(
+        nickname='').values_list('user', 'nickname'))
+    return dict([(e, nicknames.get(e) or e.split('@')[0]) for e in emails])
+
+def get_group_scope(group_id):
+    return 'group_%d' % group_id
+
+def get_org_scope(org_id):
+    return 'org_%d' % org_id
+
+def _get_version_key(scope):
+    return normalize_cache_key(scope, AUTOCOMPLETE_CACHE_PREFIX + 'VERSION_')
+
+def _reset_version(scope):
+    # start from current time, so that a version is not reused after the
+    # version key is evicted
+    version = int(time.time() * 1000)
+    cache.set(_get_version_key(scope), version, AUTOCOMPLETE_VERSION_TIMEOUT)
+    return version
+
+def _get_version(scope):
+    version = cache.get(_get_version_key(scope))
+    if version is None:
+        version = _reset_version(scope)
+    return version
+
+def invalidate_autocomplete_index(scope):
+    """Invalidate cached index of ``scope``, called when its users are
+    changed.
+    """
+    try:
+        cache.incr(_get_version_key(scope))
+    except ValueError:
+        _reset_version(scope)
+
+def invalidate_user_autocomplete_indexes(email):
+    """Invalidate cached indexes of groups and orgs of a user, called when
+    nickname of the user is changed.
+    """
+    try:
+        scopes = [get_group_scope(g.id) for g in
+                  seaserv.get_personal_groups_by_user(email)]
+        scopes += [get_org_scope(o.org_id) for o in
+                   ccnet_threaded_rpc.get_orgs_by_user(email) or []]
+    except SearpcError as e:
+        logger.error(e)
+        return
+
+    for scope in scopes:
+        invalidate_autocomplete_index(scope)
+
+def clear_autocomplete_indexes():
+    """Drop all indexes kept in this process.
+    """
+    with _indexes_lock:
+        _indexes.clear()
+
+def get_autocomplete_index(scope, get_emails):
+    """Get the index of users in ``scope``. ``get_emails`` is called to get
+    the users only when the index of current version is not kept, or has
+    expired.
+    """
+    version = _get_version(scope)
+    now = time.time()
+    with _indexes_lock:
+        entry = _indexes.pop(scope, None)
+        if entry is not None and entry[0] == version and \
+           now - entry[1] < AUTOCOMPLETE_CACHE_TIMEOUT:
+            # move to the end as most recently used
+            _indexes[scope] = entry
+            return entry[2]
+
+    emails = sorted(set(get_emails()))
+    nicknames = get_nicknames(emails)
+    index = AutocompleteIndex([(e, nicknames[e]) for e in emails])
+    with _indexes_lock:
+        _indexes.pop(scope, None)
+        _indexes[scope] = (version, now, index)
+        while len(_indexes) > AUTOCOMPLETE_MAX_INDEXES:
+            _indexes.popitem(last=False)
+    return index
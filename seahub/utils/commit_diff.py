@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+Cached diff summaries between two commits.
+
+A diff between two commit ids never changes, so the structured result is
+cached as a list of ``(status, name, new_name)`` tuples, which is rendered
+to HTML or JSON by the callers. To keep cache values small, a diff is split
+into chunks of at most ``COMMIT_DIFF_CACHE_CHUNK_SIZE`` entries: the first
+chunk is saved with the number of chunks under the diff's key, the others
+under keys with the chunk index appended, so that a small diff is still one
+cache get. A diff of more than ``COMMIT_DIFF_CACHE_MAX_ITEMS`` entries (e.g.
+of an initial import) is not cached.
+"""
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+
+from seaserv import seafserv_threaded_rpc
+
+from seahub.utils import normalize_cache_key
+
+# Get an instance of a logger
+logger = logging.getLogger(__name__)
+
+COMMIT_DIFF_CACHE_PREFIX = getattr(settings, 'COMMIT_DIFF_CACHE_PREFIX',
+                                   'COMMIT_DIFF_')
+COMMIT_DIFF_CACHE_TIMEOUT = getattr(settings, 'COMMIT_DIFF_CACHE_TIMEOUT',
+                                    7 * 24 * 60 * 60)
+COMMIT_DIFF_CACHE_CHUNK_SIZE = getattr(settings,
+                                       'COMMIT_DIFF_CACHE_CHUNK_SIZE', 1000)
+# max number of entries of a cached diff
+COMMIT_DIFF_CACHE_MAX_ITEMS = getattr(settings, 'COMMIT_DIFF_CACHE_MAX_ITEMS',
+                                      20000)
+
+def _get_cache_key(repo_id, commit1, commit2, chunk=0):
+    key = '%s_%s_%s' % (repo_id, commit1, commit2)
+    if chunk > 0:
+        key += '_%d' % chunk
+    return normalize_cache_key(key, COMMIT_DIFF_CACHE_PREFIX)
+
+def _get_cached_diff(repo_id, commit1, commit2):
+    """Return cached diff, or None if it or any of its chunks is missing.
+    """
+    value = cache.get(_get_cache_key(repo_id, commit1, commit2))
+    if value is None:
+        return None
+
+    chunks_count, diff = value
+    if chunks_count == 1:
+        return diff
+
+    keys = [_get_cache_key(repo_id, commit1, commit2, i)
+            for i in range(1, chunks_count)]
+    chunks = cache.get_many(keys)
+    if len(chunks) != len(keys):
+        return None
+
+    diff = list(diff)
+    for key in keys:
+        diff.extend(chunks[key])
+    return diff
+
+def _set_cached_diff(repo_id, commit1, commit2, diff):
+    if len(diff) > COMMIT_DIFF_CACHE_MAX_ITEMS:
+        return
+
+    size = COMMIT_DIFF_CACHE_CHUNK_SIZE
+    chunks = [diff[i:i + size] for i in range(0, len(diff), size)] or [[]]
+
+    # other chunks go first, so that the first one is never found without
+    # them, unless evicted
+    cache.set_many(dict([(_get_cache_key(repo_id, commit1, commit2, i),
+                          chunks[i]) for i in range(1, len(chunks))]),
+                   COMMIT_DIFF_CACHE_TIMEOUT)
+    cache.set(_get_cache_key(repo_id, commit1, commit2),
+              (len(chunks), chunks[0]), COMMIT_DIFF_CACHE_TIMEOUT)
+
+def get_commit_diff(repo_id, commit1, commit2):
+    """Return a list of ``(status, name, new_name)`` of changes between
+    ``commit1`` and ``commit2``, ``commit1`` is the parent of ``commit2`` if
+    it is empty.
+
+    ``status`` is one of 'add', 'del', 'mov', 'mod', 'newdir' and 'deldir',
+    ``new_name`` is None unless ``status`` is 'mov'.
+    """
+    diff = _get_cached_diff(repo_id, commit1, commit2)
+    if diff is not None:
+        return diff
+
+    diff_result = seafserv_threaded_rpc.get_diff(repo_id, commit1, commit2)
+    diff = []
+    for d in diff_result or []:
+        new_name = d.new_name if d.status == 'mov' else None
+        diff.append((d.status, d.name, new_name))
+
+    _set_cached_diff(repo_id, commit1, commit2, diff)
+    return diff
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+Find and delete download/upload links, private shares and starred files
+whose library or file/dir is removed, so that pages listing them do not
+check each of them on read.
+
+Rows are validated library by library: the library and its head commit are
+got once, and each distinct path is looked up once in that commit. A library
+is skipped if its head commit is the one it was validated at last time,
+since nothing has been removed from it since then.
+"""
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+
+from seaserv import seafile_api, seafserv_threaded_rpc
+from pysearpc import SearpcError
+
+from seahub.base.models import UserStarredFiles
+from seahub.share.models import FileShare, UploadLinkShare, \
+    PrivateFileDirShare
+from seahub.utils import normalize_cache_key
+
+# Get an instance of a logger
+logger = logging.getLogger(__name__)
+
+DEAD_LINKS_CACHE_PREFIX = getattr(settings, 'DEAD_LINKS_CACHE_PREFIX',
+                                  'DEAD_LINKS_')
+DEAD_LINKS_CACHE_TIMEOUT = getattr(settings, 'DEAD_LINKS_CACHE_TIMEOUT',
+                                   30 * 24 * 60 * 60)
+
+LINK_MODELS = (FileShare, UploadLinkShare, PrivateFileDirShare,
+               UserStarredFiles)
+
+def _get_cache_key(repo_id):
+    return normalize_cache_key(repo_id, DEAD_LINKS_CACHE_PREFIX)
+
+def _is_dir(row):
+    if isinstance(row, UploadLinkShare):
+        return True
+    if isinstance(row, UserStarredFiles):
+        return row.is_dir or row.path == '/'
+    return row.s_type == 'd'
+
+def get_link_repo_ids():
+    """Return ids of libraries which have links, shares or starred files.
+    """
+    repo_ids = set()
+    for model in LINK_MODELS:
+        repo_ids.update(model.objects.values_list('repo_id',
+                                                  flat=True).distinct())
+    return repo_ids
+
+def clean_dead_links(repo_id, force=False):
+    """Delete rows of a library whose library or file/dir is removed, return
+    number of deleted rows. Rows whose check fails are kept.
+
+    The library is skipped if its head commit is not changed since last
+    validation, unless ``force`` is True.
+    """
+    repo = seafile_api.get_repo(repo_id)
+    if repo is None:
+        deleted = 0
+        for model in LINK_MODELS:
+            rows = model.objects.filter(repo_id=repo_id)
+            deleted += rows.count()
+            rows.delete()
+        cache.delete(_get_cache_key(repo_id))
+        return deleted
+
+    commit_id = repo.head_cmmt_id
+    key = _get_cache_key(repo_id)
+    if not force and cache.get(key) == commit_id:
+        return 0
+
+    exists = {}                 # (path, is_dir) => whether it exists
+    deleted = 0
+    failed = False
+    for model in LINK_MODELS:
+        for row in model.objects.filter(repo_id=repo_id):
+            path_key = (row.path, _is_dir(row))
+            if path_key not in exists:
+                path = row.path.encode('utf-8')
+                try:
+                    if path_key[1]:
+                        obj_id = seafserv_threaded_rpc.get_dirid_by_path(
+                            repo_id, commit_id, path)
+                    else:
+                        obj_id = seafserv_threaded_rpc.get_file_id_by_commit_and_path(
+                            repo_id, commit_id, path)
+                except SearpcError as e:
+                    logger.error(e)
+                    failed = True
+                    continue
+                exists[path_key] = bool(obj_id)
+
+            if not exists[path_key]:
+                row.delete()
+                deleted += 1
+
+    if not failed:
+        cache.set(key, commit_id, DEAD_LINKS_CACHE_TIMEOUT)
+    return deleted
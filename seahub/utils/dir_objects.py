@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+Cache of dir objects.
+
+A dir object is content-addressed: its id is the hash of its entries, so the
+entries of a dir id never change and can be cached without invalidation.
+Only what is needed to list a dir is kept for each entry. For the same
+reason, the delta between two dir objects is cached too.
+
+Cache keys include the store id of the library, so that a dir id got from
+another library is not served from cache, but resolved against the store of
+the library and fails there.
+"""
+import stat
+
+from django.conf import settings
+from django.core.cache import cache
+
+from seaserv import seafile_api
+
+from seahub.utils import normalize_cache_key
+
+DIR_OBJECT_CACHE_PREFIX = getattr(settings, 'DIR_OBJECT_CACHE_PREFIX',
+                                  'DIR_OBJECT_')
+DIR_OBJECT_CACHE_TIMEOUT = getattr(settings, 'DIR_OBJECT_CACHE_TIMEOUT',
+                                   24 * 60 * 60)
+DIR_DELTA_CACHE_PREFIX = getattr(settings, 'DIR_DELTA_CACHE_PREFIX',
+                                 'DIR_DELTA_')
+
+class DirObjectEntry(object):
+    """An entry of a dir object.
+    """
+    __slots__ = ('obj_name', 'obj_id', 'mode', 'mtime', 'size')
+
+    def __init__(self, obj_name, obj_id, mode, mtime, size):
+        self.obj_name = obj_name
+        self.obj_id = obj_id
+        self.mode = mode
+        self.mtime = mtime
+        self.size = size
+
+    def is_dir(self):
+        return stat.S_ISDIR(self.mode)
+
+def list_dir_object(repo, dir_id):
+    """Return a list of ``DirObjectEntry`` of dir object ``dir_id`` in
+    ``repo``.
+    """
+    key = normalize_cache_key('%s_%s' % (repo.store_id, dir_id),
+                              DIR_OBJECT_CACHE_PREFIX)
+    entries = cache.get(key)
+    if entries is None:
+        dirents = seafile_api.list_dir_by_dir_id(repo.id, dir_id)
+        entries = [(d.obj_name, d.obj_id, d.mode, d.mtime,
+                    getattr(d, 'size', 0)) for d in dirents or []]
+        cache.set(key, entries, DIR_OBJECT_CACHE_TIMEOUT)
+
+    return [DirObjectEntry(*e) for e in entries]
+
+def _get_delta_cache_key(store_id, old_dir_id, new_dir_id):
+    return normalize_cache_key('%s_%s_%s' % (store_id, old_dir_id, new_dir_id),
+                               DIR_DELTA_CACHE_PREFIX)
+
+def get_dir_object_delta(repo, old_dir_id, new_dir_id):
+    """Return ``(added, removed, modified)`` entries of dir object
+    ``new_dir_id`` relative to ``old_dir_id``.
+
+    ``added`` and ``modified`` are lists of ``DirObjectEntry`` of
+    ``new_dir_id``, ``removed`` is a list of names. An entry is modified if
+    its object id or type is changed.
+    """
+    key = _get_delta_cache_key(repo.store_id, old_dir_id, new_dir_id)
+    delta = cache.get(key)
+    if delta is None:
+        old_entries = dict([(e.obj_name, e) for e in
+                            list_dir_object(repo, old_dir_id)])
+        added, modified = [], []
+        for e in list_dir_object(repo, new_dir_id):
+            old = old_entries.pop(e.obj_name, None)
+            entry = (e.obj_name, e.obj_id, e.mode, e.mtime, e.size)
+            if old is None:
+                added.append(entry)
+            elif old.obj_id != e.obj_id or old.is_dir() != e.is_dir():
+                modified.append(entry)
+        delta = (added, old_entries.keys(), modified)
+        cache.set(key, delta, DIR_OBJECT_CACHE_TIMEOUT)
+
+    added, removed, modified = delta
+    return ([DirObjectEntry(*e) for e in added], removed,
+            [DirObjectEntry(*e) for e in modified])
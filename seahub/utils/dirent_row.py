@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+Compact rows of a dir listing.
+
+Listing a dir creates one row per dirent, so rows use ``__slots__`` and links
+of a row are built on access from URL prefixes computed once per listing.
+"""
+import stat
+import posixpath
+
+from django.core.urlresolvers import reverse
+from django.utils.http import urlquote
+
+_OBJ_ID_PLACEHOLDER = '0' * 40
+
+class DirentLinks(object):
+    """URL prefixes shared by rows of a dir listing.
+    """
+    def __init__(self, repo_id, parent_dir, view_lib_file=False):
+        self.parent_dir = parent_dir
+        self.view_dir_base = reverse('repo', args=[repo_id]) + '?p='
+        self.dl_dir_base = reverse('repo_download_dir', args=[repo_id]) + '?p='
+        if view_lib_file:
+            self.view_file_base = reverse('view_lib_file', args=[repo_id, ''])
+        else:
+            self.view_file_base = reverse('repo_view_file',
+                                          args=[repo_id]) + '?p='
+        self.file_history_base = reverse('file_revisions',
+                                         args=[repo_id]) + '?p='
+        self.dl_file_head, self.dl_file_tail = reverse(
+            'download_file', args=[repo_id, _OBJ_ID_PLACEHOLDER]).split(
+                _OBJ_ID_PLACEHOLDER)
+
+class DirentRow(object):
+    """A dirent in a dir listing.
+
+    Attributes of seafile dirents used by views and templates are copied,
+    ``props`` is kept for templates which read ``dirent.props.obj_id``.
+    """
+    __slots__ = ('obj_name', 'obj_id', 'mode', 'mtime', 'size', 'permission',
+                 'is_locked', 'lock_owner', 'lock_time', 'file_size',
+                 'starred', 'sharelink', 'sharetoken', 'uploadlink',
+                 'uploadtoken', 'is_img', 'encoded_thumbnail_src',
+                 'allow_generate_thumbnail', '_links', '_quoted_path')
+
+    def __init__(self, dirent, links):
+        self.obj_name = dirent.obj_name
+        self.obj_id = dirent.obj_id
+        self.mode = dirent.mode
+        self.mtime = dirent.mtime
+        self.size = getattr(dirent, 'size', 0)
+        self.permission = getattr(dirent, 'permission', None)
+        self.is_locked = getattr(dirent, 'is_locked', False)
+        self.lock_owner = getattr(dirent, 'lock_owner', None)
+        self.lock_time = getattr(dirent, 'lock_time', None)
+        self.file_size = 0
+        self.starred = False
+        self.sharelink = ''
+        self.sharetoken = ''
+        self.uploadlink = ''
+        self.uploadtoken = ''
+        self.is_img = False
+        self.encoded_thumbnail_src = ''
+        self.allow_generate_thumbnail = False
+        self._links = links
+        self._quoted_path = None
+
+    @property
+    def props(self):
+        return self
+
+    @property
+    def last_modified(self):
+        return self.mtime
+
+    def is_dir(self):
+        return stat.S_ISDIR(self.mode)
+
+    @property
+    def path(self):
+        return posixpath.join(self._links.parent_dir, self.obj_name)
+
+    def _get_quoted_path(self):
+        if self._quoted_path is None:
+            self._quoted_path = urlquote(self.path)
+        return self._quoted_path
+
+    @property
+    def view_link(self):
+        if self.is_dir():
+            return self._links.view_dir_base + self._get_quoted_path()
+        return self._links.view_file_base + self._get_quoted_path()
+
+    @property
+    def dl_link(self):
+        if self.is_dir():
+            return self._links.dl_dir_base + self._get_quoted_path()
+        return self._links.dl_file_head + self.obj_id + \
+            self._links.dl_file_tail + '?p=' + self._get_quoted_path()
+
+    @property
+    def history_link(self):
+        return self._links.file_history_base + self._get_quoted_path()
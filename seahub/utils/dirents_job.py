@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+"""
+Copy/move multiple files/dirs in background.
+
+A ``DirentsJob`` is saved for the whole selection and queued to a pool of
+``DIRENTS_JOB_WORKERS`` daemon threads shared by all jobs of the process. The
+workers issue the copy/move RPCs synchronously, one object at a time, and
+keep counters, bytes and result of the job up to date for progress polling.
+A user can only have one unfinished job, see ``submit_dirents_job``.
+
+The ``mtime`` of each job queued or running in the process is touched every
+``DIRENTS_JOB_HEARTBEAT`` seconds, a job whose process is gone (e.g. the web
+worker is restarted) stops beating and is marked as failed when polled, see
+``DirentsJobManager.get_user_job``.
+"""
+import json
+import logging
+import Queue
+import stat
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from seaserv import seafile_api, seafserv_threaded_rpc
+from pysearpc import SearpcError
+
+from seahub.base.models import DirentsJob
+from seahub.utils import FilenameAllocator
+
+# Get an instance of a logger
+logger = logging.getLogger(__name__)
+
+# max number of copy/move RPCs running at the same time in a process
+DIRENTS_JOB_WORKERS = getattr(settings, 'DIRENTS_JOB_WORKERS', 4)
+# seconds between heartbeats of a running job, should be well below
+# DIRENTS_JOB_STALE_TIME
+DIRENTS_JOB_HEARTBEAT = getattr(settings, 'DIRENTS_JOB_HEARTBEAT', 30)
+
+_tasks = Queue.Queue()
+_pool_lock = threading.Lock()
+_pool_started = False
+# ids of jobs queued or running in this process
+_active_jobs = set()
+
+def _get_dirents_size(repo, parent_dir, obj_names):
+    """Return a dict of size of each of ``obj_names`` in ``parent_dir``.
+    """
+    sizes = dict([(x, 0) for x in obj_names])
+    try:
+        dirents = seafile_api.list_dir_by_path(repo.id,
+                                               parent_dir.encode('utf-8'))
+    except SearpcError as e:
+        logger.error(e)
+        return sizes
+
+    for dirent in dirents or []:
+        name = dirent.obj_name
+        if name not in sizes:
+            continue
+
+        if stat.S_ISDIR(dirent.mode):
+            try:
+                sizes[name] = seafserv_threaded_rpc.get_dir_size(
+                    repo.store_id, repo.version, dirent.obj_id)
+            except SearpcError as e:
+                logger.error(e)
+        else:
+            sizes[name] = getattr(dirent, 'size', 0) or 0
+    return sizes
+
+class _DirentsJobRun(object):
+    """Run of a job by the worker pool.
+    """
+    def __init__(self, job_id):
+        self.job_id = job_id
+        self.jobs = DirentsJob.objects.filter(pk=job_id)
+        self.lock = threading.Lock()
+
+    def start(self):
+        """Prepare the job and queue its objects, the job is done at once if
+        there is nothing to copy/move.
+        """
+        job = DirentsJob.objects.get(pk=self.job_id)
+        self.job = job
+        self.result = job.get_result()
+        self.progress = {'completed': 0, 'failed': len(self.result['failed']),
+                         'done_bytes': 0}
+        self.jobs.filter(status=DirentsJob.STATUS_PENDING).update(
+            status=DirentsJob.STATUS_RUNNING, mtime=timezone.now())
+
+        obj_names = job.get_objs()
+        src_repo = seafile_api.get_repo(job.src_repo_id)
+        if src_repo is None:
+            self.result['failed'] += obj_names
+            self.progress['failed'] += len(obj_names)
+            obj_names = []
+        if not obj_names:
+            self.finish()
+            return
+
+        self.sizes = _get_dirents_size(src_repo, job.src_path, obj_names)
+        self.jobs.update(total_bytes=sum(self.sizes.values()),
+                         mtime=timezone.now())
+
+        if job.op == DirentsJob.OP_MOVE:
+            self.func = seafile_api.move_file
+        else:
+            self.func = seafile_api.copy_file
+
+        name_allocator = FilenameAllocator(job.dst_repo_id, job.dst_path)
+        new_obj_names = [name_allocator.allocate(x) for x in obj_names]
+        self.remaining = len(obj_names)
+        for obj_name, new_obj_name in zip(obj_names, new_obj_names):
+            _tasks.put(lambda x=obj_name, y=new_obj_name: self.run_obj(x, y))
+
+    def run_obj(self, obj_name, new_obj_name):
+        """Copy/move an object, the job is done after the last one.
+        """
+        try:
+            if self.jobs.filter(
+                    status=DirentsJob.STATUS_CANCELING).exists():
+                with self.lock:
+                    self.result.setdefault('canceled', []).append(obj_name)
+                return
+
+            job = self.job
+            try:
+                res = self.func(job.src_repo_id, job.src_path, obj_name,
+                                job.dst_repo_id, job.dst_path, new_obj_name,
+                                job.username, 0, synchronous=1)
+            except SearpcError as e:
+                logger.error(e)
+                res = None
+
+            # absolute values are saved, so that the job is accurate even if
+            # it is not finished
+            with self.lock:
+                if res:
+                    self.result['success'].append(obj_name)
+                    self.progress['completed'] += 1
+                    self.progress['done_bytes'] += self.sizes[obj_name]
+                else:
+                    self.result['failed'].append(obj_name)
+                    self.progress['failed'] += 1
+                self.jobs.update(result=json.dumps(self.result),
+                                 mtime=timezone.now(), **self.progress)
+        finally:
+            with self.lock:
+                self.remaining -= 1
+                last = self.remaining == 0
+            if last:
+                self.finish()
+
+    def finish(self):
+        try:
+            with self.lock:
+                self.jobs.update(status=DirentsJob.STATUS_DONE,
+                                 result=json.dumps(self.result),
+                                 mtime=timezone.now(), **self.progress)
+        finally:
+            _active_jobs.discard(self.job_id)
+
+def _start_dirents_job(job_id):
+    try:
+        _DirentsJobRun(job_id).start()
+    except Exception as e:
+        logger.error(e)
+        _active_jobs.discard(job_id)
+        try:
+            job = DirentsJob.objects.get(pk=job_id)
+        except DirentsJob.DoesNotExist:
+            return
+        DirentsJob.objects.fail_stale_job(job)
+
+def _worker():
+    while True:
+        task = _tasks.get()
+        try:
+            task()
+        except Exception as e:
+            logger.error(e)
+        finally:
+            connection.close()
+
+def _heartbeat():
+    while True:
+        time.sleep(DIRENTS_JOB_HEARTBEAT)
+        job_ids = list(_active_jobs)
+        if not job_ids:
+            continue
+        try:
+            DirentsJob.objects.filter(pk__in=job_ids).exclude(
+                status=DirentsJob.STATUS_DONE).update(mtime=timezone.now())
+        except Exception as e:
+            logger.error(e)
+        finally:
+            connection.close()
+
+def _start_pool():
+    global _pool_started
+    with _pool_lock:
+        if _pool_started:
+            return
+        for target in [_worker] * max(1, DIRENTS_JOB_WORKERS) + [_heartbeat]:
+            t = threading.Thread(target=target)
+            t.daemon = True
+            t.start()
+        _pool_started = True
+
+def submit_dirents_job(username, op, src_repo_id, src_path, dst_repo_id,
+                       dst_path, obj_names, failed=None):
+    """Save a copy/move job of ``obj_names`` and queue it to the worker pool.
+
+    Returns ``None`` if the user already has an unfinished job.
+    """
+    if DirentsJob.objects.has_active_job(username):
+        return None
+
+    job = DirentsJob.objects.add_job(username, op, src_repo_id, src_path,
+                                     dst_repo_id, dst_path, obj_names,
+                                     failed)
+    _start_pool()
+    _active_jobs.add(job.pk)
+    _tasks.put(lambda: _start_dirents_job(job.pk))
+    return job
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+Cached and paginated file revision history.
+
+Walking the history of a file is done by seafile server from the head commit
+of the repo, which is expensive for heavily edited files. The whole revision
+list is cached by (repo_id, path, head commit id, days), so pages of the same
+history are sliced from cache, and a new commit of the repo simply makes a
+new cache key.
+"""
+import hashlib
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+
+from seaserv import seafile_api
+
+from seahub.utils import normalize_cache_key
+
+# Get an instance of a logger
+logger = logging.getLogger(__name__)
+
+FILE_REVISIONS_CACHE_PREFIX = getattr(settings, 'FILE_REVISIONS_CACHE_PREFIX',
+                                      'FILE_REVISIONS_')
+FILE_REVISIONS_CACHE_TIMEOUT = getattr(settings, 'FILE_REVISIONS_CACHE_TIMEOUT',
+                                       24 * 60 * 60)
+FILE_REVISIONS_PER_PAGE = getattr(settings, 'FILE_REVISIONS_PER_PAGE', 25)
+
+class FileRevision(object):
+    """A revision commit of a file, built from the cached dict.
+    """
+    def __init__(self, d):
+        self.__dict__.update(d)
+        # for compatibility with old usage commit.props.ctime
+        self.props = self
+
+    def __getattr__(self, key):
+        # only called when attribute is not found, same as searpc object
+        return None
+
+def _get_cache_key(repo_id, path, head_cmmt_id, days):
+    value = '%s_%s_%s_%s' % (repo_id, head_cmmt_id,
+                             hashlib.md5(path.encode('utf-8')).hexdigest(),
+                             days)
+    return normalize_cache_key(value, FILE_REVISIONS_CACHE_PREFIX)
+
+def _list_file_revisions(repo_id, path, days):
+    commits = seafile_api.get_file_revisions(repo_id, path, -1, -1, days)
+
+    revisions = []
+    cur_path = path
+    for commit in commits or []:
+        d = dict(commit._dict)
+        # path of the file in this revision
+        d['path'] = cur_path
+        if commit.rev_renamed_old_path:
+            cur_path = '/' + commit.rev_renamed_old_path
+        revisions.append(d)
+    return revisions
+
+def get_file_revisions(repo, path, days=-1):
+    """Return a list of revision dicts of a file, newest first, in ``days``
+    days (-1 for all).
+
+    Raise ``SearpcError`` if failed to list revisions.
+    """
+    key = _get_cache_key(repo.id, path, repo.head_cmmt_id, days)
+    revisions = cache.get(key)
+    if revisions is None:
+        revisions = _list_file_revisions(repo.id, path, days)
+        cache.set(key, revisions, FILE_REVISIONS_CACHE_TIMEOUT)
+    return revisions
+
+def get_file_revisions_page(repo, path, cursor=None, per_page=None, days=-1):
+    """Return a page of revision dicts after commit ``cursor`` (from the
+    newest one if ``cursor`` is None), and the cursor of next page, which is
+    None if there are no more revisions.
+
+    Raise ``SearpcError`` if failed to list revisions.
+    """
+    if per_page is None:
+        per_page = FILE_REVISIONS_PER_PAGE
+    revisions = get_file_revisions(repo, path, days)
+
+    start = 0
+    if cursor:
+        for i, d in enumerate(revisions):
+            if d['id'] == cursor:
+                start = i + 1
+                break
+        else:
+            return [], None
+
+    page = revisions[start:start + per_page]
+    if start + per_page < len(revisions):
+        next_cursor = page[-1]['id']
+    else:
+        next_cursor = None
+    return page, next_cursor
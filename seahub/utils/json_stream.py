@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+Stream a list as JSON while its items are produced.
+
+Items are encoded one by one and written in chunks of about
+``JSON_STREAM_CHUNK_SIZE`` bytes, so neither the whole list nor its whole
+encoded string needs to be kept in memory. In NDJSON mode, each item is
+written as one line instead of being an element of an array.
+"""
+import json
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+
+JSON_STREAM_CHUNK_SIZE = getattr(settings, 'JSON_STREAM_CHUNK_SIZE', 8192)
+
+JSON_CONTENT_TYPE = 'application/json; charset=utf-8'
+NDJSON_CONTENT_TYPE = 'application/x-ndjson; charset=utf-8'
+
+def wants_ndjson(request):
+    """Return True if client accepts NDJSON.
+    """
+    return 'application/x-ndjson' in request.META.get('HTTP_ACCEPT', '')
+
+def iter_json(items, ndjson=False, cls=None, key=None):
+    """Yield chunks of encoded ``items``. If ``key`` is given, the array is
+    wrapped in an object as the value of ``key``, which is ignored in NDJSON
+    mode.
+    """
+    if ndjson:
+        head, sep, tail = '', '\n', '\n'
+    elif key:
+        head, sep, tail = '{%s: [' % json.dumps(key), ', ', ']}'
+    else:
+        head, sep, tail = '[', ', ', ']'
+
+    buf, size, first = [head], len(head), True
+    for item in items:
+        s = json.dumps(item, cls=cls)
+        if not first:
+            s = sep + s
+        first = False
+
+        buf.append(s)
+        size += len(s)
+        if size >= JSON_STREAM_CHUNK_SIZE:
+            yield ''.join(buf)
+            buf, size = [], 0
+
+    if not (ndjson and first):
+        buf.append(tail)
+    yield ''.join(buf)
+
+def json_stream_response(items, ndjson=False, cls=None, key=None,
+                         status=200):
+    """Return a streaming response of ``items`` encoded by ``iter_json``.
+    """
+    content_type = NDJSON_CONTENT_TYPE if ndjson else JSON_CONTENT_TYPE
+    return StreamingHttpResponse(iter_json(items, ndjson, cls, key),
+                                 status=status, content_type=content_type)
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+Request scoped memoization of repo/path permission checks.
+
+A resolver is attached to the user object of a request (which is built for
+every request), so views and helpers that check the same (repo_id, path) more
+than once only issue one RPC, and a list of children in a folder is resolved
+with one ``list_dir_with_perm`` call.
+"""
+import logging
+import posixpath
+import threading
+
+from seaserv import seafile_api, seafserv_threaded_rpc
+from pysearpc import SearpcError
+
+# Get an instance of a logger
+logger = logging.getLogger(__name__)
+
+class PermissionResolver(object):
+    """Memoize permission of a user by (repo_id, path).
+
+    ``path`` of ``None`` stands for the repo access permission.
+    """
+    def __init__(self, username):
+        self.username = username
+        self._perms = {}
+        self._lock = threading.Lock()
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'inherited': 0,
+            'rpc_calls': 0,
+        }
+
+    def _normalize_path(self, path):
+        if path is None:
+            return None
+        path = posixpath.normpath(path)
+        return '/' if path in ('.', '//') else path
+
+    def _incr(self, counter, delta=1):
+        with self._lock:
+            self.stats[counter] += delta
+
+    def _get(self, key):
+        with self._lock:
+            if key in self._perms:
+                self.stats['hits'] += 1
+                return True, self._perms[key]
+            self.stats['misses'] += 1
+            return False, None
+
+    def _set(self, key, perm):
+        with self._lock:
+            self._perms[key] = perm
+
+    def repo_perm(self, repo_id):
+        """Same as ``seafile_api.check_repo_access_permission``.
+        """
+        key = (repo_id, None)
+        found, perm = self._get(key)
+        if not found:
+            self._incr('rpc_calls')
+            perm = seafile_api.check_repo_access_permission(repo_id,
+                                                            self.username)
+            self._set(key, perm)
+        return perm
+
+    def path_perm(self, repo_id, path):
+        """Same as ``seafile_api.check_permission_by_path``.
+        """
+        key = (repo_id, self._normalize_path(path))
+        found, perm = self._get(key)
+        if not found:
+            self._incr('rpc_calls')
+            perm = seafile_api.check_permission_by_path(repo_id, path,
+                                                        self.username)
+            self._set(key, perm)
+        return perm
+
+    def seed_dirents(self, repo_id, parent_dir, dirents):
+        """Remember permissions of ``dirents`` returned by
+        ``list_dir_with_perm`` of ``parent_dir``.
+        """
+        parent_dir = self._normalize_path(parent_dir)
+        with self._lock:
+            for d in dirents:
+                path = posixpath.join(parent_dir, d.obj_name)
+                self._perms.setdefault((repo_id, path), d.permission)
+
+    def children_perms(self, repo_id, parent_dir, names):
+        """Return a dict of permission of each child in ``names`` of
+        ``parent_dir``.
+
+        Children permissions are listed by seafile server in one pass, which
+        takes folder permission inheritance into account. A child can not be
+        accessed if its parent can not, and a child which is not listed
+        (e.g. not exists) inherits permission of its parent.
+        """
+        parent_dir = self._normalize_path(parent_dir)
+        result = {}
+        missing = []
+        for name in names:
+            found, perm = self._get((repo_id, posixpath.join(parent_dir, name)))
+            if found:
+                result[name] = perm
+            else:
+                missing.append(name)
+
+        if not missing:
+            return result
+
+        parent_perm = self.path_perm(repo_id, parent_dir)
+        if parent_perm is not None:
+            try:
+                dir_id = seafile_api.get_dir_id_by_path(repo_id, parent_dir)
+                dirents = seafserv_threaded_rpc.list_dir_with_perm(
+                    repo_id, parent_dir, dir_id, self.username, -1, -1) \
+                    if dir_id else []
+                self._incr('rpc_calls', 2 if dir_id else 1)
+            except SearpcError as e:
+                logger.error(e)
+                dirents = []
+            self.seed_dirents(repo_id, parent_dir, dirents or [])
+
+        for name in missing:
+            key = (repo_id, posixpath.join(parent_dir, name))
+            with self._lock:
+                if key not in self._perms:
+                    self._perms[key] = parent_perm
+                    self.stats['inherited'] += 1
+                result[name] = self._perms[key]
+
+        return result
+
+def get_perm_resolver(user):
+    """Get or create the permission resolver of a request user.
+    """
+    resolver = getattr(user, '_perm_resolver', None)
+    if resolver is None or resolver.username != user.username:
+        resolver = PermissionResolver(user.username)
+        user._perm_resolver = resolver
+    return resolver
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+Cached snapshot of user's space quota/usage and traffic, used by the side bar
+widget which is loaded on every page.
+
+Space usage is checked on every read, which is one RPC, and the snapshot is
+re-calculated when it changed, since most uploads, deletes and restores do not
+go through seahub (web uploads go to fileserver, and sync clients). Otherwise
+a snapshot older than ``USER_QUOTA_CACHE_FRESH_TIME`` is still returned, but
+refreshed in a background thread.
+"""
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.dispatch import receiver
+
+from seaserv import seafile_api, seafserv_threaded_rpc, ccnet_threaded_rpc, \
+    CALC_SHARE_USAGE
+
+from seahub.signals import upload_file_successful, repo_deleted
+from seahub.utils import normalize_cache_key, TRAFFIC_STATS_ENABLED, \
+    get_user_traffic_stat
+
+# Get an instance of a logger
+logger = logging.getLogger(__name__)
+
+USER_QUOTA_CACHE_PREFIX = getattr(settings, 'USER_QUOTA_CACHE_PREFIX',
+                                  'USER_QUOTA_')
+# seconds a snapshot is considered fresh
+USER_QUOTA_CACHE_FRESH_TIME = getattr(settings, 'USER_QUOTA_CACHE_FRESH_TIME',
+                                      60)
+# seconds a snapshot is kept at most
+USER_QUOTA_CACHE_TIMEOUT = getattr(settings, 'USER_QUOTA_CACHE_TIMEOUT',
+                                   10 * 60)
+
+def _get_cache_key(username):
+    return normalize_cache_key(username, USER_QUOTA_CACHE_PREFIX)
+
+def _get_lock_key(username):
+    return normalize_cache_key(username, USER_QUOTA_CACHE_PREFIX,
+                               token='LOCK')
+
+def calc_user_quota_usage(username):
+    """Get space quota/usage, share quota/usage and traffic of this month of
+    a user from seafile server.
+    """
+    orgs = ccnet_threaded_rpc.get_orgs_by_user(username)
+    if not orgs:
+        org_id = None
+        space_quota = seafile_api.get_user_quota(username)
+        space_usage = get_user_space_usage(username)
+        if CALC_SHARE_USAGE:
+            share_quota = seafile_api.get_user_share_quota(username)
+            share_usage = seafile_api.get_user_share_usage(username)
+        else:
+            share_quota = 0
+            share_usage = 0
+    else:
+        org_id = orgs[0].org_id
+        space_quota = seafserv_threaded_rpc.get_org_user_quota(org_id,
+                                                               username)
+        space_usage = get_user_space_usage(username, org_id)
+        share_quota = 0         # no share quota/usage for org account
+        share_usage = 0
+
+    traffic_stat = 0
+    if TRAFFIC_STATS_ENABLED:
+        # User's network traffic stat in this month
+        try:
+            stat = get_user_traffic_stat(username)
+        except Exception as e:
+            logger.error(e)
+            stat = None
+
+        if stat:
+            traffic_stat = stat['file_view'] + stat['file_download'] + \
+                stat['dir_download']
+
+    return {
+        'ctime': time.time(),
+        'org_id': org_id,
+        'space_quota': space_quota,
+        'space_usage': space_usage,
+        'share_quota': share_quota,
+        'share_usage': share_usage,
+        'traffic_stat': traffic_stat,
+    }
+
+def get_user_space_usage(username, org_id=None):
+    """Get space usage of a user, ``org_id`` is None for non-org account.
+    """
+    if org_id is None:
+        return seafile_api.get_user_self_usage(username)
+    return seafserv_threaded_rpc.get_org_user_quota_usage(org_id, username)
+
+def refresh_user_quota_usage(username):
+    """Re-calculate and cache quota/usage snapshot of a user.
+    """
+    snapshot = calc_user_quota_usage(username)
+    cache.set(_get_cache_key(username), snapshot, USER_QUOTA_CACHE_TIMEOUT)
+    return snapshot
+
+def _refresh_in_background(username):
+    def _refresh():
+        try:
+            refresh_user_quota_usage(username)
+        except Exception as e:
+            logger.error(e)
+        finally:
+            cache.delete(_get_lock_key(username))
+
+    # only one refreshing for a user at the same time
+    if not cache.add(_get_lock_key(username), 1, USER_QUOTA_CACHE_FRESH_TIME):
+        return
+
+    t = threading.Thread(target=_refresh)
+    t.daemon = True
+    t.start()
+
+def get_user_quota_usage(username):
+    """Get quota/usage snapshot of a user, see ``calc_user_quota_usage``.
+
+    Calculated synchronously if not cached or space usage changed, a stale
+    snapshot is returned as is and refreshed in background.
+    """
+    snapshot = cache.get(_get_cache_key(username))
+    if snapshot is None:
+        return refresh_user_quota_usage(username)
+
+    if get_user_space_usage(username, snapshot['org_id']) != \
+       snapshot['space_usage']:
+        return refresh_user_quota_usage(username)
+
+    if time.time() - snapshot['ctime'] > USER_QUOTA_CACHE_FRESH_TIME:
+        _refresh_in_background(username)
+    return snapshot
+
+def clear_user_quota_usage_cache(username):
+    cache.delete(_get_cache_key(username))
+
+########## handle signals
+@receiver(upload_file_successful)
+def clear_quota_cache_on_upload_cb(sender, **kwargs):
+    owner = kwargs.get('owner', None)
+    if owner:
+        clear_user_quota_usage_cache(owner)
+
+@receiver(repo_deleted)
+def clear_quota_cache_on_repo_deleted_cb(sender, **kwargs):
+    users = set(kwargs.get('usernames') or [])
+    if kwargs.get('repo_owner'):
+        users.add(kwargs['repo_owner'])
+
+    for username in users:
+        clear_user_quota_usage_cache(username)
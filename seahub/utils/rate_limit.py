@@ -0,0 +1,155 @@
+# encoding: utf-8
+"""
+Rate limiters counting events (e.g. failed logins) of a key (e.g. username
+or ip) in a sliding window.
+
+Counts are kept in two fixed windows, the current one and the previous one,
+and the count in the sliding window is estimated by weighting the previous
+window by how much of it is still covered. Each check or increment is a
+constant amount of work, no matter how many events happened.
+
+``MemoryRateLimiter`` keeps counts in process memory, at most ``max_keys``
+keys are tracked and the least recently used ones are dropped.
+``CacheRateLimiter`` keeps counts in the default cache, so that they are
+shared among worker processes, each key uses at most two cache entries which
+expire after two windows.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+from seahub.utils import normalize_cache_key
+
+# `memory` or `cache`
+RATE_LIMITER_BACKEND = getattr(settings, 'RATE_LIMITER_BACKEND', 'memory')
+# max number of keys tracked by each in-memory limiter
+RATE_LIMITER_MAX_KEYS = getattr(settings, 'RATE_LIMITER_MAX_KEYS', 100000)
+
+class RateLimiter(object):
+    def __init__(self, prefix, limit, window):
+        """
+        Arguments:
+        - `prefix`: namespace of keys
+        - `limit`: max number of events allowed in a window
+        - `window`: length of the sliding window, in seconds
+        """
+        self.prefix = prefix
+        self.limit = limit
+        self.window = window
+
+    def _get_window(self, now):
+        """Return index of current window and how much of the previous
+        window is still in the sliding window.
+        """
+        index = int(now // self.window)
+        weight = 1 - (now - index * self.window) / float(self.window)
+        return index, weight
+
+    def _get_counts(self, key, index):
+        """Return counts of window ``index`` - 1 and window ``index``.
+        """
+        raise NotImplementedError
+
+    def _incr_count(self, key, index):
+        """Increase count of window ``index`` by 1.
+        """
+        raise NotImplementedError
+
+    def clear(self, key):
+        raise NotImplementedError
+
+    def get(self, key):
+        """Return number of events of ``key`` in the sliding window.
+        """
+        index, weight = self._get_window(time.time())
+        prev_count, count = self._get_counts(key, index)
+        return int(prev_count * weight) + count
+
+    def incr(self, key):
+        """Record an event of ``key``, and return the new number of events
+        in the sliding window.
+        """
+        index, weight = self._get_window(time.time())
+        self._incr_count(key, index)
+        prev_count, count = self._get_counts(key, index)
+        return int(prev_count * weight) + count
+
+    def is_limited(self, key):
+        return self.get(key) >= self.limit
+
+class MemoryRateLimiter(RateLimiter):
+    def __init__(self, prefix, limit, window, max_keys=RATE_LIMITER_MAX_KEYS):
+        super(MemoryRateLimiter, self).__init__(prefix, limit, window)
+        self.max_keys = max_keys
+        # key -> [window index, count of previous window, count]
+        self._counts = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get_entry(self, key, index):
+        entry = self._counts.pop(key, None)
+        if entry is None:
+            return None
+
+        # move to the end as most recently used
+        self._counts[key] = entry
+        if entry[0] != index:
+            prev_count = entry[2] if entry[0] == index - 1 else 0
+            entry[:] = [index, prev_count, 0]
+        return entry
+
+    def _get_counts(self, key, index):
+        with self._lock:
+            entry = self._get_entry(key, index)
+        if entry is None:
+            return 0, 0
+        return entry[1], entry[2]
+
+    def _incr_count(self, key, index):
+        with self._lock:
+            entry = self._get_entry(key, index)
+            if entry is None:
+                self._counts[key] = [index, 0, 1]
+                while len(self._counts) > self.max_keys:
+                    self._counts.popitem(last=False)
+            else:
+                entry[2] += 1
+
+    def clear(self, key):
+        with self._lock:
+            self._counts.pop(key, None)
+
+class CacheRateLimiter(RateLimiter):
+    def _get_cache_key(self, key, index):
+        # window index goes before key, which may be truncated
+        return normalize_cache_key(key, '%s%d_' % (self.prefix, index))
+
+    def _get_counts(self, key, index):
+        prev_key = self._get_cache_key(key, index - 1)
+        cur_key = self._get_cache_key(key, index)
+        counts = cache.get_many([prev_key, cur_key])
+        return counts.get(prev_key, 0), counts.get(cur_key, 0)
+
+    def _incr_count(self, key, index):
+        cache_key = self._get_cache_key(key, index)
+        # kept until the window is no longer the previous one
+        if not cache.add(cache_key, 1, self.window * 2):
+            try:
+                cache.incr(cache_key)
+            except ValueError:
+                # expired between add and incr
+                cache.set(cache_key, 1, self.window * 2)
+
+    def clear(self, key):
+        index, _ = self._get_window(time.time())
+        cache.delete_many([self._get_cache_key(key, index - 1),
+                           self._get_cache_key(key, index)])
+
+def get_rate_limiter(prefix, limit, window):
+    """Return a rate limiter of ``RATE_LIMITER_BACKEND``.
+    """
+    if RATE_LIMITER_BACKEND == 'memory':
+        return MemoryRateLimiter(prefix, limit, window)
+    return CacheRateLimiter(prefix, limit, window)
@@ -1,10 +1,19 @@
 """
 Proxy RPC calls to seafile_api, silence RPC errors, emulating Ruby's
 "method_missing".
+
+Also provides ``RPCBatch``, which issues independent RPC calls concurrently.
 """
 
 from functools import partial
 import logging
+import os
+import sys
+import threading
+import time
+import Queue
+
+from django.conf import settings
 
 from seaserv import seafile_api
 from pysearpc import SearpcError
@@ -12,6 +21,10 @@ from pysearpc import SearpcError
 # Get an instance of a logger
 logger = logging.getLogger(__name__)
 
+# Number of threads used to issue RPC calls concurrently, set to 0 to issue
+# them one by one in the calling thread.
+RPC_FAN_OUT_WORKERS = getattr(settings, 'RPC_FAN_OUT_WORKERS', 8)
+
 class RPCProxy(object):
     def __init__(self, mute=False):
         self.mute = mute
@@ -32,3 +45,112 @@ class RPCProxy(object):
 
 
 mute_seafile_api = RPCProxy(mute=True)
+
+
+class RPCCall(object):
+    """A RPC call submitted to ``RPCBatch``, ``elapsed`` is the time in
+    seconds the call takes.
+    """
+    def __init__(self, name, func, args, kwargs):
+        self.name = name
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.elapsed = None
+        self._result = None
+        self._exc_info = None
+        self._done = threading.Event()
+
+    def run(self):
+        start = time.time()
+        try:
+            self._result = self.func(*self.args, **self.kwargs)
+        except Exception:
+            self._exc_info = sys.exc_info()
+        finally:
+            self.elapsed = time.time() - start
+            self._done.set()
+
+    def result(self):
+        """Wait for the call to finish, return its result or re-raise its
+        exception.
+        """
+        self._done.wait()
+        if self._exc_info is not None:
+            raise self._exc_info[0], self._exc_info[1], self._exc_info[2]
+        return self._result
+
+class _RPCThreadPool(object):
+    def __init__(self, workers):
+        self.workers = workers
+        self.queue = Queue.Queue()
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def _worker(self):
+        while True:
+            call = self.queue.get()
+            call.run()
+
+    def _ensure_started(self):
+        # Threads do not survive ``fork``, start them in each worker process.
+        if self._pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+
+            self.queue = Queue.Queue()
+            for i in range(self.workers):
+                t = threading.Thread(target=self._worker)
+                t.daemon = True
+                t.start()
+            self._pid = os.getpid()
+
+    def submit(self, call):
+        self._ensure_started()
+        self.queue.put(call)
+
+_rpc_pool = _RPCThreadPool(RPC_FAN_OUT_WORKERS)
+
+class RPCBatch(object):
+    """Issue independent RPC calls to seafile/ccnet server concurrently,
+    instead of one round trip after another.
+
+    Only submit RPC calls here, database queries should stay in the request
+    thread.
+
+    Usage::
+
+        batch = RPCBatch()
+        commit = batch.submit('get_commit', get_commit, repo.id,
+                              repo.version, repo.head_cmmt_id)
+        size = batch.submit('get_repo_size', get_repo_size, repo.id)
+        ...
+        head_commit = commit.result()
+        repo_size = size.result()
+        batch.log_timings()
+    """
+    def __init__(self):
+        self.calls = []
+
+    def submit(self, name, func, *args, **kwargs):
+        call = RPCCall(name, func, args, kwargs)
+        self.calls.append(call)
+        if RPC_FAN_OUT_WORKERS > 0:
+            _rpc_pool.submit(call)
+        else:
+            call.run()
+        return call
+
+    @property
+    def timings(self):
+        """A list of ``(name, seconds)`` of finished calls.
+        """
+        return [(c.name, c.elapsed) for c in self.calls if c.elapsed is not None]
+
+    def log_timings(self):
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('RPC timings: %s' % ', '.join(
+                    ['%s=%.3fs' % (name, t) for name, t in self.timings]))
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+Cached summaries of share links, used by the link list of sysadmin user info
+page.
+
+A summary records whether the file/dir of a link still exists and its size,
+which needs a few RPCs and a recursive dir size calculation. Pages render
+links from cached summaries and load stale ones asynchronously, summaries
+are refreshed in background by ``refresh_share_link_summaries`` command.
+Links whose library or file/dir is removed are hidden, and deleted by
+``clean_dead_links`` command.
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from seaserv import seafile_api, seafserv_threaded_rpc
+
+from seahub.share.models import UploadLinkShare
+from seahub.utils import normalize_cache_key
+
+# Get an instance of a logger
+logger = logging.getLogger(__name__)
+
+SHARE_LINK_SUMMARY_CACHE_PREFIX = getattr(
+    settings, 'SHARE_LINK_SUMMARY_CACHE_PREFIX', 'SHARE_LINK_SUMMARY_')
+# seconds a summary is considered fresh
+SHARE_LINK_SUMMARY_FRESH_TIME = getattr(
+    settings, 'SHARE_LINK_SUMMARY_FRESH_TIME', 24 * 60 * 60)
+# seconds a summary is kept at most
+SHARE_LINK_SUMMARY_CACHE_TIMEOUT = getattr(
+    settings, 'SHARE_LINK_SUMMARY_CACHE_TIMEOUT', 7 * 24 * 60 * 60)
+
+DOWNLOAD_LINK = 'd'
+UPLOAD_LINK = 'u'
+
+def get_link_type(link):
+    return UPLOAD_LINK if isinstance(link, UploadLinkShare) else DOWNLOAD_LINK
+
+def _get_cache_key(link_type, token):
+    return normalize_cache_key(token, SHARE_LINK_SUMMARY_CACHE_PREFIX,
+                               token=link_type)
+
+def calc_link_summary(link):
+    """Return a summary of a download/upload link.
+
+    A summary is a dict of ``ctime``, ``exists`` and ``size``, ``exists`` is
+    False if library or file/dir of the link is removed, ``size`` is None
+    for upload links and removed files/dirs.
+    """
+    summary = {
+        'ctime': time.time(),
+        'exists': False,
+        'size': None,
+    }
+    repo = seafile_api.get_repo(link.repo_id)
+    if not repo:
+        return summary
+
+    size = None
+    if get_link_type(link) == DOWNLOAD_LINK and link.is_file_share_link():
+        obj_id = seafile_api.get_file_id_by_path(repo.id, link.path)
+        if obj_id is None:
+            return summary
+        size = seafile_api.get_file_size(repo.store_id, repo.version, obj_id)
+    else:
+        dir_id = seafile_api.get_dir_id_by_path(repo.id, link.path)
+        if dir_id is None:
+            return summary
+        if get_link_type(link) == DOWNLOAD_LINK:
+            size = seafserv_threaded_rpc.get_dir_size(repo.store_id,
+                                                      repo.version, dir_id)
+
+    summary['exists'] = True
+    summary['size'] = size
+    return summary
+
+def refresh_link_summary(link):
+    """Re-calculate and cache summary of a link.
+    """
+    summary = calc_link_summary(link)
+    cache.set(_get_cache_key(get_link_type(link), link.token), summary,
+              SHARE_LINK_SUMMARY_CACHE_TIMEOUT)
+    return summary
+
+def get_link_summaries(links):
+    """Return a dict of ``(link type, token)`` and cached summary of
+    ``links`` in one cache round trip, links not cached are not included.
+    """
+    keys = dict([(_get_cache_key(get_link_type(x), x.token),
+                  (get_link_type(x), x.token)) for x in links])
+    return dict([(keys[k], v) for k, v in cache.get_many(keys.keys()).items()])
+
+def is_stale(summary):
+    return summary['ctime'] < time.time() - SHARE_LINK_SUMMARY_FRESH_TIME
@@ -25,6 +25,7 @@ def star_file(email, repo_id, path, is_dir, org_id=-1):
         f.save()
     except IntegrityError, e:
         logger.warn(e)
+    UserStarredFiles.objects.clear_cache(email)
 
 def unstar_file(email, repo_id, path):
     # Should use "get", but here we use "filter" to fix the bug caused by no
@@ -34,6 +35,7 @@ def unstar_file(email, repo_id, path):
                                              path=path)
     for r in result:
         r.delete()
+    UserStarredFiles.objects.clear_cache(email)
             
 def is_file_starred(email, repo_id, path, org_id=-1):
     # Should use "get", but here we use "filter" to fix the bug caused by no
@@ -7,7 +7,6 @@ import mimetypes
 import urllib2
 import logging
 from math import ceil
-import posixpath
 
 from django.core.cache import cache
 from django.core.urlresolvers import reverse
@@ -54,7 +53,12 @@ from seahub.utils import render_permission_error, render_error, list_to_string,
     TRAFFIC_STATS_ENABLED, get_user_traffic_stat, new_merge_with_no_conflict, \
     user_traffic_over_limit, send_perm_audit_msg, get_origin_repo_info, \
     is_org_context, get_max_upload_file_size, is_pro_version
+from seahub.utils.commit_diff import get_commit_diff
+from seahub.utils.dirent_row import DirentLinks, DirentRow
+from seahub.utils.file_revisions import FileRevision, \
+    get_file_revisions_page
 from seahub.utils.paginator import get_page_range
+from seahub.utils.perm import get_perm_resolver
 from seahub.utils.star import get_dir_starred_files
 from seahub.utils.timeutils import utc_to_local
 from seahub.views.modules import MOD_PERSONAL_WIKI, enable_mod_for_user, \
@@ -111,11 +115,26 @@ def check_folder_permission(request, repo_id, path):
     - `repo_id`:
     - `path`:
     """
-    username = request.user.username
     if request.user.is_staff and get_system_default_repo_id() == repo_id:
         return 'rw'
 
-    return seafile_api.check_permission_by_path(repo_id, path, username)
+    return get_perm_resolver(request.user).path_perm(repo_id, path)
+
+def check_folder_children_permission(request, repo_id, parent_dir, names):
+    """Check folder access permission of each of ``names`` in
+    ``parent_dir``, return a dict of name and permission.
+
+    Arguments:
+    - `request`:
+    - `repo_id`:
+    - `parent_dir`:
+    - `names`:
+    """
+    if request.user.is_staff and get_system_default_repo_id() == repo_id:
+        return dict([(name, 'rw') for name in names])
+
+    return get_perm_resolver(request.user).children_perms(repo_id, parent_dir,
+                                                          names)
 
 def check_file_permission(request, repo_id, path):
     """Check file access permission of a user, always return 'rw'
@@ -126,11 +145,10 @@ def check_file_permission(request, repo_id, path):
     - `repo_id`:
     - `path`:
     """
-    username = request.user.username
     if get_system_default_repo_id() == repo_id and request.user.is_staff:
         return 'rw'
 
-    return seafile_api.check_permission_by_path(repo_id, path, username)
+    return get_perm_resolver(request.user).path_perm(repo_id, path)
 
 def check_file_lock(repo_id, file_path, username):
     """ check if file is locked to current user
@@ -170,7 +188,32 @@ def check_repo_access_permission(repo_id, user):
     if user.is_staff and get_system_default_repo_id() == repo_id:
         return 'rw'
     else:
-        return seafile_api.check_repo_access_permission(repo_id, user.username)
+        return get_perm_resolver(user).repo_perm(repo_id)
+
+def del_dirents(request, repo_id, parent_dir, dirent_names):
+    """Delete ``dirent_names`` in ``parent_dir`` in one commit.
+
+    Permission of ``parent_dir``'s children is resolved once, entries without
+    'rw' permission are left untouched.
+
+    Return a tuple of deleted names and undeleted names.
+    """
+    perms = check_folder_children_permission(request, repo_id, parent_dir,
+                                             dirent_names)
+    allowed = [x for x in dirent_names if perms[x] == 'rw']
+    undeleted = [x for x in dirent_names if perms[x] != 'rw']
+    if not allowed:
+        return [], undeleted
+
+    # seafile server deletes multiple entries separated by '\t' in one commit
+    try:
+        seafile_api.del_file(repo_id, parent_dir, '\t'.join(allowed),
+                             request.user.username)
+    except SearpcError as e:
+        logger.error(e)
+        return [], dirent_names
+
+    return allowed, undeleted
 
 def get_file_access_permission(repo_id, path, username):
     """Check user has permission to view the file.
@@ -225,6 +268,53 @@ def get_file_download_link(repo_id, obj_id, path):
     return reverse('download_file', args=[repo_id, obj_id]) + '?p=' + \
         urlquote(path)
 
+def _get_dirent_rows(request, repo, path, dirents, view_lib_file=False):
+    """Wrap ``dirents`` of ``path`` in ``DirentRow``, and fill in share
+    links, stars and file sizes.
+
+    Returns: A tupple of (file_list, dir_list)
+    """
+    username = request.user.username
+    starred_files = get_dir_starred_files(username, repo.id, path)
+    fileshares = dict([(fs.path, fs.token) for fs in FileShare.objects.filter(
+        repo_id=repo.id).filter(username=username)])
+    uploadlinks = dict([(ul.path, ul.token) for ul in UploadLinkShare.objects.filter(
+        repo_id=repo.id).filter(username=username)])
+
+    links = DirentLinks(repo.id, path, view_lib_file)
+    dir_list = []
+    file_list = []
+    for dirent in dirents:
+        row = DirentRow(dirent, links)
+        if row.is_dir():
+            dpath = row.path
+            if dpath[-1] != '/':
+                dpath += '/'
+            token = fileshares.get(dpath)
+            if token:
+                row.sharelink = gen_dir_share_link(token)
+                row.sharetoken = token
+            token = uploadlinks.get(dpath)
+            if token:
+                row.uploadlink = gen_shared_upload_link(token)
+                row.uploadtoken = token
+            dir_list.append(row)
+        else:
+            if repo.version == 0:
+                row.file_size = get_file_size(repo.store_id, repo.version, row.obj_id)
+            else:
+                row.file_size = row.size
+            fpath = row.path
+            if fpath in starred_files:
+                row.starred = True
+            token = fileshares.get(fpath)
+            if token:
+                row.sharelink = gen_file_share_link(token)
+                row.sharetoken = token
+            file_list.append(row)
+
+    return (file_list, dir_list)
+
 def get_repo_dirents_with_perm(request, repo, commit, path, offset=-1, limit=-1):
     """List repo dirents with perm based on commit id and path.
     Use ``offset`` and ``limit`` to do paginating.
@@ -238,79 +328,24 @@ def get_repo_dirents_with_perm(request, repo, commit, path, offset=-1, limit=-1)
     if get_system_default_repo_id() == repo.id:
         return get_repo_dirents(request, repo, commit, path, offset, limit)
 
-    dir_list = []
-    file_list = []
-    dirent_more = False
     username = request.user.username
     if commit.root_id == EMPTY_SHA1:
-        return ([], [], False) if limit == -1 else ([], [], False)
-    else:
-        try:
-            dir_id = seafile_api.get_dir_id_by_path(repo.id, path)
-            if not dir_id:
-                return ([], [], False)
-            dirs = seafserv_threaded_rpc.list_dir_with_perm(repo.id, path,
-                                                            dir_id, username,
-                                                            offset, limit)
-        except SearpcError as e:
-            logger.error(e)
+        return ([], [], False)
+
+    try:
+        dir_id = seafile_api.get_dir_id_by_path(repo.id, path)
+        if not dir_id:
             return ([], [], False)
+        dirs = seafserv_threaded_rpc.list_dir_with_perm(repo.id, path,
+                                                        dir_id, username,
+                                                        offset, limit)
+    except SearpcError as e:
+        logger.error(e)
+        return ([], [], False)
 
-        if limit != -1 and limit == len(dirs):
-            dirent_more = True
-
-        starred_files = get_dir_starred_files(username, repo.id, path)
-        fileshares = FileShare.objects.filter(repo_id=repo.id).filter(username=username)
-        uploadlinks = UploadLinkShare.objects.filter(repo_id=repo.id).filter(username=username)
-
-        view_dir_base = reverse('repo', args=[repo.id])
-        dl_dir_base = reverse('repo_download_dir', args=[repo.id])
-        view_file_base = reverse('repo_view_file', args=[repo.id])
-        file_history_base = reverse('file_revisions', args=[repo.id])
-        for dirent in dirs:
-            dirent.last_modified = dirent.mtime
-            dirent.sharelink = ''
-            dirent.uploadlink = ''
-            if stat.S_ISDIR(dirent.props.mode):
-                dpath = posixpath.join(path, dirent.obj_name)
-                if dpath[-1] != '/':
-                    dpath += '/'
-                for share in fileshares:
-                    if dpath == share.path:
-                        dirent.sharelink = gen_dir_share_link(share.token)
-                        dirent.sharetoken = share.token
-                        break
-                for link in uploadlinks:
-                    if dpath == link.path:
-                        dirent.uploadlink = gen_shared_upload_link(link.token)
-                        dirent.uploadtoken = link.token
-                        break
-                p_dpath = posixpath.join(path, dirent.obj_name)
-                dirent.view_link = view_dir_base + '?p=' + urlquote(p_dpath)
-                dirent.dl_link = dl_dir_base + '?p=' + urlquote(p_dpath)
-                dir_list.append(dirent)
-            else:
-                file_list.append(dirent)
-                if repo.version == 0:
-                    dirent.file_size = get_file_size(repo.store_id, repo.version, dirent.obj_id)
-                else:
-                    dirent.file_size = dirent.size
-                dirent.starred = False
-                fpath = posixpath.join(path, dirent.obj_name)
-                p_fpath = posixpath.join(path, dirent.obj_name)
-                dirent.view_link = view_file_base + '?p=' + urlquote(p_fpath)
-                dirent.dl_link = get_file_download_link(repo.id, dirent.obj_id,
-                                                        p_fpath)
-                dirent.history_link = file_history_base + '?p=' + urlquote(p_fpath)
-                if fpath in starred_files:
-                    dirent.starred = True
-                for share in fileshares:
-                    if fpath == share.path:
-                        dirent.sharelink = gen_file_share_link(share.token)
-                        dirent.sharetoken = share.token
-                        break
-
-        return (file_list, dir_list, dirent_more)
+    dirent_more = limit != -1 and limit == len(dirs)
+    file_list, dir_list = _get_dirent_rows(request, repo, path, dirs)
+    return (file_list, dir_list, dirent_more)
 
 def get_repo_dirents(request, repo, commit, path, offset=-1, limit=-1):
     """List repo dirents based on commit id and path. Use ``offset`` and
@@ -321,78 +356,23 @@ def get_repo_dirents(request, repo, commit, path, offset=-1, limit=-1):
     TODO: Some unrelated parts(file sharing, stars, modified info, etc) need
     to be pulled out to multiple functions.
     """
-
-    dir_list = []
-    file_list = []
-    dirent_more = False
     if commit.root_id == EMPTY_SHA1:
-        return ([], [], False) if limit == -1 else ([], [], False)
-    else:
-        try:
-            dirs = seafile_api.list_dir_by_commit_and_path(commit.repo_id,
-                                                           commit.id, path,
-                                                           offset, limit)
-            if not dirs:
-                return ([], [], False)
-        except SearpcError as e:
-            logger.error(e)
+        return ([], [], False)
+
+    try:
+        dirs = seafile_api.list_dir_by_commit_and_path(commit.repo_id,
+                                                       commit.id, path,
+                                                       offset, limit)
+        if not dirs:
             return ([], [], False)
+    except SearpcError as e:
+        logger.error(e)
+        return ([], [], False)
 
-        if limit != -1 and limit == len(dirs):
-            dirent_more = True
-
-        username = request.user.username
-        starred_files = get_dir_starred_files(username, repo.id, path)
-        fileshares = FileShare.objects.filter(repo_id=repo.id).filter(username=username)
-        uploadlinks = UploadLinkShare.objects.filter(repo_id=repo.id).filter(username=username)
-
-        view_dir_base = reverse('repo', args=[repo.id])
-        dl_dir_base = reverse('repo_download_dir', args=[repo.id])
-        file_history_base = reverse('file_revisions', args=[repo.id])
-        for dirent in dirs:
-            dirent.last_modified = dirent.mtime
-            dirent.sharelink = ''
-            dirent.uploadlink = ''
-            if stat.S_ISDIR(dirent.props.mode):
-                dpath = posixpath.join(path, dirent.obj_name)
-                if dpath[-1] != '/':
-                    dpath += '/'
-                for share in fileshares:
-                    if dpath == share.path:
-                        dirent.sharelink = gen_dir_share_link(share.token)
-                        dirent.sharetoken = share.token
-                        break
-                for link in uploadlinks:
-                    if dpath == link.path:
-                        dirent.uploadlink = gen_shared_upload_link(link.token)
-                        dirent.uploadtoken = link.token
-                        break
-                p_dpath = posixpath.join(path, dirent.obj_name)
-                dirent.view_link = view_dir_base + '?p=' + urlquote(p_dpath)
-                dirent.dl_link = dl_dir_base + '?p=' + urlquote(p_dpath)
-                dir_list.append(dirent)
-            else:
-                file_list.append(dirent)
-                if repo.version == 0:
-                    dirent.file_size = get_file_size(repo.store_id, repo.version, dirent.obj_id)
-                else:
-                    dirent.file_size = dirent.size
-                dirent.starred = False
-                fpath = posixpath.join(path, dirent.obj_name)
-                p_fpath = posixpath.join(path, dirent.obj_name)
-                dirent.view_link = reverse('view_lib_file', args=[repo.id, urlquote(p_fpath)])
-                dirent.dl_link = get_file_download_link(repo.id, dirent.obj_id,
-                                                        p_fpath)
-                dirent.history_link = file_history_base + '?p=' + urlquote(p_fpath)
-                if fpath in starred_files:
-                    dirent.starred = True
-                for share in fileshares:
-                    if fpath == share.path:
-                        dirent.sharelink = gen_file_share_link(share.token)
-                        dirent.sharetoken = share.token
-                        break
-
-        return (file_list, dir_list, dirent_more)
+    dirent_more = limit != -1 and limit == len(dirs)
+    file_list, dir_list = _get_dirent_rows(request, repo, path, dirs,
+                                           view_lib_file=True)
+    return (file_list, dir_list, dirent_more)
 
 def get_unencry_rw_repos_by_user(request):
     """Get all unencrypted repos the user can read and write.
@@ -1159,23 +1139,19 @@ def get_diff(repo_id, arg1, arg2):
     lists = {'new': [], 'removed': [], 'renamed': [], 'modified': [],
              'newdir': [], 'deldir': []}
 
-    diff_result = seafserv_threaded_rpc.get_diff(repo_id, arg1, arg2)
-    if not diff_result:
-        return lists
-
-    for d in diff_result:
-        if d.status == "add":
-            lists['new'].append(fpath_to_link(repo_id, d.name))
-        elif d.status == "del":
-            lists['removed'].append(escape(d.name))
-        elif d.status == "mov":
-            lists['renamed'].append(escape(d.name) + " ==> " + fpath_to_link(repo_id, d.new_name))
-        elif d.status == "mod":
-            lists['modified'].append(fpath_to_link(repo_id, d.name))
-        elif d.status == "newdir":
-            lists['newdir'].append(fpath_to_link(repo_id, d.name, is_dir=True))
-        elif d.status == "deldir":
-            lists['deldir'].append(escape(d.name))
+    for status, name, new_name in get_commit_diff(repo_id, arg1, arg2):
+        if status == "add":
+            lists['new'].append(fpath_to_link(repo_id, name))
+        elif status == "del":
+            lists['removed'].append(escape(name))
+        elif status == "mov":
+            lists['renamed'].append(escape(name) + " ==> " + fpath_to_link(repo_id, new_name))
+        elif status == "mod":
+            lists['modified'].append(fpath_to_link(repo_id, name))
+        elif status == "newdir":
+            lists['newdir'].append(fpath_to_link(repo_id, name, is_dir=True))
+        elif status == "deldir":
+            lists['deldir'].append(escape(name))
 
     return lists
 
@@ -1473,14 +1449,17 @@ def render_file_revisions (request, repo_id):
     else:
         can_compare = False
 
+    cursor = request.GET.get('cursor', None)
     try:
-        commits = seafile_api.get_file_revisions(repo_id, path, -1, -1, days)
+        revisions, next_cursor = get_file_revisions_page(repo, path, cursor,
+                                                         days=days)
     except SearpcError, e:
         logger.error(e.msg)
         return render_error(request, e.msg)
 
-    if not commits:
+    if not revisions:
         return render_error(request, _(u'No revisions found'))
+    commits = [FileRevision(x) for x in revisions]
 
     # Check whether user is repo owner
     if validate_owner(request, repo_id):
@@ -1488,12 +1467,6 @@ def render_file_revisions (request, repo_id):
     else:
         is_owner = False
 
-    cur_path = path
-    for commit in commits:
-        commit.path = cur_path
-        if commit.rev_renamed_old_path:
-            cur_path = '/' + commit.rev_renamed_old_path
-
     zipped = gen_path_link(path, repo.name)
 
     can_revert_file = True
@@ -1514,6 +1487,8 @@ def render_file_revisions (request, repo_id):
         'can_compare': can_compare,
         'can_revert_file': can_revert_file,
         'days': days,
+        'cursor': cursor,
+        'next_cursor': next_cursor,
         }, context_instance=RequestContext(request))
 
 @login_required
@@ -1945,25 +1920,25 @@ def convert_cmmt_desc_link(request):
     if check_repo_access_permission(repo_id, request.user) is None:
         raise Http404
 
-    diff_result = seafserv_threaded_rpc.get_diff(repo_id, '', cmmt_id)
+    diff_result = get_commit_diff(repo_id, '', cmmt_id)
     if not diff_result:
         raise Http404
 
-    for d in diff_result:
-        if name not in d.name:
+    for status, d_name, d_new_name in diff_result:
+        if name not in d_name:
             # skip to next diff_result if file/folder user clicked does not
             # match the diff_result
             continue
 
-        if d.status == 'add' or d.status == 'mod':  # Add or modify file
+        if status == 'add' or status == 'mod':  # Add or modify file
             return HttpResponseRedirect(
-                reverse('view_lib_file', args=[repo_id, '/' + urlquote(d.name)]))
-        elif d.status == 'mov':  # Move or Rename file
+                reverse('view_lib_file', args=[repo_id, '/' + urlquote(d_name)]))
+        elif status == 'mov':  # Move or Rename file
             return HttpResponseRedirect(
-                reverse('view_lib_file', args=[repo_id, '/' + urlquote(d.new_name)]))
-        elif d.status == 'newdir':
+                reverse('view_lib_file', args=[repo_id, '/' + urlquote(d_new_name)]))
+        elif status == 'newdir':
             return HttpResponseRedirect(
-                reverse('view_common_lib_dir', args=[repo_id, urlquote(d.name).strip('/')]))
+                reverse('view_common_lib_dir', args=[repo_id, urlquote(d_name).strip('/')]))
         else:
             continue
 
@@ -18,8 +18,7 @@ from django.template.defaultfilters import filesizeformat
 import seaserv
 from seaserv import seafile_api, seafserv_rpc, is_passwd_set, \
     get_related_users_by_repo, get_related_users_by_org_repo, \
-    CALC_SHARE_USAGE, seafserv_threaded_rpc, ccnet_threaded_rpc, \
-    get_user_quota_usage, get_user_share_usage, edit_repo, \
+    CALC_SHARE_USAGE, ccnet_threaded_rpc, edit_repo, \
     set_repo_history_limit
 from pysearpc import SearpcError
 
@@ -31,7 +30,6 @@ from seahub.forms import RepoNewDirentForm, RepoRenameDirentForm, \
 from seahub.options.models import UserOptions, CryptoOptionNotSetError
 from seahub.notifications.models import UserNotification
 from seahub.notifications.views import add_notice_from_info
-from seahub.message.models import UserMessage
 from seahub.share.models import UploadLinkShare
 from seahub.group.models import PublicGroup
 from seahub.signals import upload_file_successful, repo_created, repo_deleted
@@ -39,7 +37,7 @@ from seahub.views import get_repo_dirents_with_perm, validate_owner, \
     check_repo_access_permission, get_unencry_rw_repos_by_user, \
     get_system_default_repo_id, get_diff, group_events_data, \
     get_owned_repo_list, check_folder_permission, is_registered_user, \
-    check_file_lock
+    check_folder_children_permission, del_dirents, check_file_lock
 from seahub.views.repo import get_nav_path, get_fileshare, get_dir_share_link, \
     get_uploadlink, get_dir_shared_upload_link
 from seahub.views.modules import get_enabled_mods_by_group, \
@@ -53,13 +51,18 @@ from seahub.settings import ENABLE_THUMBNAIL, THUMBNAIL_ROOT, \
     ENABLE_FOLDER_PERM, SHOW_TRAFFIC
 from constance import config
 from seahub.utils import check_filename_with_rename, EMPTY_SHA1, \
-    gen_block_get_url, TRAFFIC_STATS_ENABLED, get_user_traffic_stat,\
+    gen_block_get_url, TRAFFIC_STATS_ENABLED, \
     new_merge_with_no_conflict, get_commit_before_new_merge, \
     get_repo_last_modify, gen_file_upload_url, is_org_context, \
     get_org_user_events, get_user_events, get_file_type_and_ext, \
     is_valid_username, send_perm_audit_msg, get_origin_repo_info, is_pro_version
 from seahub.utils.repo import get_sub_repo_abbrev_origin_path
 from seahub.utils.star import star_file, unstar_file
+from seahub.utils.dirents_job import submit_dirents_job
+from seahub.utils.quota import get_user_quota_usage
+from seahub.utils.rpc import RPCBatch
+from seahub.utils.json_stream import json_stream_response
+from seahub.base.models import DirentsJob
 from seahub.base.accounts import User
 from seahub.thumbnail.utils import get_thumbnail_src, allow_generate_thumbnail
 from seahub.utils.file_types import IMAGE
@@ -131,10 +134,19 @@ def get_dirents(request, repo_id):
         return HttpResponse(json.dumps({"error": e.msg}), status=500,
                             content_type=content_type)
 
+    # sort dirents by name before building entries, dirs go first
     d_list = []
     f_list = []
     for dirent in dirents:
         if stat.S_ISDIR(dirent.mode):
+            d_list.append(dirent)
+        elif not dir_only:
+            f_list.append(dirent)
+    d_list.sort(key=lambda d: d.obj_name.lower())
+    f_list.sort(key=lambda d: d.obj_name.lower())
+
+    def iter_dirents():
+        for dirent in d_list:
             dirent.has_subdir = False
 
             if dir_only:
@@ -148,25 +160,21 @@ def get_dirents(request, repo_id):
                         dirent.has_subdir = True
                         break
 
-            subdir = {
+            yield {
                 'name': dirent.obj_name,
                 'id': dirent.obj_id,
                 'type': 'dir',
                 'has_subdir': dirent.has_subdir, # to decide node 'state' ('closed' or not) in jstree
             }
-            d_list.append(subdir)
-        else:
-            if not dir_only:
-                f = {
-                    'id': dirent.obj_id,
-                    'name': dirent.obj_name,
-                    'type': 'file',
-                    }
-                f_list.append(f)
-
-    d_list.sort(lambda x, y : cmp(x['name'].lower(), y['name'].lower()))
-    f_list.sort(lambda x, y : cmp(x['name'].lower(), y['name'].lower()))
-    return HttpResponse(json.dumps(d_list + f_list), content_type=content_type)
+
+        for dirent in f_list:
+            yield {
+                'id': dirent.obj_id,
+                'name': dirent.obj_name,
+                'type': 'file',
+            }
+
+    return json_stream_response(iter_dirents())
 
 @login_required_ajax
 def get_unenc_group_repos(request, group_id):
@@ -251,7 +259,21 @@ def list_dir(request, repo_id):
                             status=400, content_type=content_type)
 
     username = request.user.username
-    user_perm = check_repo_access_permission(repo.id, request.user)
+
+    # issue independent RPC calls together
+    batch = RPCBatch()
+    user_perm_call = batch.submit('check_repo_access_permission',
+                                  check_repo_access_permission, repo.id,
+                                  request.user)
+    head_commit_call = batch.submit('get_commit', get_commit, repo.id,
+                                    repo.version, repo.head_cmmt_id)
+    passwd_set_call = None
+    if repo.encrypted:
+        passwd_set_call = batch.submit('is_password_set',
+                                       seafile_api.is_password_set, repo.id,
+                                       username)
+
+    user_perm = user_perm_call.result()
     if user_perm is None:
         err_msg = _(u'Permission denied.')
         return HttpResponse(json.dumps({'error': err_msg}),
@@ -267,12 +289,13 @@ def list_dir(request, repo_id):
 
     if repo.encrypted and \
             (repo.enc_version == 1 or (repo.enc_version == 2 and server_crypto)) \
-            and not seafile_api.is_password_set(repo.id, username):
+            and not passwd_set_call.result():
         err_msg = _(u'Library is encrypted.')
         return HttpResponse(json.dumps({'error': err_msg}),
                             status=403, content_type=content_type)
 
-    head_commit = get_commit(repo.id, repo.version, repo.head_cmmt_id)
+    head_commit = head_commit_call.result()
+    batch.log_timings()
     if not head_commit:
         err_msg = _(u'Error: no head commit id')
         return HttpResponse(json.dumps({'error': err_msg}),
@@ -729,22 +752,8 @@ def delete_dirents(request, repo_id):
         return HttpResponse(json.dumps({'error': err_msg}),
                 status=400, content_type=content_type)
 
-    # permission checking
-    username = request.user.username
-    deleted = []
-    undeleted = []
-    for dirent_name in dirents_names:
-        full_path = posixpath.join(parent_dir, dirent_name)
-        if check_folder_permission(request, repo.id, full_path) != 'rw':
-            undeleted.append(dirent_name)
-            continue
-        try:
-            seafile_api.del_file(repo_id, parent_dir, dirent_name, username)
-            deleted.append(dirent_name)
-        except SearpcError, e:
-            logger.error(e)
-            undeleted.append(dirent_name)
-
+    deleted, undeleted = del_dirents(request, repo.id, parent_dir,
+                                     dirents_names)
     return HttpResponse(json.dumps({'deleted': deleted, 'undeleted': undeleted}),
                         content_type=content_type)
 
@@ -1041,41 +1050,30 @@ def mv_dirents(request, src_repo_id, src_path, dst_repo_id, dst_path,
     else:
         allowed_files = obj_file_names
 
+    dir_perms = check_folder_children_permission(request, src_repo_id,
+                                                 src_path, obj_dir_names)
     for obj_name in obj_dir_names:
         src_dir = posixpath.join(src_path, obj_name)
-        if dst_path.startswith(src_dir + '/'):
+        if src_repo_id == dst_repo_id and dst_path.startswith(src_dir + '/'):
             error_msg = _(u'Can not move directory %(src)s to its subdirectory %(des)s') \
                 % {'src': escape(src_dir), 'des': escape(dst_path)}
             result['error'] = error_msg
             return HttpResponse(json.dumps(result), status=400, content_type=content_type)
 
         # check every folder perm
-        if check_folder_permission(request, src_repo_id, src_dir) != 'rw':
+        if dir_perms[obj_name] != 'rw':
             failed.append(obj_name)
         else:
             allowed_dirs.append(obj_name)
 
-    success = []
-    url = None
-    for obj_name in allowed_files + allowed_dirs:
-        new_obj_name = check_filename_with_rename(dst_repo_id, dst_path, obj_name)
-        try:
-            res = seafile_api.move_file(src_repo_id, src_path, obj_name,
-                                  dst_repo_id, dst_path, new_obj_name, username, need_progress=1)
-        except SearpcError as e:
-            logger.error(e)
-            res = None
-
-        if not res:
-            failed.append(obj_name)
-        else:
-            success.append(obj_name)
-
-    if len(success) > 0:
-        url = reverse('repo', args=[dst_repo_id]) + '?p=' + urlquote(dst_path)
+    job = submit_dirents_job(username, DirentsJob.OP_MOVE, src_repo_id,
+                             src_path, dst_repo_id, dst_path,
+                             allowed_files + allowed_dirs, failed)
+    if job is None:
+        result['error'] = _(u'Please wait until the running copy/move is finished.')
+        return HttpResponse(json.dumps(result), status=400, content_type=content_type)
 
-    result = {'success': success, 'failed': failed, 'url': url}
-    return HttpResponse(json.dumps(result), content_type=content_type)
+    return HttpResponse(json.dumps(job.to_dict()), content_type=content_type)
 
 @login_required_ajax
 @dirents_copy_move_common()
@@ -1091,33 +1089,72 @@ def cp_dirents(request, src_repo_id, src_path, dst_repo_id, dst_path, obj_file_n
 
     for obj_name in obj_dir_names:
         src_dir = posixpath.join(src_path, obj_name)
-        if dst_path.startswith(src_dir):
+        if src_repo_id == dst_repo_id and dst_path.startswith(src_dir):
             error_msg = _(u'Can not copy directory %(src)s to its subdirectory %(des)s') \
                 % {'src': escape(src_dir), 'des': escape(dst_path)}
             result['error'] = error_msg
             return HttpResponse(json.dumps(result), status=400, content_type=content_type)
 
-    failed = []
-    success = []
-    url = None
-    for obj_name in obj_file_names + obj_dir_names:
-        new_obj_name = check_filename_with_rename(dst_repo_id, dst_path, obj_name)
-        try:
-            res = seafile_api.copy_file(src_repo_id, src_path, obj_name,
-                                  dst_repo_id, dst_path, new_obj_name, username, need_progress=1)
-        except SearpcError as e:
-            logger.error(e)
-            res = None
+    job = submit_dirents_job(username, DirentsJob.OP_COPY, src_repo_id,
+                             src_path, dst_repo_id, dst_path,
+                             obj_file_names + obj_dir_names)
+    if job is None:
+        result['error'] = _(u'Please wait until the running copy/move is finished.')
+        return HttpResponse(json.dumps(result), status=400, content_type=content_type)
 
-        if not res:
-            failed.append(obj_name)
+    return HttpResponse(json.dumps(job.to_dict()), content_type=content_type)
+
+@login_required_ajax
+def get_dirents_job_progress(request):
+    '''
+        Fetch aggregated progress of a multiple files/dirs mv/cp job.
+    '''
+    content_type = 'application/json; charset=utf-8'
+    result = {}
+
+    job_id = request.GET.get('job_id')
+    if not job_id:
+        result['error'] = _(u'Argument missing')
+        return HttpResponse(json.dumps(result), status=400,
+                    content_type=content_type)
+
+    job = DirentsJob.objects.get_user_job(request.user.username, job_id)
+    if job is None:
+        result['error'] = _(u'Job not found.')
+        return HttpResponse(json.dumps(result), status=404,
+                    content_type=content_type)
+
+    result = job.to_dict()
+    if job.status == DirentsJob.STATUS_DONE:
+        if result['result']['success']:
+            result['result']['url'] = reverse('repo', args=[job.dst_repo_id]) + \
+                '?p=' + urlquote(job.dst_path)
         else:
-            success.append(obj_name)
+            result['result']['url'] = None
 
-    if len(success) > 0:
-        url = reverse('repo', args=[dst_repo_id]) + '?p=' + urlquote(dst_path)
+    return HttpResponse(json.dumps(result), content_type=content_type)
+
+@login_required_ajax
+@require_POST
+def cancel_dirents_job(request):
+    '''
+        Cancel a multiple files/dirs mv/cp job.
+    '''
+    content_type = 'application/json; charset=utf-8'
+    result = {}
+
+    job_id = request.POST.get('job_id')
+    if not job_id:
+        result['error'] = _(u'Argument missing')
+        return HttpResponse(json.dumps(result), status=400,
+                    content_type=content_type)
+
+    if not DirentsJob.objects.cancel_user_job(request.user.username, job_id):
+        result['error'] = _('Cancel failed')
+        return HttpResponse(json.dumps(result), status=400,
+                    content_type=content_type)
 
-    result = {'success': success, 'failed': failed, 'url': url}
+    result['success'] = True
     return HttpResponse(json.dumps(result), content_type=content_type)
 
 @login_required_ajax
@@ -1510,17 +1547,8 @@ def set_notices_seen(request):
     content_type = 'application/json; charset=utf-8'
     username = request.user.username
 
-    unseen_notices = UserNotification.objects.get_user_notifications(username,
-                                                                     seen=False)
-    for notice in unseen_notices:
-        notice.seen = True
-        notice.save()
-
-        # mark related user msg as read
-        if notice.is_user_message():
-            d = notice.user_message_detail_to_dict()
-            msg_from = d.get('msg_from')
-            UserMessage.objects.update_unread_messages(msg_from, username)
+    # mark notices seen and related user msgs read in bulk
+    UserNotification.objects.seen_all_user_notifications(username)
 
     return HttpResponse(json.dumps({'success': True}), content_type=content_type)
 
@@ -1603,25 +1631,13 @@ def space_and_traffic(request):
     content_type = 'application/json; charset=utf-8'
     username = request.user.username
 
-    # space & quota calculation
-    org = ccnet_threaded_rpc.get_orgs_by_user(username)
-    if not org:
-        space_quota = seafile_api.get_user_quota(username)
-        space_usage = seafile_api.get_user_self_usage(username)
-        if CALC_SHARE_USAGE:
-            share_quota = seafile_api.get_user_share_quota(username)
-            share_usage = seafile_api.get_user_share_usage(username)
-        else:
-            share_quota = 0
-            share_usage = 0
-    else:
-        org_id = org[0].org_id
-        space_quota = seafserv_threaded_rpc.get_org_user_quota(org_id,
-                                                               username)
-        space_usage = seafserv_threaded_rpc.get_org_user_quota_usage(
-            org_id, username)
-        share_quota = 0         # no share quota/usage for org account
-        share_usage = 0
+    # space & quota calculation, cached for a short time
+    snapshot = get_user_quota_usage(username)
+    org = snapshot['org_id'] is not None
+    space_quota = snapshot['space_quota']
+    space_usage = snapshot['space_usage']
+    share_quota = snapshot['share_quota']
+    share_usage = snapshot['share_usage']
 
     rates = {}
     rates['space_quota'] = space_quota
@@ -1638,17 +1654,7 @@ def space_and_traffic(request):
         rates['share_usage'] = '0%'
 
     # traffic calculation
-    traffic_stat = 0
-    if TRAFFIC_STATS_ENABLED:
-        # User's network traffic stat in this month
-        try:
-            stat = get_user_traffic_stat(username)
-        except Exception as e:
-            logger.error(e)
-            stat = None
-
-        if stat:
-            traffic_stat = stat['file_view'] + stat['file_download'] + stat['dir_download']
+    traffic_stat = snapshot['traffic_stat']
 
     # payment url, TODO: need to remove from here.
     payment_url = ''
@@ -61,6 +61,8 @@ from seahub.utils.ip import get_remote_ip
 from seahub.utils.file_types import (IMAGE, PDF, DOCUMENT, SPREADSHEET, AUDIO,
                                      MARKDOWN, TEXT, OPENDOCUMENT, VIDEO)
 from seahub.utils.star import is_file_starred
+from seahub.utils.perm import get_perm_resolver
+from seahub.utils.rpc import RPCBatch
 from seahub.utils import HAS_OFFICE_CONVERTER, FILEEXT_TYPE_MAP
 from seahub.utils.http import json_response, int_param, BadRequestException, RequestForbbiddenException
 from seahub.views import check_folder_permission, check_file_lock
@@ -377,24 +379,47 @@ def _file_view(request, repo_id, path):
     if not repo:
         raise Http404
 
-    obj_id = get_file_id_by_path(repo_id, path)
+    # issue independent RPC calls together
+    batch = RPCBatch()
+    obj_id_call = batch.submit('get_file_id_by_path', get_file_id_by_path,
+                               repo_id, path)
+    file_perm_call = batch.submit('check_permission_by_path',
+                                  get_perm_resolver(request.user).path_perm,
+                                  repo_id, path)
+    is_download = request.GET.get('dl', '0') == '1'
+    if not is_download:
+        commits_call = batch.submit('get_commits', get_commits, repo_id, 0, 1)
+        if is_org_context(request):
+            repo_owner_call = batch.submit('get_org_repo_owner',
+                                           seafile_api.get_org_repo_owner,
+                                           repo.id)
+        else:
+            repo_owner_call = batch.submit('is_repo_owner',
+                                           seafile_api.is_repo_owner,
+                                           username, repo.id)
+        # get real path for sub repo
+        real_path = repo.origin_path + path if repo.origin_path else path
+        dirent_call = batch.submit('get_dirent_by_path',
+                                   seafile_api.get_dirent_by_path,
+                                   repo.store_id, real_path)
+
+    obj_id = obj_id_call.result()
     if not obj_id:
         return render_error(request, _(u'File does not exist'))
 
     # construct some varibles
     u_filename = os.path.basename(path)
-    current_commit = get_commits(repo_id, 0, 1)[0]
     # get file type and extension
     filetype, fileext = get_file_type_and_ext(u_filename)
 
     # Check whether user has permission to view file and get file raw path,
     # render error page if permission deny.
-    file_perm = seafile_api.check_permission_by_path(repo_id, path, username)
+    file_perm = file_perm_call.result()
     if not file_perm:
         return render_permission_error(request, _(u'Unable to view file'))
 
     # Pass permission check, start download or render file.
-    if request.GET.get('dl', '0') == '1':
+    if is_download:
         token = seafile_api.get_fileserver_access_token(repo_id, obj_id,
                                                         'download', username,
                                                         use_onetime=True)
@@ -426,12 +451,14 @@ def _file_view(request, repo_id, path):
             return render_to_response('view_wopi_file.html', wopi_dict,
                       context_instance=RequestContext(request))
 
+    current_commit = commits_call.result()[0]
+
     # check if the user is the owner or not, for 'private share'
     if is_org_context(request):
-        repo_owner = seafile_api.get_org_repo_owner(repo.id)
+        repo_owner = repo_owner_call.result()
         is_repo_owner = True if repo_owner == username else False
     else:
-        is_repo_owner = seafile_api.is_repo_owner(username, repo.id)
+        is_repo_owner = repo_owner_call.result()
 
     img_prev = None
     img_next = None
@@ -506,9 +533,8 @@ def _file_view(request, repo_id, path):
 
     # fetch file contributors and latest contributor
     try:
-        # get real path for sub repo
-        real_path = repo.origin_path + path if repo.origin_path else path
-        dirent = seafile_api.get_dirent_by_path(repo.store_id, real_path)
+        dirent = dirent_call.result()
+        batch.log_timings()
         if dirent:
             latest_contributor, last_modified = dirent.modifier, dirent.mtime
         else:
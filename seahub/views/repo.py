@@ -39,6 +39,7 @@ from seahub.settings import ENABLE_SUB_LIBRARY, FORCE_SERVER_CRYPTO, \
     THUMBNAIL_ROOT, THUMBNAIL_DEFAULT_SIZE, THUMBNAIL_SIZE_FOR_GRID
 from seahub.utils import gen_file_get_url
 from seahub.utils.file_types import IMAGE
+from seahub.utils.rpc import RPCBatch
 from seahub.thumbnail.utils import get_thumbnail_src, \
     allow_generate_thumbnail, get_share_link_thumbnail_src
 
@@ -171,7 +172,27 @@ def render_repo(request, repo):
     """
     username = request.user.username
     path = get_path_from_request(request)
-    user_perm = check_repo_access_permission(repo.id, request.user)
+
+    # issue independent RPC calls together
+    batch = RPCBatch()
+    user_perm_call = batch.submit('check_repo_access_permission',
+                                  check_repo_access_permission, repo.id,
+                                  request.user)
+    head_commit_call = batch.submit('get_commit', get_commit, repo.id,
+                                    repo.version, repo.head_cmmt_id)
+    repo_size_call = batch.submit('get_repo_size', get_repo_size, repo.id)
+    no_quota_call = batch.submit('is_no_quota', is_no_quota, repo.id)
+    if is_org_context(request):
+        repo_owner_call = batch.submit('get_org_repo_owner',
+                                       seafile_api.get_org_repo_owner, repo.id)
+    else:
+        repo_owner_call = batch.submit('get_repo_owner',
+                                       seafile_api.get_repo_owner, repo.id)
+    repo_groups_call = batch.submit('get_shared_groups_by_repo_and_user',
+                                    get_shared_groups_by_repo_and_user,
+                                    repo.id, username)
+
+    user_perm = user_perm_call.result()
     if user_perm is None:
         return render_error(request, _(u'Permission denied'))
 
@@ -203,7 +224,7 @@ def render_repo(request, repo):
     for g in request.user.joined_groups:
         g.avatar = grp_avatar(g.id, 20)
 
-    head_commit = get_commit(repo.id, repo.version, repo.head_cmmt_id)
+    head_commit = head_commit_call.result()
     if not head_commit:
         raise Http404
 
@@ -212,25 +233,25 @@ def render_repo(request, repo):
     else:
         info_commit = head_commit
 
-    repo_size = get_repo_size(repo.id)
-    no_quota = is_no_quota(repo.id)
-    if is_org_context(request):
-        repo_owner = seafile_api.get_org_repo_owner(repo.id)
-    else:
-        repo_owner = seafile_api.get_repo_owner(repo.id)
-    is_repo_owner = True if repo_owner == username else False
-    if is_repo_owner and not repo.is_virtual:
-        show_repo_settings = True
-    else:
-        show_repo_settings = False
-
+    # list dirents while the rest RPC calls are running
     file_list, dir_list, dirent_more = get_repo_dirents_with_perm(
         request, repo, head_commit, path, offset=0, limit=100)
     more_start = None
     if dirent_more:
         more_start = 100
     zipped = get_nav_path(path, repo.name)
-    repo_groups = get_shared_groups_by_repo_and_user(repo.id, username)
+
+    repo_size = repo_size_call.result()
+    no_quota = no_quota_call.result()
+    repo_owner = repo_owner_call.result()
+    is_repo_owner = True if repo_owner == username else False
+    if is_repo_owner and not repo.is_virtual:
+        show_repo_settings = True
+    else:
+        show_repo_settings = False
+
+    repo_groups = repo_groups_call.result()
+    batch.log_timings()
     if len(repo_groups) > 1:
         repo_group_str = render_to_string("snippets/repo_group_list.html",
                                           {'groups': repo_groups})
@@ -319,7 +340,20 @@ def repo_history_view(request, repo_id):
 
     username = request.user.username
     path = get_path_from_request(request)
-    user_perm = check_repo_access_permission(repo.id, request.user)
+
+    # issue independent RPC calls together
+    batch = RPCBatch()
+    user_perm_call = batch.submit('check_repo_access_permission',
+                                  check_repo_access_permission, repo.id,
+                                  request.user)
+    if is_org_context(request):
+        repo_owner_call = batch.submit('get_org_repo_owner',
+                                       seafile_api.get_org_repo_owner, repo.id)
+    else:
+        repo_owner_call = batch.submit('get_repo_owner',
+                                       seafile_api.get_repo_owner, repo.id)
+
+    user_perm = user_perm_call.result()
     if user_perm is None:
         return render_error(request, _(u'Permission denied'))
 
@@ -349,8 +383,9 @@ def repo_history_view(request, repo_id):
                                                         current_commit, path)
     zipped = get_nav_path(path, repo.name)
 
-    repo_owner = seafile_api.get_repo_owner(repo.id)
+    repo_owner = repo_owner_call.result()
     is_repo_owner = True if username == repo_owner else False
+    batch.log_timings()
 
     return render_to_response('repo_history_view.html', {
             'repo': repo,
@@ -16,7 +16,10 @@ from django.contrib import messages
 from django.http import HttpResponse, Http404, HttpResponseRedirect, HttpResponseNotAllowed
 from django.shortcuts import render_to_response
 from django.template import RequestContext
+from django.template.defaultfilters import filesizeformat
+from django.template.loader import render_to_string
 from django.utils import timezone
+from django.utils.http import urlencode
 from django.utils.translation import ugettext as _
 
 import seaserv
@@ -36,7 +39,12 @@ from seahub.utils import IS_EMAIL_CONFIGURED, string2list, is_valid_username, \
     is_pro_version, send_html_email, get_user_traffic_list, get_server_id, \
     clear_token, gen_file_get_url, is_org_context, handle_virus_record, \
     get_virus_record_by_id, get_virus_record
+from seahub.utils.quota import clear_user_quota_usage_cache
+from seahub.utils.autocomplete import get_org_scope, \
+    invalidate_autocomplete_index
 from seahub.utils.rpc import mute_seafile_api
+from seahub.utils.share_link_summary import get_link_summaries, \
+    get_link_type, is_stale, refresh_link_summary
 from seahub.utils.licenseparse import parse_license
 from seahub.utils.sysinfo import get_platform_name
 
@@ -64,6 +72,11 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# max number of users whose quota usage is got in one request
+USERS_QUOTA_USAGE_MAX = 100
+# max number of links whose summaries are refreshed in one request
+SHARE_LINK_SUMMARIES_MAX = 100
+
 @login_required
 @sys_staff_required
 def sys_info(request):
@@ -471,6 +484,26 @@ def _populate_user_quota_usage(user):
         logger.error(e)
         user.space_usage = user.space_quota = user.share_usage = user.share_quota = -1
 
+def _populate_user_last_login(users, trial_info=False):
+    """Populate last login time, and trial info if ``trial_info`` is True,
+    to users with one query each.
+    """
+    emails = [x.email for x in users]
+    last_logins = dict(UserLastLogin.objects.filter(
+        username__in=emails).values_list('username', 'last_login'))
+    if trial_info and ENABLE_TRIAL_ACCOUNT:
+        trial_users = dict(TrialAccount.objects.filter(
+            user_or_org__in=emails).values_list('user_or_org', 'expire_date'))
+    else:
+        trial_users = {}
+
+    for user in users:
+        user.last_login = last_logins.get(user.email)
+        if trial_info:
+            user.trial_info = None
+            if user.email in trial_users:
+                user.trial_info = {'expire_date': trial_users[user.email]}
+
 @login_required
 @sys_staff_required
 def sys_user_admin(request):
@@ -492,14 +525,9 @@ def sys_user_admin(request):
             except User.DoesNotExist:
                 continue
 
-            _populate_user_quota_usage(u)
             users.append(u)
 
-        last_logins = UserLastLogin.objects.filter(username__in=[x.username for x in users])
-        for u in users:
-            for e in last_logins:
-                if e.username == u.username:
-                    u.last_login = e.last_login
+        _populate_user_last_login(users)
 
         return render_to_response('sysadmin/sys_useradmin_paid.html', {
             'users': users,
@@ -522,34 +550,17 @@ def sys_user_admin(request):
         page_next = False
 
     users = users_plus_one[:per_page]
-    last_logins = UserLastLogin.objects.filter(username__in=[x.email for x in users])
-    if ENABLE_TRIAL_ACCOUNT:
-        trial_users = TrialAccount.objects.filter(user_or_org__in=[x.email for x in users])
-    else:
-        trial_users = []
+    _populate_user_last_login(users, trial_info=True)
     for user in users:
         if user.email == request.user.email:
             user.is_self = True
 
-        _populate_user_quota_usage(user)
-
         # check user's role
         if user.role == GUEST_USER:
             user.is_guest = True
         else:
             user.is_guest = False
 
-        # populate user last login time
-        user.last_login = None
-        for last_login in last_logins:
-            if last_login.username == user.email:
-                user.last_login = last_login.last_login
-
-        user.trial_info = None
-        for trial_user in trial_users:
-            if trial_user.user_or_org == user.email:
-                user.trial_info = {'expire_date': trial_user.expire_date}
-
     have_ldap = True if len(seaserv.get_emailusers('LDAP', 0, 1)) > 0 else False
 
     platform = get_platform_name()
@@ -596,19 +607,11 @@ def sys_user_admin_ldap_imported(request):
         page_next = False
 
     users = users_plus_one[:per_page]
-    last_logins = UserLastLogin.objects.filter(username__in=[x.email for x in users])
+    _populate_user_last_login(users)
     for user in users:
         if user.email == request.user.email:
             user.is_self = True
 
-        _populate_user_quota_usage(user)
-
-        # populate user last login time
-        user.last_login = None
-        for last_login in last_logins:
-            if last_login.username == user.email:
-                user.last_login = last_login.last_login
-
     return render_to_response(
         'sysadmin/sys_user_admin_ldap_imported.html', {
             'users': users,
@@ -642,19 +645,11 @@ def sys_user_admin_ldap(request):
         page_next = False
 
     users = users_plus_one[:per_page]
-    last_logins = UserLastLogin.objects.filter(username__in=[x.email for x in users])
+    _populate_user_last_login(users)
     for user in users:
         if user.email == request.user.email:
             user.is_self = True
 
-        _populate_user_quota_usage(user)
-
-        # populate user last login time
-        user.last_login = None
-        for last_login in last_logins:
-            if last_login.username == user.email:
-                user.last_login = last_login.last_login
-
     return render_to_response(
         'sysadmin/sys_useradmin_ldap.html', {
             'users': users,
@@ -685,14 +680,11 @@ def sys_user_admin_admins(request):
         else:
             not_admin_users.append(user)
 
-    last_logins = UserLastLogin.objects.filter(username__in=[x.email for x in admin_users])
-
+    _populate_user_last_login(admin_users)
     for user in admin_users:
         if user.email == request.user.email:
             user.is_self = True
 
-        _populate_user_quota_usage(user)
-
         # check db user's role
         if user.source == "DB":
             if user.role == GUEST_USER:
@@ -700,12 +692,6 @@ def sys_user_admin_admins(request):
             else:
                 user.is_guest = False
 
-        # populate user last login time
-        user.last_login = None
-        for last_login in last_logins:
-            if last_login.username == user.email:
-                user.last_login = last_login.last_login
-
     have_ldap = True if len(seaserv.get_emailusers('LDAP', 0, 1)) > 0 else False
 
     return render_to_response(
@@ -719,6 +705,39 @@ def sys_user_admin_admins(request):
             'is_pro': is_pro_version(),
         }, context_instance=RequestContext(request))
 
+@login_required_ajax
+@sys_staff_required
+def sys_users_quota_usage(request):
+    """Get quota and usage of users in a page of user list, which are loaded
+    after the page is shown.
+    """
+    content_type = 'application/json; charset=utf-8'
+
+    emails = request.GET.getlist('email')
+    if len(emails) > USERS_QUOTA_USAGE_MAX:
+        return HttpResponse(json.dumps({'error': _(u'Too many users.')}),
+                            status=400, content_type=content_type)
+
+    result = []
+    for email in emails:
+        if not is_valid_username(email):
+            continue
+        user = User(email=email)
+        user.org = None
+        _populate_user_quota_usage(user)
+        result.append({
+            'email': email,
+            'org': render_to_string('sysadmin/useradmin_user_org.html', {
+                'user': user}),
+            'quota_usage': render_to_string(
+                'sysadmin/useradmin_quota_usage.html', {
+                    'user': user,
+                    'CALC_SHARE_USAGE': CALC_SHARE_USAGE,
+                }),
+        })
+
+    return HttpResponse(json.dumps(result), content_type=content_type)
+
 @login_required
 @sys_staff_required
 def user_info(request, email):
@@ -748,81 +767,39 @@ def user_info(request, email):
     profile = Profile.objects.get_profile_by_user(email)
     d_profile = DetailedProfile.objects.get_detailed_profile_by_user(email)
 
-    user_shared_links = []
-    # download links
-    p_fileshares = []
+    # download links and upload links, size and existence of their
+    # files/dirs are read from cached summaries
     fileshares = list(FileShare.objects.filter(username=email))
     for fs in fileshares:
-        try:
-            r = seafile_api.get_repo(fs.repo_id)
-            if not r:
-                fs.delete()
-                continue
-
-            if fs.is_file_share_link():
-                if seafile_api.get_file_id_by_path(r.id, fs.path) is None:
-                    fs.delete()
-                    continue
-
-                fs.filename = os.path.basename(fs.path)
-                path = fs.path.rstrip('/')  # Normalize file path
-                obj_id = seafile_api.get_file_id_by_path(r.id, path)
-                fs.file_size = seafile_api.get_file_size(r.store_id,
-                                                         r.version, obj_id)
-            else:
-                if seafile_api.get_dir_id_by_path(r.id, fs.path) is None:
-                    fs.delete()
-                    continue
-
-                if fs.path == '/':
-                    fs.filename = '/'
-                else:
-                    fs.filename = os.path.basename(fs.path.rstrip('/'))
-
-                path = fs.path
-                if path[-1] != '/':         # Normalize dir path
-                    path += '/'
-                # get dir size
-                dir_id = seafserv_threaded_rpc.get_dirid_by_path(r.id,
-                                                                 r.head_cmmt_id,
-                                                                 path)
-                fs.dir_size = seafserv_threaded_rpc.get_dir_size(r.store_id,
-                                                                 r.version,
-                                                                 dir_id)
-
-            fs.is_download = True
-            p_fileshares.append(fs)
-        except SearpcError as e:
-            logger.error(e)
-            continue
-    p_fileshares.sort(key=lambda x: x.view_cnt, reverse=True)
-    user_shared_links += p_fileshares
+        fs.is_download = True
+        if fs.is_file_share_link():
+            fs.filename = os.path.basename(fs.path)
+        elif fs.path == '/':
+            fs.filename = '/'
+        else:
+            fs.filename = os.path.basename(fs.path.rstrip('/'))
+    fileshares.sort(key=lambda x: x.view_cnt, reverse=True)
 
-    # upload links
     uploadlinks = list(UploadLinkShare.objects.filter(username=email))
-    p_uploadlinks = []
     for link in uploadlinks:
-        try:
-            r = seafile_api.get_repo(link.repo_id)
-            if not r:
-                link.delete()
-                continue
-            if seafile_api.get_dir_id_by_path(r.id, link.path) is None:
-                link.delete()
-                continue
-
-            if link.path == '/':
-                link.dir_name = '/'
-            else:
-                link.dir_name = os.path.basename(link.path.rstrip('/'))
+        link.is_upload = True
+        if link.path == '/':
+            link.dir_name = '/'
+        else:
+            link.dir_name = os.path.basename(link.path.rstrip('/'))
+    uploadlinks.sort(key=lambda x: x.view_cnt, reverse=True)
 
-            link.is_upload = True
-            p_uploadlinks.append(link)
-        except SearpcError as e:
-            logger.error(e)
+    user_shared_links = []
+    summaries = get_link_summaries(fileshares + uploadlinks)
+    for link in fileshares + uploadlinks:
+        link.link_type = get_link_type(link)
+        summary = summaries.get((link.link_type, link.token))
+        if summary and not summary['exists']:
+            # deleted by ``clean_dead_links`` command
             continue
-    p_uploadlinks.sort(key=lambda x: x.view_cnt, reverse=True)
-    user_shared_links += p_uploadlinks
+        link.size = summary['size'] if summary else None
+        link.is_stale = summary is None or is_stale(summary)
+        user_shared_links.append(link)
 
     return render_to_response(
         'sysadmin/userinfo.html', {
@@ -841,6 +818,40 @@ def user_info(request, email):
             'enable_sys_admin_view_repo': ENABLE_SYS_ADMIN_VIEW_REPO,
         }, context_instance=RequestContext(request))
 
+@login_required_ajax
+@sys_staff_required
+def sys_share_link_summaries(request):
+    """Refresh summaries of stale download links (``d``) and upload links
+    (``u``) in user info page.
+    """
+    content_type = 'application/json; charset=utf-8'
+
+    d_tokens = request.GET.getlist('d')
+    u_tokens = request.GET.getlist('u')
+    if len(d_tokens) + len(u_tokens) > SHARE_LINK_SUMMARIES_MAX:
+        return HttpResponse(json.dumps({'error': _(u'Too many links.')}),
+                            status=400, content_type=content_type)
+
+    links = list(FileShare.objects.filter(token__in=d_tokens)) + \
+        list(UploadLinkShare.objects.filter(token__in=u_tokens))
+    result = []
+    for link in links:
+        try:
+            summary = refresh_link_summary(link)
+        except SearpcError as e:
+            logger.error(e)
+            continue
+
+        size = summary['size']
+        result.append({
+            'token': link.token,
+            'type': get_link_type(link),
+            'exists': summary['exists'],
+            'size': filesizeformat(size) if size is not None else '--',
+        })
+
+    return HttpResponse(json.dumps(result), content_type=content_type)
+
 @login_required_ajax
 @sys_staff_required
 def user_set_quota(request, email):
@@ -880,6 +891,7 @@ def user_set_quota(request, email):
             result['error'] = _(u'Failed to set quota: internal server error')
             return HttpResponse(json.dumps(result), status=500, content_type=content_type)
 
+        clear_user_quota_usage_cache(email)
         result['success'] = True
         return HttpResponse(json.dumps(result), content_type=content_type)
     else:
@@ -1209,6 +1221,7 @@ def user_add(request):
             org_id = request.user.org.org_id
             url_prefix = request.user.org.url_prefix
             ccnet_threaded_rpc.add_org_user(org_id, email, 0)
+            invalidate_autocomplete_index(get_org_scope(org_id))
             if IS_EMAIL_CONFIGURED:
                 try:
                     send_user_add_mail(request, email, password)
@@ -1672,41 +1685,63 @@ def sys_upload_link_remove(request):
 @sys_staff_required
 def user_search(request):
     """Search a user.
+
+    Users in database are listed before users in LDAP. Number of users in
+    database which match ``email`` is passed to following pages as
+    ``db_total`` once it is known, so that the offset of LDAP users can be
+    computed.
     """
     email = request.GET.get('email', '')
 
-    users = ccnet_threaded_rpc.search_emailusers('DB', email, -1, -1)
-    ldap_users = ccnet_threaded_rpc.search_emailusers('LDAP', email, -1, -1)
-    users.extend(ldap_users)
-
-    last_logins = UserLastLogin.objects.filter(username__in=[x.email for x in users])
-    if ENABLE_TRIAL_ACCOUNT:
-        trial_users = TrialAccount.objects.filter(user_or_org__in=[x.email for x in users])
-    else:
-        trial_users = []
+    # Make sure page request is an int. If not, deliver first page.
+    try:
+        current_page = max(int(request.GET.get('page', '1')), 1)
+        per_page = max(int(request.GET.get('per_page', '25')), 1)
+    except ValueError:
+        current_page = 1
+        per_page = 25
+    start = per_page * (current_page - 1)
+
+    users_plus_one = ccnet_threaded_rpc.search_emailusers('DB', email, start,
+                                                          per_page + 1)
+    db_total = None
+    if len(users_plus_one) < per_page + 1:
+        # users in database are used up, fill the page with LDAP users
+        if users_plus_one or start == 0:
+            db_total = start + len(users_plus_one)
+        else:
+            try:
+                db_total = int(request.GET.get('db_total', ''))
+            except ValueError:
+                db_total = len(ccnet_threaded_rpc.search_emailusers(
+                    'DB', email, -1, -1))
+        ldap_start = max(start - db_total, 0)
+        users_plus_one += ccnet_threaded_rpc.search_emailusers(
+            'LDAP', email, ldap_start, per_page + 1 - len(users_plus_one))
+
+    page_next = len(users_plus_one) == per_page + 1
+    users = users_plus_one[:per_page]
+    _populate_user_last_login(users, trial_info=True)
     for user in users:
-        _populate_user_quota_usage(user)
-
         # check user's role
         if user.role == GUEST_USER:
             user.is_guest = True
         else:
             user.is_guest = False
 
-        # populate user last login time
-        user.last_login = None
-        for last_login in last_logins:
-            if last_login.username == user.email:
-                user.last_login = last_login.last_login
-
-        user.trial_info = None
-        for trial_user in trial_users:
-            if trial_user.user_or_org == user.email:
-                user.trial_info = {'expire_date': trial_user.expire_date}
+    query = {'email': email}
+    if db_total is not None:
+        query['db_total'] = db_total
 
     return render_to_response('sysadmin/user_search.html', {
             'users': users,
             'email': email,
+            'search_query': urlencode(query),
+            'current_page': current_page,
+            'prev_page': current_page - 1,
+            'next_page': current_page + 1,
+            'per_page': per_page,
+            'page_next': page_next,
             'default_user': DEFAULT_USER,
             'guest_user': GUEST_USER,
             'is_pro': is_pro_version(),
@@ -132,6 +132,36 @@ CREATE TABLE `base_devicetoken` (
 /*!40000 ALTER TABLE `base_devicetoken` ENABLE KEYS */;
 
 
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!40101 SET character_set_client = utf8 */;
+CREATE TABLE `base_direntsjob` (
+  `id` int(11) NOT NULL AUTO_INCREMENT,
+  `username` varchar(255) NOT NULL,
+  `op` varchar(2) NOT NULL,
+  `src_repo_id` varchar(36) NOT NULL,
+  `src_path` longtext NOT NULL,
+  `dst_repo_id` varchar(36) NOT NULL,
+  `dst_path` longtext NOT NULL,
+  `objs` longtext NOT NULL,
+  `status` varchar(10) NOT NULL,
+  `total` int(11) NOT NULL,
+  `completed` int(11) NOT NULL,
+  `failed` int(11) NOT NULL,
+  `total_bytes` bigint(20) NOT NULL,
+  `done_bytes` bigint(20) NOT NULL,
+  `result` longtext NOT NULL,
+  `ctime` datetime NOT NULL,
+  `mtime` datetime NOT NULL,
+  PRIMARY KEY (`id`),
+  KEY `base_direntsjob_ee0cafa2` (`username`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
+
+/*!40000 ALTER TABLE `base_direntsjob` DISABLE KEYS */;
+/*!40000 ALTER TABLE `base_direntsjob` ENABLE KEYS */;
+
+
 /*!40101 SET @saved_cs_client     = @@character_set_client */;
 /*!40101 SET character_set_client = utf8 */;
 CREATE TABLE `base_filediscuss` (
@@ -442,7 +472,8 @@ CREATE TABLE `message_usermessage` (
   `recipient_deleted_at` datetime DEFAULT NULL,
   PRIMARY KEY (`message_id`),
   KEY `message_usermessage_8b1dd4eb` (`from_email`),
-  KEY `message_usermessage_590d1560` (`to_email`)
+  KEY `message_usermessage_590d1560` (`to_email`),
+  KEY `message_usermessage_ef19f3c9` (`to_email`,`ifread`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8;
 /*!40101 SET character_set_client = @saved_cs_client */;
 
@@ -168,6 +168,25 @@ CREATE TABLE "base_clientlogintoken" (
     "username" varchar(255) NOT NULL,
     "timestamp" datetime NOT NULL
 );
+CREATE TABLE "base_direntsjob" (
+    "id" integer NOT NULL PRIMARY KEY,
+    "username" varchar(255) NOT NULL,
+    "op" varchar(2) NOT NULL,
+    "src_repo_id" varchar(36) NOT NULL,
+    "src_path" text NOT NULL,
+    "dst_repo_id" varchar(36) NOT NULL,
+    "dst_path" text NOT NULL,
+    "objs" text NOT NULL,
+    "status" varchar(10) NOT NULL,
+    "total" integer NOT NULL,
+    "completed" integer NOT NULL,
+    "failed" integer NOT NULL,
+    "total_bytes" bigint NOT NULL,
+    "done_bytes" bigint NOT NULL,
+    "result" text NOT NULL,
+    "ctime" datetime NOT NULL,
+    "mtime" datetime NOT NULL
+);
 CREATE TABLE "contacts_contact" (
     "id" integer NOT NULL PRIMARY KEY,
     "user_email" varchar(255) NOT NULL,
@@ -341,6 +360,7 @@ CREATE INDEX "base_groupenabledmodule_dc00373b" ON "base_groupenabledmodule" ("g
 CREATE INDEX "base_userlastlogin_ee0cafa2" ON "base_userlastlogin" ("username");
 CREATE INDEX "base_innerpubmsgreply_3fde75e6" ON "base_innerpubmsgreply" ("reply_to_id");
 CREATE INDEX "base_clientlogintoken_ee0cafa2" ON "base_clientlogintoken" ("username");
+CREATE INDEX "base_direntsjob_ee0cafa2" ON "base_direntsjob" ("username");
 CREATE INDEX "contacts_contact_d3d8b136" ON "contacts_contact" ("user_email");
 CREATE INDEX "group_groupmessage_dc00373b" ON "group_groupmessage" ("group_id");
 CREATE INDEX "group_messagereply_3fde75e6" ON "group_messagereply" ("reply_to_id");
@@ -348,6 +368,7 @@ CREATE INDEX "group_messageattachment_12d5396a" ON "group_messageattachment" ("g
 CREATE INDEX "group_publicgroup_dc00373b" ON "group_publicgroup" ("group_id");
 CREATE INDEX "message_usermessage_8b1dd4eb" ON "message_usermessage" ("from_email");
 CREATE INDEX "message_usermessage_590d1560" ON "message_usermessage" ("to_email");
+CREATE INDEX "message_usermessage_ef19f3c9" ON "message_usermessage" ("to_email", "ifread");
 CREATE INDEX "message_usermsgattachment_72f290f5" ON "message_usermsgattachment" ("user_msg_id");
 CREATE INDEX "message_usermsgattachment_cee41a9a" ON "message_usermsgattachment" ("priv_file_dir_share_id");
 CREATE INDEX "notifications_usernotification_bc172800" ON "notifications_usernotification" ("to_user");
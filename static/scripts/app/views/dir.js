@@ -26,7 +26,6 @@ define([
             newDirTemplate: _.template($("#add-new-dir-form-template").html()),
             newFileTemplate: _.template($("#add-new-file-form-template").html()),
             mvcpTemplate: _.template($("#mvcp-form-template").html()),
-            mvProgressTemplate: _.template($("#mv-progress-popup-template").html()),
 
             initialize: function(options) {
                 this.$dirent_list = this.$('.repo-file-list tbody');
@@ -692,220 +691,136 @@ define([
                     }
 
                     Common.disableButton($('[type="submit"]', form));
-                    form.append('<p style="color:red;">' + gettext("Processing...") + '</p>');
-
-                    if (dst_repo == dirents.repo_id) {
-                        // when mv/cp in current lib, files/dirs can be handled in batch, and no need to show progress
-                        url_obj.name = op == 'mv' ? 'mv_dirents' : 'cp_dirents';
-                        $.ajax({
-                            url: Common.getUrl(url_obj) + '?parent_dir=' + encodeURIComponent(cur_path),
-                            type: 'POST',
-                            dataType: 'json',
-                            beforeSend: Common.prepareCSRFToken,
-                            traditional: true,
-                            data: {
-                                'file_names': file_names,
-                                'dir_names': dir_names,
-                                'dst_repo': dst_repo,
-                                'dst_path': dst_path
-                            },
-                            success: function(data) {
-                                var success_len = data['success'].length,
-                                    msg_s, msg_f,
-                                    view_url = data['url'];
-
-                                $.modal.close();
-                                if (success_len > 0) {
-                                    if (op == 'mv') {
-                                        if (success_len == files.length + dirs.length) {
-                                            dirents.remove(dirs);
-                                            dirents.remove(files);
-                                            _this.$('th .checkbox').removeClass('checkbox-checked');
-                                            _this.$('#multi-dirents-op').hide();
-                                        } else {
-                                            $(dirs).each(function() {
-                                                if (this.get('obj_name') in data['success']) {
-                                                    dirents.remove(this);
-                                                }
-                                            });
-                                            $(files).each(function() {
-                                                if (this.get('obj_name') in data['success']) {
-                                                    dirents.remove(this);
-                                                }
-                                            });
-                                        }
-                                        if (success_len == 1) {
-                                            msg_s = gettext("Successfully moved %(name)s.");
-                                        } else if (success_len == 2) {
-                                            msg_s = gettext("Successfully moved %(name)s and 1 other item.");
-                                        } else {
-                                            msg_s = gettext("Successfully moved %(name)s and %(amount)s other items.");
-                                        }
-                                    } else { // cp
-                                        if (success_len == 1) {
-                                            msg_s = gettext("Successfully copied %(name)s.");
-                                        } else if (success_len == 2) {
-                                            msg_s = gettext("Successfully copied %(name)s and 1 other item.");
-                                        } else {
-                                            msg_s = gettext("Successfully copied %(name)s and %(amount)s other items.");
-                                        }
-                                    }
+                    form.append('<p class="mvcp-progress" style="color:red;">' + gettext("Processing...") + '</p>');
 
-                                    msg_s = msg_s.replace('%(name)s', Common.HTMLescape(data['success'][0])).replace('%(amount)s', success_len - 1);
-                                    //msg_s += ' <a href="' + view_url + '">' + "View" + '</a>';
-                                    Common.feedback(msg_s, 'success');
-                                }
+                    // files/dirs are handled in batch by a background job, in current lib or to another lib
+                    url_obj.name = op == 'mv' ? 'mv_dirents' : 'cp_dirents';
+                    var afterMvcp = function(data) {
+                        var success_len = data['success'].length,
+                            msg_s, msg_f,
+                            view_url = data['url'];
 
-                                if (data['failed'].length > 0) {
-                                    if (op == 'mv') {
-                                        if (data['failed'].length > 1) {
-                                            msg_f = gettext("Internal error. Failed to move %(name)s and %(amount)s other item(s).");
-                                        } else {
-                                            msg_f = gettext("Internal error. Failed to move %(name)s.");
+                        $.modal.close();
+                        if (success_len > 0) {
+                            if (op == 'mv') {
+                                if (success_len == files.length + dirs.length) {
+                                    dirents.remove(dirs);
+                                    dirents.remove(files);
+                                    _this.$('th .checkbox').removeClass('checkbox-checked');
+                                    _this.$('#multi-dirents-op').hide();
+                                } else {
+                                    $(dirs).each(function() {
+                                        if ($.inArray(this.get('obj_name'), data['success']) != -1) {
+                                            dirents.remove(this);
                                         }
-                                    } else {
-                                        if (data['failed'].length > 1) {
-                                            msg_f = gettext("Internal error. Failed to copy %(name)s and %(amount)s other item(s).");
-                                        } else {
-                                            msg_f = gettext("Internal error. Failed to copy %(name)s.");
+                                    });
+                                    $(files).each(function() {
+                                        if ($.inArray(this.get('obj_name'), data['success']) != -1) {
+                                            dirents.remove(this);
                                         }
-                                    }
-                                    msg_f = msg_f.replace('%(name)s', Common.HTMLescape(data['failed'][0])).replace('%(amount)s', data['failed'].length - 1);
-                                    Common.feedback(msg_f, 'error');
+                                    });
+                                }
+                                if (success_len == 1) {
+                                    msg_s = gettext("Successfully moved %(name)s.");
+                                } else if (success_len == 2) {
+                                    msg_s = gettext("Successfully moved %(name)s and 1 other item.");
+                                } else {
+                                    msg_s = gettext("Successfully moved %(name)s and %(amount)s other items.");
+                                }
+                            } else { // cp
+                                if (success_len == 1) {
+                                    msg_s = gettext("Successfully copied %(name)s.");
+                                } else if (success_len == 2) {
+                                    msg_s = gettext("Successfully copied %(name)s and 1 other item.");
+                                } else {
+                                    msg_s = gettext("Successfully copied %(name)s and %(amount)s other items.");
                                 }
-                            },
-                            error: function(xhr, textStatus, errorThrown) {
-                                $.modal.close();
-                                Common.ajaxErrorHandler(xhr, textStatus, errorThrown);
                             }
-                        });
-                    } else {
-                        // when mv/cp to another lib, files/dirs should be handled one by one, and need to show progress
-                        var op_objs = dirents.where({'selected':true}),
-                            i = 0;
-                        // progress popup
-                        var mv_progress_popup = $(_this.mvProgressTemplate());
-                        var details = $('#mv-details', mv_progress_popup),
-                            cancel_btn = $('#cancel-mv', mv_progress_popup),
-                            other_info = $('#mv-other-info', mv_progress_popup);
-
-                        var mvcpDirent = function () {
-                            var op_obj = op_objs[i],
-                                obj_type = op_obj.get('is_dir') ? 'dir':'file',
-                                obj_name = op_obj.get('obj_name'),
-                                post_url,
-                                post_data;
 
+                            msg_s = msg_s.replace('%(name)s', Common.HTMLescape(data['success'][0])).replace('%(amount)s', success_len - 1);
+                            //msg_s += ' <a href="' + view_url + '">' + "View" + '</a>';
+                            Common.feedback(msg_s, 'success');
+                        }
+
+                        if (data['failed'].length > 0) {
                             if (op == 'mv') {
-                                url_obj.name = obj_type == 'dir' ? 'mv_dir' : 'mv_file';
-                            } else {
-                                url_obj.name = obj_type == 'dir' ? 'cp_dir' : 'cp_file';
-                            }
-                            post_url = Common.getUrl(url_obj) + '?path=' + encodeURIComponent(cur_path) + '&obj_name=' + encodeURIComponent(obj_name);
-                            post_data = {
-                                'dst_repo': dst_repo,
-                                'dst_path': dst_path
-                            };
-                            var after_op_success = function (data) {
-                                var det_text = op == 'mv' ? gettext("Moving file %(index)s of %(total)s") : gettext("Copying file %(index)s of %(total)s");
-                                details.html(det_text.replace('%(index)s', i + 1).replace('%(total)s', op_objs.length)).removeClass('vh');
-                                cancel_btn.removeClass('hide');
-                                var req_progress = function () {
-                                    var task_id = data['task_id'];
-                                    cancel_btn.data('task_id', task_id);
-                                    $.ajax({
-                                        url: Common.getUrl({name:'get_cp_progress'}) + '?task_id=' + encodeURIComponent(task_id),
-                                        dataType: 'json',
-                                        success: function(data) {
-                                            var bar = $('.ui-progressbar-value', $('#mv-progress'));
-                                            if (!data['failed'] && !data['canceled'] && !data['successful']) {
-                                                setTimeout(req_progress, 1000);
-                                            } else {
-                                                if (data['successful']) {
-                                                    bar.css('width', parseInt((i + 1)/op_objs.length*100, 10) + '%').show();
-                                                    if (op == 'mv') {
-                                                        dirents.remove(op_obj);
-                                                    }
-                                                    endOrContinue();
-                                                } else { // failed or canceled
-                                                    if (data['failed']) {
-                                                        var error_msg = op == 'mv' ? gettext('Failed to move %(name)s') : gettext('Failed to copy %(name)s');
-                                                        cancel_btn.after('<p class="error">' + error_msg.replace('%(name)s', Common.HTMLescape(obj_name)) + '</p>');
-                                                        end();
-                                                    }
-                                                }
-                                            }
-                                        },
-                                        error: function(xhr, textStatus, errorThrown) {
-                                            var error;
-                                            if (xhr.responseText) {
-                                                error = $.parseJSON(xhr.responseText).error;
-                                            } else {
-                                                error = gettext("Failed. Please check the network.");
-                                            }
-                                            cancel_btn.after('<p class="error">' + error + '</p>');
-                                            end();
-                                        }
-                                    });
-                                }; // 'req_progress' ends
-                                if (i == 0) {
-                                    $.modal.close();
-                                    setTimeout(function () {
-                                        mv_progress_popup.modal({containerCss: {
-                                            width: 300,
-                                            height: 150,
-                                            paddingTop: 50
-                                        }, focus:false});
-                                        $('#mv-progress').progressbar();
-                                        req_progress();
-                                    }, 100);
+                                if (data['failed'].length > 1) {
+                                    msg_f = gettext("Internal error. Failed to move %(name)s and %(amount)s other item(s).");
                                 } else {
-                                    req_progress();
+                                    msg_f = gettext("Internal error. Failed to move %(name)s.");
                                 }
-                            }; // 'after_op_success' ends
-                            Common.ajaxPost({
-                                'form': form,
-                                'post_url': post_url,
-                                'post_data': post_data,
-                                'after_op_success': after_op_success,
-                                'form_id': form.attr('id')
-                            });
-                        }; // 'mvcpDirent' ends
-                        var endOrContinue = function () {
-                            if (i == op_objs.length - 1) {
-                                setTimeout(function () { $.modal.close(); }, 500);
                             } else {
-                                mvcpDirent(++i);
+                                if (data['failed'].length > 1) {
+                                    msg_f = gettext("Internal error. Failed to copy %(name)s and %(amount)s other item(s).");
+                                } else {
+                                    msg_f = gettext("Internal error. Failed to copy %(name)s.");
+                                }
                             }
-                        };
-                        var end = function () {
-                            setTimeout(function () { $.modal.close(); }, 500);
-                        };
-                        mvcpDirent();
-                        cancel_btn.click(function() {
-                            Common.disableButton(cancel_btn);
-                            var task_id = $(this).data('task_id');
-                            $.ajax({
-                                url: Common.getUrl({name:'cancel_cp'}) + '?task_id=' + encodeURIComponent(task_id),
-                                dataType: 'json',
-                                success: function(data) {
-                                    other_info.html(gettext("Canceled.")).removeClass('hide');
-                                    cancel_btn.addClass('hide');
-                                    end();
-                                },
-                                error: function(xhr, textStatus, errorThrown) {
-                                    var error;
-                                    if (xhr.responseText) {
-                                        error = $.parseJSON(xhr.responseText).error;
-                                    } else {
-                                        error = gettext("Failed. Please check the network.");
+                            msg_f = msg_f.replace('%(name)s', Common.HTMLescape(data['failed'][0])).replace('%(amount)s', data['failed'].length - 1);
+                            Common.feedback(msg_f, 'error');
+                        }
+
+                        if (data['canceled'] && data['canceled'].length > 0) {
+                            Common.feedback(gettext("Canceled."), 'info');
+                        }
+                    };
+                    $.ajax({
+                        url: Common.getUrl(url_obj) + '?parent_dir=' + encodeURIComponent(cur_path),
+                        type: 'POST',
+                        dataType: 'json',
+                        beforeSend: Common.prepareCSRFToken,
+                        traditional: true,
+                        data: {
+                            'file_names': file_names,
+                            'dir_names': dir_names,
+                            'dst_repo': dst_repo,
+                            'dst_path': dst_path
+                        },
+                        success: function(data) {
+                            var job_id = data['job_id'];
+                            var cancel_btn = $('<button type="button" class="mvcp-cancel">' + gettext("Cancel") + '</button>');
+                            $('.mvcp-progress', form).after(cancel_btn);
+                            cancel_btn.click(function() {
+                                Common.disableButton(cancel_btn);
+                                $.ajax({
+                                    url: Common.getUrl({name: 'cancel_dirents_job'}),
+                                    type: 'POST',
+                                    dataType: 'json',
+                                    beforeSend: Common.prepareCSRFToken,
+                                    data: {'job_id': job_id},
+                                    error: function(xhr, textStatus, errorThrown) {
+                                        Common.enableButton(cancel_btn);
+                                        Common.ajaxErrorHandler(xhr, textStatus, errorThrown);
                                     }
-                                    other_info.html(error).removeClass('hide');
-                                    Common.enableButton(cancel_btn);
-                                }
+                                });
                             });
-                        });
-                    }
+                            var getJobProgress = function() {
+                                $.ajax({
+                                    url: Common.getUrl({name: 'get_dirents_job_progress'}) + '?job_id=' + encodeURIComponent(job_id),
+                                    dataType: 'json',
+                                    cache: false,
+                                    success: function(job) {
+                                        if (job['status'] == 'done') {
+                                            afterMvcp(job['result']);
+                                        } else {
+                                            var percent = job['total_bytes'] > 0 ? parseInt(job['done_bytes'] / job['total_bytes'] * 100, 10) : 0;
+                                            $('.mvcp-progress', form).html(gettext("Processing...") + ' ' + (job['completed'] + job['failed']) + '/' + job['total'] + ' (' + percent + '%)');
+                                            setTimeout(getJobProgress, 1000);
+                                        }
+                                    },
+                                    error: function(xhr, textStatus, errorThrown) {
+                                        $.modal.close();
+                                        Common.ajaxErrorHandler(xhr, textStatus, errorThrown);
+                                    }
+                                });
+                            };
+                            getJobProgress();
+                        },
+                        error: function(xhr, textStatus, errorThrown) {
+                            $.modal.close();
+                            Common.ajaxErrorHandler(xhr, textStatus, errorThrown);
+                        }
+                    });
                     return false;
                 });
             },
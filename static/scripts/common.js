@@ -88,6 +88,8 @@ define([
               case 'get_my_unenc_repos': return siteRoot + 'ajax/my-unenc-repos/';
               case 'unenc_rw_repos': return siteRoot + 'ajax/unenc-rw-repos/';
               case 'get_cp_progress': return siteRoot + 'ajax/cp_progress/';
+              case 'get_dirents_job_progress': return siteRoot + 'ajax/dirents-job/progress/';
+              case 'cancel_dirents_job': return siteRoot + 'ajax/dirents-job/cancel/';
               case 'cancel_cp': return siteRoot + 'ajax/cancel_cp/';
               case 'ajax_repo_remove_share': return siteRoot + 'share/ajax/repo_remove_share/';
               case 'get_user_contacts': return siteRoot + 'ajax/contacts/';
@@ -0,0 +1,50 @@
+import json
+import uuid
+
+from seaserv import seafile_api
+
+from seahub.test_utils import BaseTestCase
+
+class DirDeltaTest(BaseTestCase):
+    def setUp(self):
+        self.url = '/api2/repos/%s/dir/delta/?p=/' % self.repo.id
+
+    def tearDown(self):
+        self.remove_repo()
+
+    def test_can_get_delta(self):
+        self.file
+        old_oid = seafile_api.get_dir_id_by_path(self.repo.id, '/')
+        self.folder
+        seafile_api.del_file(self.repo.id, '/', 'test.txt', self.user.username)
+        self.login_as(self.user)
+
+        resp = self.client.get(self.url + '&oid=' + old_oid)
+
+        self.assertEqual(200, resp.status_code)
+        json_resp = json.loads(resp.content)
+        assert json_resp['oid'] == seafile_api.get_dir_id_by_path(
+            self.repo.id, '/')
+        assert [e['name'] for e in json_resp['added']] == ['folder']
+        assert json_resp['added'][0]['type'] == 'dir'
+        assert json_resp['removed'] == ['test.txt']
+        assert json_resp['modified'] == []
+
+    def test_get_delta_with_bad_oid(self):
+        self.file
+        self.login_as(self.user)
+
+        # not the empty folder object, nor any object in the library
+        bad_oid = uuid.uuid4().hex + uuid.uuid4().hex[:8]
+        assert bad_oid != seafile_api.get_dir_id_by_path(self.repo.id, '/')
+
+        resp = self.client.get(self.url + '&oid=' + bad_oid)
+        self.assertEqual(404, resp.status_code)
+        assert json.loads(resp.content)['error_msg'] == \
+            'Old folder object not found.'
+
+    def test_can_not_get_delta_without_permission(self):
+        self.login_as(self.admin)
+
+        resp = self.client.get(self.url + '&oid=' + '0' * 40)
+        self.assertEqual(403, resp.status_code)
@@ -0,0 +1,102 @@
+import json
+import time
+
+from seaserv import seafile_api
+
+from seahub.test_utils import BaseTestCase
+
+class DirentsBatchDeleteTest(BaseTestCase):
+    def setUp(self):
+        self.url = '/api2/repos/%s/fileops/batch-delete/?p=/' % self.repo.id
+
+    def tearDown(self):
+        self.remove_repo()
+
+    def test_can_delete_in_one_commit(self):
+        self.file
+        self.folder
+        self.login_as(self.user)
+        commits = seafile_api.get_commit_list(self.repo.id, 0, -1)
+
+        resp = self.client.post(self.url, {
+            'dirents_names': ['test.txt', 'folder'],
+        })
+
+        self.assertEqual(200, resp.status_code)
+        json_resp = json.loads(resp.content)
+        assert sorted(json_resp['deleted']) == ['folder', 'test.txt']
+        assert json_resp['undeleted'] == []
+        assert seafile_api.list_dir_by_path(self.repo.id, '/') == []
+        assert len(seafile_api.get_commit_list(self.repo.id, 0, -1)) == \
+            len(commits) + 1
+
+    def test_can_not_delete_without_permission(self):
+        self.file
+        self.login_as(self.admin)
+
+        resp = self.client.post(self.url, {
+            'dirents_names': ['test.txt'],
+        })
+
+        self.assertEqual(200, resp.status_code)
+        json_resp = json.loads(resp.content)
+        assert json_resp['deleted'] == []
+        assert json_resp['undeleted'] == ['test.txt']
+
+
+class DirentsJobsTest(BaseTestCase):
+    def tearDown(self):
+        self.remove_repo()
+
+    def _wait_for_job(self, job_id):
+        for i in range(50):
+            resp = self.client.get('/api2/dirents-jobs/%s/' % job_id)
+            self.assertEqual(200, resp.status_code)
+            json_resp = json.loads(resp.content)
+            if json_resp['status'] == 'done':
+                return json_resp
+            time.sleep(0.1)
+        assert False, 'job is not done'
+
+    def test_can_copy(self):
+        self.file
+        self.folder
+        self.login_as(self.user)
+
+        resp = self.client.post('/api2/dirents-jobs/', {
+            'op': 'cp',
+            'src_repo': self.repo.id,
+            'src_dir': '/',
+            'dst_repo': self.repo.id,
+            'dst_dir': self.folder,
+            'dirents_names': ['test.txt'],
+        })
+        self.assertEqual(200, resp.status_code)
+
+        json_resp = self._wait_for_job(json.loads(resp.content)['job_id'])
+        assert json_resp['total'] == 1
+        assert json_resp['completed'] == 1
+        assert json_resp['result']['success'] == ['test.txt']
+        assert seafile_api.get_file_id_by_path(self.repo.id,
+                                               self.folder + '/test.txt')
+
+    def test_can_not_move_without_permission(self):
+        self.file
+        self.folder
+        self.login_as(self.admin)
+
+        resp = self.client.post('/api2/dirents-jobs/', {
+            'op': 'mv',
+            'src_repo': self.repo.id,
+            'src_dir': '/',
+            'dst_repo': self.repo.id,
+            'dst_dir': self.folder,
+            'dirents_names': ['test.txt'],
+        })
+        self.assertEqual(403, resp.status_code)
+
+    def test_can_not_get_others_job(self):
+        self.login_as(self.user)
+
+        resp = self.client.get('/api2/dirents-jobs/100000/')
+        self.assertEqual(404, resp.status_code)
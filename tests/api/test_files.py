@@ -159,6 +159,25 @@ class FilesApiTest(ApiTestBase):
                 self.assertIsNotNone(commit['conflict'])
                 #self.assertIsNotNone(commit['second_parent_id']) #allow null
 
+    def test_get_file_history_by_page(self):
+        with self.get_tmp_repo() as repo:
+            fname, _ = self.create_file(repo)
+            fhurl = repo.file_url + u'history/?p=%s' % quote(fname)
+            history = self.get(fhurl).json()
+
+            page = self.get(fhurl + '&per_page=1').json()
+            self.assertEqual(len(page['commits']), 1)
+            self.assertEqual(page['commits'][0]['id'],
+                             history['commits'][0]['id'])
+            if len(history['commits']) > 1:
+                self.assertEqual(page['next_cursor'], page['commits'][0]['id'])
+                page = self.get(fhurl + '&per_page=1&cursor=%s' %
+                                page['next_cursor']).json()
+                self.assertEqual(page['commits'][0]['id'],
+                                 history['commits'][1]['id'])
+            else:
+                self.assertIsNone(page['next_cursor'])
+
     def test_get_upload_link(self):
         with self.get_tmp_repo() as repo:
             upload_url = urljoin(repo.repo_url, 'upload-link')
@@ -267,6 +286,22 @@ class FilesApiTest(ApiTestBase):
                 full_path = posixpath.join(dirent['parent_dir'], dirent['name']) + '/'
                 self.assertIn(full_path, dir_list)
 
+    def test_list_recursive_dir_with_max_depth_and_limit(self):
+        with self.get_tmp_repo() as repo:
+            data = {'operation': 'mkdir'}
+            dir_list = ['/1/', '/1/2/', '/1/2/3/', '/4/', '/4/5/', '/6/']
+            for dpath in dir_list:
+                durl = repo.get_dirpath_url(dpath)
+                self.post(durl, data=data, expected=201)
+
+            dirents = self.get(repo.dir_url + '?t=d&recursive=1&max_depth=1').json()
+            self.assertEqual([d['name'] for d in dirents], ['1', '4', '6'])
+
+            dirents = self.get(repo.dir_url + '?t=d&recursive=1&limit=2').json()
+            self.assertHasLen(dirents, 2)
+
+            self.get(repo.dir_url + '?t=d&recursive=1&max_depth=a', expected=400)
+
     def test_remove_dir(self):
         with self.get_tmp_repo() as repo:
             _, durl = self.create_dir(repo)
@@ -0,0 +1,29 @@
+from django.core.urlresolvers import reverse
+
+from seahub.message.models import UserMessage
+from seahub.notifications.models import UserNotification
+from seahub.test_utils import BaseTestCase
+
+
+class NoticesSeenTest(BaseTestCase):
+    def setUp(self):
+        self.sender = self.create_user('sender@test.com')
+        for i in range(3):
+            UserMessage.objects.add_unread_message(self.sender.username,
+                                                   self.user.username,
+                                                   'msg %d' % i)
+
+    def tearDown(self):
+        self.remove_user(self.sender.username)
+
+    def test_can_mark_all_seen(self):
+        self.login_as(self.user)
+        self.assertEqual(3, UserNotification.objects.count_unseen_user_notifications(
+            self.user.username))
+
+        resp = self.client.post(reverse('api2-notices-seen'))
+        self.assertEqual(200, resp.status_code)
+        self.assertEqual(0, UserNotification.objects.count_unseen_user_notifications(
+            self.user.username))
+        self.assertEqual(0, UserMessage.objects.count_unread_messages_by_user(
+            self.user.username))
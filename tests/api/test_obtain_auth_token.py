@@ -1,11 +1,22 @@
 import json
 
+from django.core.cache import cache
+from mock import patch
+
+from seahub.api2.views import API_LOGIN_ATTEMPT_LIMIT
 from seahub.profile.models import Profile
 from seahub.test_utils import BaseTestCase
+from seahub.utils.rate_limit import MemoryRateLimiter
 from .urls import TOKEN_URL
 
 class ObtainAuthTokenTest(BaseTestCase):
     def setUp(self):
+        cache.clear()
+        # counts of earlier tests may be kept in process memory
+        patcher = patch('seahub.auth.utils.login_attempt_limiter',
+                        MemoryRateLimiter('test_', 3, 60))
+        patcher.start()
+        self.addCleanup(patcher.stop)
         self.p = Profile.objects.add_or_update(self.user.username, '', '')
         self.p.login_id = 'test_login_id'
         self.p.save()
@@ -52,3 +63,55 @@ class ObtainAuthTokenTest(BaseTestCase):
         self.assertEqual(400, resp.status_code)
         json_resp = json.loads(resp.content)
         assert json_resp['non_field_errors'] == ['Must include "username" and "password"']
+
+    def test_too_many_failed_attempts(self):
+        for i in range(API_LOGIN_ATTEMPT_LIMIT):
+            resp = self.client.post(TOKEN_URL, {
+                'username': self.user.username,
+                'password': 'random_password',
+            })
+            self.assertEqual(400, resp.status_code)
+
+        resp = self.client.post(TOKEN_URL, {
+            'username': self.user.username,
+            'password': self.user_password,
+        })
+        self.assertEqual(429, resp.status_code)
+
+    def test_failed_attempts_from_other_ip(self):
+        for i in range(API_LOGIN_ATTEMPT_LIMIT):
+            resp = self.client.post(TOKEN_URL, {
+                'username': self.user.username,
+                'password': 'random_password',
+            }, REMOTE_ADDR='10.0.0.1')
+            self.assertEqual(400, resp.status_code)
+
+        # user can still login from another ip
+        resp = self.client.post(TOKEN_URL, {
+            'username': self.user.username,
+            'password': self.user_password,
+        }, REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(200, resp.status_code)
+        json_resp = json.loads(resp.content)
+        assert len(json_resp['token']) == 40
+
+        resp = self.client.post(TOKEN_URL, {
+            'username': self.user.username,
+            'password': self.user_password,
+        }, REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(429, resp.status_code)
+
+    @patch('seahub.api2.views.API_LOGIN_IP_ATTEMPT_LIMIT', 3)
+    def test_too_many_failed_attempts_from_ip(self):
+        for i in range(3):
+            resp = self.client.post(TOKEN_URL, {
+                'username': 'user%d@test.com' % i,
+                'password': 'random_password',
+            }, REMOTE_ADDR='10.0.0.1')
+            self.assertEqual(400, resp.status_code)
+
+        resp = self.client.post(TOKEN_URL, {
+            'username': self.user.username,
+            'password': self.user_password,
+        }, REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(429, resp.status_code)
@@ -1,4 +1,6 @@
 #coding: UTF-8
+import json
+
 from django.core.cache import cache
 from constance import config
 
@@ -321,3 +323,17 @@ class SharedLinksApiTest(BaseTestCase):
             '/api2/shared-links/?t=%s' % (token),
         )
         self.assertEqual(200, resp.status_code)
+
+    def test_list_skips_links_of_removed_library(self):
+        self.login_as(self.user)
+        token = self._add_file_shared_link()
+        dead = FileShare.objects.create_dir_link(self.user.username,
+                '8e4b8d5e-9ed6-4e4b-b8cd-07c0ec5d6b7f', '/')
+
+        resp = self.client.get('/api2/shared-links/')
+        self.assertEqual(200, resp.status_code)
+        json_resp = json.loads(''.join(resp.streaming_content))
+        assert [x['token'] for x in json_resp['fileshares']] == [token]
+
+        # left to clean_dead_links command
+        assert FileShare.objects.filter(pk=dead.pk).exists()
@@ -33,6 +33,25 @@ class StarredFileTest(BaseTestCase, Fixtures):
         json_resp = json.loads(resp.content)
         self.assertEqual(1, len(json_resp))
 
+    def test_can_list_after_add(self):
+        self.login_as(self.user)
+
+        resp = self.client.get(reverse('starredfiles'))
+        self.assertEqual(1, len(json.loads(resp.content)))
+
+        resp = self.client.post(reverse('starredfiles'), {
+            'repo_id': self.repo.id,
+            'p': self.unicode_file,
+        })
+        self.assertEqual(201, resp.status_code)
+
+        resp = self.client.get(reverse('starredfiles'))
+        json_resp = json.loads(resp.content)
+        self.assertEqual(2, len(json_resp))
+        for f in json_resp:
+            assert len(f['oid']) == 40
+            assert f['mtime'] > 0
+
     def test_can_add(self):
         self.login_as(self.user)
 
@@ -0,0 +1,25 @@
+from seahub.base.accounts import User
+from seahub.test_utils import BaseTestCase
+
+
+class UserLazyAttrsTest(BaseTestCase):
+    def test_not_loaded_until_accessed(self):
+        user = User.objects.get(email=self.user.username)
+        assert user.loaded_attrs == []
+
+        groups = user.joined_groups
+        assert self.group.id in [g.id for g in groups]
+        assert user.loaded_attrs.count('joined_groups') == 1
+
+        # loaded only once
+        user.joined_groups
+        assert user.loaded_attrs.count('joined_groups') == 1
+
+    def test_can_set(self):
+        user = User.objects.get(email=self.user.username)
+        user.org = None
+        user.joined_groups = []
+
+        assert user.org is None
+        assert user.joined_groups == []
+        assert user.loaded_attrs == []
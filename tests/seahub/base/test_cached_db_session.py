@@ -0,0 +1,36 @@
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.test import TestCase
+
+from seahub.base.cached_db_session import SessionStore
+
+
+class SessionStoreTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        s = SessionStore()
+        s['foo'] = 'bar'
+        s.save()
+        self.session_key = s.session_key
+
+    def test_unchanged_session_is_not_written(self):
+        s = SessionStore(self.session_key)
+        s['foo'] = 'bar'
+        s.save()
+        assert s.write_count == 0
+
+        s['foo'] = 'baz'
+        s.save()
+        assert s.write_count == 1
+
+        s = SessionStore(self.session_key)
+        assert s['foo'] == 'baz'
+
+    def test_load_from_db_when_not_cached(self):
+        cache.clear()
+        s = SessionStore(self.session_key)
+        assert s['foo'] == 'bar'
+
+        Session.objects.all().delete()
+        s = SessionStore(self.session_key)
+        assert s['foo'] == 'bar'
@@ -0,0 +1,67 @@
+import datetime
+
+from django.test import TestCase
+from django.utils import timezone
+
+from seahub.base.models import DirentsJob
+
+
+class DirentsJobManagerTest(TestCase):
+    def setUp(self):
+        self.job = DirentsJob.objects.add_job(
+            'foo@foo.com', DirentsJob.OP_COPY, 'repo', '/', 'repo', '/dir',
+            ['a.txt', 'b.txt', 'c.txt'], failed=['d.txt'])
+
+    def test_running_job_is_not_changed(self):
+        DirentsJob.objects.filter(pk=self.job.pk).update(
+            status=DirentsJob.STATUS_RUNNING)
+
+        job = DirentsJob.objects.get_user_job('foo@foo.com', self.job.pk)
+        assert job.status == DirentsJob.STATUS_RUNNING
+
+    def test_stale_job_is_failed(self):
+        DirentsJob.objects.filter(pk=self.job.pk).update(
+            status=DirentsJob.STATUS_RUNNING, completed=1,
+            result='{"success": ["a.txt"], "failed": ["d.txt"]}',
+            mtime=timezone.now() - datetime.timedelta(hours=1))
+
+        job = DirentsJob.objects.get_user_job('foo@foo.com', self.job.pk)
+        assert job.status == DirentsJob.STATUS_DONE
+        assert job.failed == 3
+        assert job.to_dict()['result'] == {
+            'success': ['a.txt'],
+            'failed': ['d.txt', 'b.txt', 'c.txt'],
+        }
+
+        job = DirentsJob.objects.get(pk=self.job.pk)
+        assert job.status == DirentsJob.STATUS_DONE
+        assert job.failed == 3
+
+    def test_cancel_job(self):
+        assert DirentsJob.objects.cancel_user_job('bar@bar.com',
+                                                  self.job.pk) is False
+        assert DirentsJob.objects.cancel_user_job('foo@foo.com',
+                                                  self.job.pk) is True
+        assert DirentsJob.objects.get(pk=self.job.pk).status == \
+            DirentsJob.STATUS_CANCELING
+
+        DirentsJob.objects.filter(pk=self.job.pk).update(
+            status=DirentsJob.STATUS_DONE)
+        assert DirentsJob.objects.cancel_user_job('foo@foo.com',
+                                                  self.job.pk) is False
+        assert DirentsJob.objects.cancel_user_job('foo@foo.com',
+                                                  'abc') is False
+
+    def test_has_active_job(self):
+        assert DirentsJob.objects.has_active_job('foo@foo.com') is True
+        assert DirentsJob.objects.has_active_job('bar@bar.com') is False
+
+        # stale job is not active
+        DirentsJob.objects.filter(pk=self.job.pk).update(
+            status=DirentsJob.STATUS_RUNNING,
+            mtime=timezone.now() - datetime.timedelta(hours=1))
+        assert DirentsJob.objects.has_active_job('foo@foo.com') is False
+
+        DirentsJob.objects.filter(pk=self.job.pk).update(
+            status=DirentsJob.STATUS_DONE, mtime=timezone.now())
+        assert DirentsJob.objects.has_active_job('foo@foo.com') is False
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+import shutil
+import tempfile
+import time
+
+from django.test import TestCase
+
+from seahub.base.sqlite_cache import SQLiteCache
+
+
+class SQLiteCacheTest(TestCase):
+    def setUp(self):
+        self.location = tempfile.mkdtemp()
+        self.cache = SQLiteCache(self.location, {
+            'OPTIONS': {'MAX_ENTRIES': 100, 'CULL_EVERY': 10}})
+
+    def tearDown(self):
+        shutil.rmtree(self.location)
+
+    def test_get_set(self):
+        self.cache.set('a', {'x': 1})
+        self.cache.set(u'中文', 2)
+
+        assert self.cache.get('a') == {'x': 1}
+        assert self.cache.get(u'中文') == 2
+        assert self.cache.get('b', 'default') == 'default'
+
+        self.cache.delete('a')
+        assert self.cache.get('a') is None
+
+    def test_expire(self):
+        self.cache.set('a', 1, 0)
+        time.sleep(0.01)
+
+        assert self.cache.get('a') is None
+        assert self.cache.add('a', 2) is True
+        assert self.cache.add('a', 3) is False
+        assert self.cache.get('a') == 2
+
+    def test_many(self):
+        self.cache.set_many({'a': 1, 'b': 2, u'中文': 3})
+
+        assert self.cache.get_many(['a', 'b', u'中文', 'c']) == \
+            {'a': 1, 'b': 2, u'中文': 3}
+
+        self.cache.delete_many(['a', 'b'])
+        assert self.cache.get_many(['a', 'b', u'中文']) == {u'中文': 3}
+
+    def test_incr(self):
+        self.cache.set('n', 1)
+
+        assert self.cache.incr('n', 2) == 3
+        assert self.cache.get('n') == 3
+        self.assertRaises(ValueError, self.cache.incr, 'not-exist')
+
+    def test_cull(self):
+        for i in range(1000):
+            self.cache.set('key%d' % i, i)
+
+        assert len(self.cache.get_many(['key%d' % i for i in range(1000)])) < 500
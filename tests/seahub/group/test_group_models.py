@@ -0,0 +1,57 @@
+from django.test import TestCase
+
+from seahub.group.models import GroupMessage, MessageReply, MessageAttachment
+
+
+class MessageReplyManagerTest(TestCase):
+    def setUp(self):
+        self.msg = GroupMessage.objects.create(group_id=1,
+                                               from_email='a@a.com',
+                                               message='msg')
+        self.msg2 = GroupMessage.objects.create(group_id=1,
+                                                from_email='a@a.com',
+                                                message='msg2')
+        self.no_reply_msg = GroupMessage.objects.create(
+            group_id=1, from_email='a@a.com', message='msg3')
+
+        for i in range(5):
+            MessageReply.objects.create(reply_to=self.msg,
+                                        from_email='b@b.com',
+                                        message='reply %d' % i)
+        MessageReply.objects.create(reply_to=self.msg2, from_email='b@b.com',
+                                    message='reply')
+
+    def test_count_replies_by_msgs(self):
+        cnts = MessageReply.objects.count_replies_by_msgs(
+            [self.msg.id, self.msg2.id, self.no_reply_msg.id])
+        assert cnts == {self.msg.id: 5, self.msg2.id: 1}
+
+    def test_get_last_replies_by_msgs(self):
+        replies = MessageReply.objects.get_last_replies_by_msgs(
+            [self.msg.id, self.msg2.id, self.no_reply_msg.id])
+
+        assert [r.message for r in replies[self.msg.id]] == \
+            ['reply 2', 'reply 3', 'reply 4']
+        assert [r.message for r in replies[self.msg2.id]] == ['reply']
+        assert self.no_reply_msg.id not in replies
+
+        replies = MessageReply.objects.get_last_replies_by_msgs(
+            [self.msg.id], limit=1)
+        assert [r.message for r in replies[self.msg.id]] == ['reply 4']
+
+
+class MessageAttachmentManagerTest(TestCase):
+    def test_get_attachments_by_msgs(self):
+        msg = GroupMessage.objects.create(group_id=1, from_email='a@a.com',
+                                          message='msg')
+        msg2 = GroupMessage.objects.create(group_id=1, from_email='a@a.com',
+                                           message='msg2')
+        for path in ('/a.jpg', '/b.jpg'):
+            MessageAttachment.objects.create(
+                group_message=msg, repo_id='repo-id', attach_type='file',
+                path=path, src='recommend')
+
+        atts = MessageAttachment.objects.get_attachments_by_msgs(
+            [msg.id, msg2.id])
+        assert sorted([x.path for x in atts[msg.id]]) == ['/a.jpg', '/b.jpg']
+        assert msg2.id not in atts
@@ -3,7 +3,7 @@ import json
 from django.core.urlresolvers import reverse
 import requests
 
-from seahub.group.models import PublicGroup
+from seahub.group.models import PublicGroup, GroupMessage, MessageAttachment
 from seahub.share.models import FileShare
 from seahub.test_utils import BaseTestCase
 
@@ -67,3 +67,48 @@ class GroupDiscussTest(BaseTestCase):
 
         resp = self.client.get(reverse('group_discuss', args=[self.group.id]))
         assert resp.status_code == 404
+
+
+class GroupDiscussImgUrlsTest(BaseTestCase):
+    def setUp(self):
+        self.img = self.create_file(repo_id=self.repo.id, parent_dir='/',
+                                    filename='test.jpg',
+                                    username=self.user.username)
+        msg = GroupMessage.objects.create(group_id=self.group.id,
+                                          from_email=self.user.username,
+                                          message='msg')
+        self.img_att = MessageAttachment.objects.create(
+            group_message=msg, repo_id=self.repo.id, attach_type='file',
+            path=self.img, src='recommend')
+        self.file_att = MessageAttachment.objects.create(
+            group_message=msg, repo_id=self.repo.id, attach_type='file',
+            path=self.file, src='recommend')
+        self.url = reverse('group_discuss_img_urls', args=[self.group.id])
+
+    def tearDown(self):
+        self.remove_repo()
+        self.remove_group()
+
+    def test_can_get(self):
+        self.login_as(self.user)
+
+        resp = self.client.get(self.url, {
+            'att_id': [self.img_att.id, self.file_att.id, 'invalid'],
+        }, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertEqual(200, resp.status_code)
+        json_resp = json.loads(resp.content)
+        assert 'test.jpg' in json_resp[str(self.img_att.id)]['url']
+        assert 'error' in json_resp[str(self.file_att.id)]
+
+    def test_anonymous_user_is_checked_as_group_discuss(self):
+        resp = self.client.get(self.url, {'att_id': self.img_att.id},
+                               HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertEqual(302, resp.status_code)
+
+    def test_public_group_404(self):
+        PublicGroup(group_id=self.group.id).save()
+        self.login_as(self.user)
+
+        resp = self.client.get(self.url, {'att_id': self.img_att.id},
+                               HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertEqual(404, resp.status_code)
@@ -0,0 +1,47 @@
+import datetime
+
+from seahub.message.models import UserMessage
+from seahub.message.message import conversation_info_list
+from seahub.test_utils import BaseTestCase
+
+
+class GetUserConversationsTest(BaseTestCase):
+    def setUp(self):
+        self.username = self.user.username
+        self.other = self.admin.username
+
+    def test_counts_and_last_message(self):
+        UserMessage.objects.add_unread_message(self.other, self.username, '1')
+        UserMessage.objects.add_unread_message(self.other, self.username, '2')
+        UserMessage.objects.add_unread_message(self.username, self.other, '3')
+        UserMessage.objects.add_unread_message(self.username, 'a@a.com', '4')
+
+        convs = UserMessage.objects.get_user_conversations(self.username)
+        assert [x[0] for x in convs] == ['a@a.com', self.other]
+        assert convs[0][1]['not_read'] == 0
+        # messages sent by the user are not counted as unread
+        assert convs[1][1]['not_read'] == 2
+
+        msgs = conversation_info_list(convs)
+        assert msgs[0][1]['last_msg'] == '4'
+        assert msgs[1][1]['last_msg'] == '3'
+
+        UserMessage.objects.update_unread_messages(self.other, self.username)
+        convs = UserMessage.objects.get_user_conversations(self.username)
+        assert convs[1][1]['not_read'] == 0
+
+    def test_deleted_messages_are_excluded(self):
+        UserMessage.objects.add_unread_message(self.other, self.username, '1')
+        msg = UserMessage.objects.add_unread_message(self.username,
+                                                     self.other, '2')
+        msg.sender_deleted_at = datetime.datetime.now()
+        msg.save()
+
+        convs = UserMessage.objects.get_user_conversations(self.username)
+        msgs = conversation_info_list(convs)
+        assert msgs[0][1]['last_msg'] == '1'
+
+        # shown to the recipient
+        convs = UserMessage.objects.get_user_conversations(self.other)
+        msgs = conversation_info_list(convs)
+        assert msgs[0][1]['last_msg'] == '2'
@@ -0,0 +1,57 @@
+from django.core.urlresolvers import reverse
+
+from seahub.message.models import UserMessage
+from seahub.test_utils import BaseTestCase
+
+
+class MessageListTest(BaseTestCase):
+    def setUp(self):
+        # 26 conversations, one more than a page
+        for i in range(26):
+            UserMessage.objects.add_unread_message(
+                'user%d@test.com' % i, self.user.username, 'msg %d' % i)
+        self.login_as(self.user)
+
+    def test_pagination(self):
+        resp = self.client.get(reverse('message_list'))
+        self.assertEqual(200, resp.status_code)
+        assert len(resp.context['msgs']) == 25
+        assert resp.context['total_unread'] == 26
+        # newest first
+        assert resp.context['msgs'][0][0] == 'user25@test.com'
+
+        resp = self.client.get(reverse('message_list') + '?page=2')
+        assert len(resp.context['msgs']) == 1
+        assert resp.context['msgs'][0][1]['last_msg'] == 'msg 0'
+
+    def test_page_out_of_range(self):
+        resp = self.client.get(reverse('message_list') + '?page=9999')
+        assert resp.context['msgs_page'].number == 2
+
+        resp = self.client.get(reverse('message_list') + '?page=abc')
+        assert resp.context['msgs_page'].number == 1
+
+
+class UserMsgListTest(BaseTestCase):
+    def setUp(self):
+        for i in range(16):
+            UserMessage.objects.add_unread_message(
+                self.admin.username, self.user.username, 'msg %d' % i)
+        self.login_as(self.user)
+        self.url = reverse('user_msg_list', args=[self.admin.username])
+
+    def test_pagination(self):
+        resp = self.client.get(self.url)
+        self.assertEqual(200, resp.status_code)
+        person_msgs = resp.context['person_msgs']
+        assert len(person_msgs.object_list) == 15
+        assert person_msgs.object_list[0].message == 'msg 15'
+        assert person_msgs.object_list[0].attachments == []
+
+        # messages are marked as read
+        assert UserMessage.objects.count_unread_messages_by_user(
+            self.user.username) == 0
+
+        resp = self.client.get(self.url + '?page=9999')
+        assert resp.context['person_msgs'].number == 2
+        assert len(resp.context['person_msgs'].object_list) == 1
@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+from django.test import TestCase
+
+from seahub.cconvert import CConvert
+
+
+class CConvertTest(TestCase):
+    def test_convert(self):
+        cc = CConvert()
+        cc.spliter = ''
+
+        assert cc.convert(u'张三丰') == 'zhangsanfeng'
+        assert cc.convert(u'abc') == 'abc'
+
+    def test_just_shengmu(self):
+        cc = CConvert()
+        cc.just_shengmu = True
+
+        assert cc.getIndex(u'张') == 'z'
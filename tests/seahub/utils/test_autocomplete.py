@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+from django.core.cache import cache
+from django.test import TestCase
+from mock import patch, Mock
+
+from seahub.profile.models import Profile
+from seahub.utils.autocomplete import get_autocomplete_index, \
+    invalidate_autocomplete_index, clear_autocomplete_indexes
+
+
+class AutocompleteIndexTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        clear_autocomplete_indexes()
+        Profile.objects.add_or_update('zs@test.com', u'张三')
+        Profile.objects.add_or_update('bob@test.com', u'Bobby')
+        self.emails = ['zs@test.com', 'bob@test.com', 'alice@test.com']
+
+    def test_search_by_prefix(self):
+        index = get_autocomplete_index('group_1', lambda: self.emails)
+
+        assert index.search(u'zhang') == [('zs@test.com', u'张三')]
+        assert index.search(u'张') == [('zs@test.com', u'张三')]
+        assert index.search(u'BOB') == [('bob@test.com', u'Bobby')]
+        assert index.search(u'ali') == [('alice@test.com', u'alice')]
+        assert index.search(u'ali', exclude='alice@test.com') == []
+
+    def test_search_contains(self):
+        index = get_autocomplete_index('group_1', lambda: self.emails)
+
+        assert index.search(u'obb') == []
+        assert index.search(u'obb', contains=True) == \
+            [('bob@test.com', u'Bobby')]
+
+    def test_users_are_not_got_when_cached(self):
+        get_emails = Mock(return_value=self.emails)
+        get_autocomplete_index('group_1', get_emails)
+        get_autocomplete_index('group_1', get_emails)
+        assert get_emails.call_count == 1
+
+        invalidate_autocomplete_index('group_1')
+        get_autocomplete_index('group_1', get_emails)
+        assert get_emails.call_count == 2
+
+    @patch('seahub.utils.autocomplete.AUTOCOMPLETE_MAX_INDEXES', 1)
+    def test_least_recently_used_is_dropped(self):
+        get_emails = Mock(return_value=self.emails)
+        get_autocomplete_index('group_1', get_emails)
+        get_autocomplete_index('group_2', get_emails)
+        get_autocomplete_index('group_2', get_emails)
+        assert get_emails.call_count == 2
+
+        get_autocomplete_index('group_1', get_emails)
+        assert get_emails.call_count == 3
+
+    @patch('seahub.utils.autocomplete.ccnet_threaded_rpc')
+    @patch('seahub.utils.autocomplete.seaserv')
+    def test_rebuilt_when_nickname_changed(self, mock_seaserv, mock_rpc):
+        mock_seaserv.get_personal_groups_by_user.return_value = [Mock(id=1)]
+        mock_rpc.get_orgs_by_user.return_value = []
+        get_autocomplete_index('group_1', lambda: self.emails)
+        get_autocomplete_index('group_2', lambda: self.emails)
+
+        Profile.objects.add_or_update('bob@test.com', u'Robert')
+        mock_seaserv.get_personal_groups_by_user.assert_called_once_with(
+            'bob@test.com')
+
+        index = get_autocomplete_index('group_1', lambda: self.emails)
+        assert index.search(u'rob') == [('bob@test.com', u'Robert')]
+        # index of other groups is kept
+        index = get_autocomplete_index('group_2', lambda: self.emails)
+        assert index.search(u'rob') == []
+
+    @patch('seahub.utils.autocomplete.invalidate_user_autocomplete_indexes')
+    def test_not_rebuilt_when_nickname_not_changed(self, mock_invalidate):
+        p = Profile.objects.get(user='bob@test.com')
+        p.set_lang_code('en')
+        assert mock_invalidate.called is False
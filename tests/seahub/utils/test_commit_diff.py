@@ -0,0 +1,82 @@
+from StringIO import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from mock import patch, Mock
+
+from seahub.utils import commit_diff
+from seahub.utils.commit_diff import get_commit_diff
+
+
+def _diff_entries(count):
+    entries = []
+    for i in range(count):
+        # ``name`` can not be passed to Mock()
+        d = Mock(status='add', new_name=None)
+        d.name = 'file%d' % i
+        entries.append(d)
+    return entries
+
+class GetCommitDiffTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    @patch('seahub.utils.commit_diff.seafserv_threaded_rpc')
+    def test_cached(self, mock_rpc):
+        mock_rpc.get_diff.return_value = _diff_entries(3)
+        diff = get_commit_diff('repo', '', 'commit')
+        assert diff == [('add', 'file%d' % i, None) for i in range(3)]
+
+        assert get_commit_diff('repo', '', 'commit') == diff
+        assert mock_rpc.get_diff.call_count == 1
+
+    @patch('seahub.utils.commit_diff.COMMIT_DIFF_CACHE_CHUNK_SIZE', 2)
+    @patch('seahub.utils.commit_diff.seafserv_threaded_rpc')
+    def test_large_diff_is_cached_in_chunks(self, mock_rpc):
+        mock_rpc.get_diff.return_value = _diff_entries(5)
+        diff = get_commit_diff('repo', '', 'commit')
+        assert len(diff) == 5
+
+        assert get_commit_diff('repo', '', 'commit') == diff
+        assert mock_rpc.get_diff.call_count == 1
+        assert len(cache.get(commit_diff._get_cache_key(
+            'repo', '', 'commit'))[1]) == 2
+
+        # computed again if any chunk is evicted
+        cache.delete(commit_diff._get_cache_key('repo', '', 'commit', 2))
+        assert get_commit_diff('repo', '', 'commit') == diff
+        assert mock_rpc.get_diff.call_count == 2
+
+    @patch('seahub.utils.commit_diff.COMMIT_DIFF_CACHE_MAX_ITEMS', 4)
+    @patch('seahub.utils.commit_diff.seafserv_threaded_rpc')
+    def test_too_large_diff_is_not_cached(self, mock_rpc):
+        mock_rpc.get_diff.return_value = _diff_entries(5)
+        assert len(get_commit_diff('repo', '', 'commit')) == 5
+        assert len(get_commit_diff('repo', '', 'commit')) == 5
+        assert mock_rpc.get_diff.call_count == 2
+
+
+class PrecomputeCommitDiffsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    @patch('seahub.base.management.commands.precompute_commit_diffs.get_commit_diff')
+    @patch('seahub.base.management.commands.precompute_commit_diffs.seafile_api')
+    @patch('seahub.base.management.commands.precompute_commit_diffs.time.time')
+    def test_max_repos(self, mock_time, mock_api, mock_diff):
+        mock_time.return_value = 100000
+        mock_api.get_repo_list.return_value = [
+            Mock(id='old', encrypted=False, last_modify=1),
+            Mock(id='repo1', encrypted=False, last_modify=99000),
+            Mock(id='repo2', encrypted=False, last_modify=99999),
+            Mock(id='enc', encrypted=True, last_modify=99999),
+        ]
+        mock_api.get_commit_list.return_value = [Mock(id='c1', ctime=99999)]
+
+        call_command('precompute_commit_diffs', max_repos=1,
+                     stdout=StringIO())
+
+        # only most recently changed library is computed
+        mock_api.get_commit_list.assert_called_once_with('repo2', 0, 20)
+        mock_diff.assert_called_once_with('repo2', '', 'c1')
@@ -0,0 +1,43 @@
+from django.core.cache import cache
+
+from seahub.base.models import UserStarredFiles
+from seahub.share.models import FileShare, UploadLinkShare
+from seahub.test_utils import BaseTestCase
+from seahub.utils.dead_links import clean_dead_links, get_link_repo_ids
+
+
+class CleanDeadLinksTest(BaseTestCase):
+    def setUp(self):
+        cache.clear()
+        self.file_link = FileShare.objects.create_file_link(
+            self.user.username, self.repo.id, self.file)
+        self.dead_link = FileShare.objects.create_file_link(
+            self.user.username, self.repo.id, '/not-exist.md')
+        self.upload_link = UploadLinkShare.objects.create_upload_link_share(
+            self.user.username, self.repo.id, self.folder)
+        UserStarredFiles.objects.create(email=self.user.username, org_id=-1,
+                                        repo_id=self.repo.id,
+                                        path='/not-exist.md', is_dir=False)
+
+    def tearDown(self):
+        self.remove_repo()
+
+    def test_clean(self):
+        assert self.repo.id in get_link_repo_ids()
+
+        assert clean_dead_links(self.repo.id) == 2
+        assert len(FileShare.objects.filter(repo_id=self.repo.id)) == 1
+        assert len(UploadLinkShare.objects.filter(repo_id=self.repo.id)) == 1
+        assert len(UserStarredFiles.objects.filter(repo_id=self.repo.id)) == 0
+
+        # not changed since last run
+        FileShare.objects.create_file_link(self.user.username, self.repo.id,
+                                           '/not-exist.md')
+        assert clean_dead_links(self.repo.id) == 0
+        assert clean_dead_links(self.repo.id, force=True) == 1
+
+    def test_clean_removed_repo(self):
+        self.remove_repo()
+
+        assert clean_dead_links(self.repo.id) == 4
+        assert len(FileShare.objects.filter(repo_id=self.repo.id)) == 0
@@ -0,0 +1,27 @@
+from django.core.cache import cache
+from django.test import TestCase
+from mock import patch, Mock
+
+from seahub.utils.dir_objects import list_dir_object
+
+
+class ListDirObjectTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    @patch('seahub.utils.dir_objects.seafile_api')
+    def test_cached_per_store(self, mock_api):
+        d = Mock(obj_name='a.txt', obj_id='1' * 40, mode=0100644, mtime=1,
+                 size=2)
+        mock_api.list_dir_by_dir_id.return_value = [d]
+        repo = Mock(id='repo', store_id='repo')
+        other_repo = Mock(id='other', store_id='other')
+
+        assert [e.obj_name for e in list_dir_object(repo, 'dir')] == ['a.txt']
+        assert [e.obj_name for e in list_dir_object(repo, 'dir')] == ['a.txt']
+        assert mock_api.list_dir_by_dir_id.call_count == 1
+
+        # dir id of another library is resolved against its own store
+        mock_api.list_dir_by_dir_id.return_value = None
+        assert list_dir_object(other_repo, 'dir') == []
+        mock_api.list_dir_by_dir_id.assert_called_with('other', 'dir')
@@ -0,0 +1,44 @@
+import stat
+
+from django.core.urlresolvers import reverse
+from django.test import TestCase
+from django.utils.http import urlquote
+
+from seahub.utils.dirent_row import DirentLinks, DirentRow
+
+
+class FakeDirent(object):
+    def __init__(self, obj_name, mode):
+        self.obj_name = obj_name
+        self.obj_id = '0' * 40
+        self.mode = mode
+        self.mtime = 0
+        self.size = 1
+
+
+class DirentRowTest(TestCase):
+    repo_id = '12345678-1234-1234-1234-123456789012'
+
+    def test_file_links(self):
+        links = DirentLinks(self.repo_id, '/dir/', view_lib_file=True)
+        row = DirentRow(FakeDirent(u'a b.txt', stat.S_IFREG), links)
+        path = u'/dir/a b.txt'
+
+        assert not row.is_dir()
+        assert row.props.obj_name == u'a b.txt'
+        assert row.view_link == reverse('view_lib_file',
+                                        args=[self.repo_id, urlquote(path)])
+        assert row.dl_link == reverse('download_file', args=[
+            self.repo_id, row.obj_id]) + '?p=' + urlquote(path)
+        assert row.history_link == reverse(
+            'file_revisions', args=[self.repo_id]) + '?p=' + urlquote(path)
+
+    def test_dir_links(self):
+        links = DirentLinks(self.repo_id, '/dir/')
+        row = DirentRow(FakeDirent(u'sub', stat.S_IFDIR), links)
+
+        assert row.is_dir()
+        assert row.view_link == reverse(
+            'repo', args=[self.repo_id]) + '?p=' + urlquote(u'/dir/sub')
+        assert row.dl_link == reverse(
+            'repo_download_dir', args=[self.repo_id]) + '?p=' + urlquote(u'/dir/sub')
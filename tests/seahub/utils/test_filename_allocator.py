@@ -0,0 +1,24 @@
+from seahub.test_utils import BaseTestCase
+from seahub.utils import FilenameAllocator, check_filename_with_rename
+
+
+class FilenameAllocatorTest(BaseTestCase):
+    def setUp(self):
+        self.file
+        self.create_file(repo_id=self.repo.id, parent_dir='/',
+                         filename='test (2).txt', username=self.user.username)
+
+    def tearDown(self):
+        self.remove_repo()
+
+    def test_allocate_batch(self):
+        allocator = FilenameAllocator(self.repo.id, '/')
+
+        assert allocator.allocate(u'new.txt') == u'new.txt'
+        assert allocator.allocate(u'new.txt') == u'new (1).txt'
+        assert allocator.allocate(u'test.txt') == u'test (1).txt'
+        assert allocator.allocate(u'test.txt') == u'test (3).txt'
+
+    def test_check_filename_with_rename(self):
+        assert check_filename_with_rename(self.repo.id, '/', u'test.txt') == \
+            u'test (1).txt'
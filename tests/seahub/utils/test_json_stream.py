@@ -0,0 +1,33 @@
+import json
+
+from django.test import TestCase
+
+from seahub.utils import json_stream
+from seahub.utils.json_stream import iter_json
+
+
+class IterJsonTest(TestCase):
+    def test_array(self):
+        items = [{'name': 'a'}, {'name': 'b'}]
+        assert json.loads(''.join(iter_json(iter(items)))) == items
+        assert ''.join(iter_json([])) == '[]'
+
+    def test_wrapped_in_key(self):
+        assert json.loads(''.join(iter_json([1, 2], key='fileshares'))) == \
+            {'fileshares': [1, 2]}
+
+    def test_ndjson(self):
+        out = ''.join(iter_json([{'name': 'a'}, 1], ndjson=True))
+        assert [json.loads(l) for l in out.splitlines()] == [{'name': 'a'}, 1]
+        assert ''.join(iter_json([], ndjson=True)) == ''
+
+    def test_chunked(self):
+        old_size = json_stream.JSON_STREAM_CHUNK_SIZE
+        json_stream.JSON_STREAM_CHUNK_SIZE = 10
+        try:
+            chunks = list(iter_json(range(100)))
+        finally:
+            json_stream.JSON_STREAM_CHUNK_SIZE = old_size
+
+        assert len(chunks) > 1
+        assert json.loads(''.join(chunks)) == range(100)
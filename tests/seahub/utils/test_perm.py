@@ -0,0 +1,36 @@
+from seahub.test_utils import BaseTestCase
+from seahub.utils.perm import get_perm_resolver
+
+
+class PermissionResolverTest(BaseTestCase):
+    def setUp(self):
+        self.folder
+
+    def tearDown(self):
+        self.remove_repo()
+
+    def test_memoize_path_perm(self):
+        resolver = get_perm_resolver(self.user)
+
+        assert resolver.path_perm(self.repo.id, '/folder') == 'rw'
+        assert resolver.path_perm(self.repo.id, '/folder/') == 'rw'
+        assert resolver.stats['rpc_calls'] == 1
+        assert resolver.stats['hits'] == 1
+
+    def test_children_perms(self):
+        resolver = get_perm_resolver(self.user)
+
+        perms = resolver.children_perms(self.repo.id, '/',
+                                        ['folder', 'not-exist'])
+        assert perms == {'folder': 'rw', 'not-exist': 'rw'}
+        assert resolver.stats['inherited'] == 1
+
+        calls = resolver.stats['rpc_calls']
+        resolver.path_perm(self.repo.id, '/folder')
+        assert resolver.stats['rpc_calls'] == calls
+
+    def test_no_perm_for_other_user(self):
+        resolver = get_perm_resolver(self.admin)
+
+        perms = resolver.children_perms(self.repo.id, '/', ['folder'])
+        assert perms == {'folder': None}
@@ -0,0 +1,38 @@
+from django.core.cache import cache
+from mock import patch
+
+from seahub.test_utils import BaseTestCase
+from seahub.utils.quota import get_user_quota_usage, \
+    clear_quota_cache_on_repo_deleted_cb
+
+
+class GetUserQuotaUsageTest(BaseTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_cached(self):
+        snapshot = get_user_quota_usage(self.user.username)
+        assert snapshot['org_id'] is None
+
+        with patch('seahub.utils.quota.seafile_api.get_user_quota') as mock:
+            assert get_user_quota_usage(self.user.username) == snapshot
+            assert mock.called is False
+
+    @patch('seahub.utils.quota.seafile_api.get_user_self_usage')
+    def test_refresh_when_usage_changed(self, mock_usage):
+        mock_usage.return_value = 100
+        assert get_user_quota_usage(self.user.username)['space_usage'] == 100
+
+        # e.g. a file is uploaded to fileserver by client
+        mock_usage.return_value = 200
+        assert get_user_quota_usage(self.user.username)['space_usage'] == 200
+
+    @patch('seahub.utils.quota.seafile_api.get_user_quota')
+    def test_clear_on_repo_deleted(self, mock_quota):
+        mock_quota.return_value = 100
+        get_user_quota_usage(self.user.username)
+
+        mock_quota.return_value = 200
+        clear_quota_cache_on_repo_deleted_cb(
+            None, usernames=[], repo_owner=self.user.username)
+        assert get_user_quota_usage(self.user.username)['space_quota'] == 200
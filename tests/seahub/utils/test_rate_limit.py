@@ -0,0 +1,48 @@
+from django.core.cache import cache
+from django.test import TestCase
+from mock import patch
+
+from seahub.utils.rate_limit import MemoryRateLimiter, CacheRateLimiter
+
+
+class MemoryRateLimiterTest(TestCase):
+    def test_sliding_window(self):
+        limiter = MemoryRateLimiter('test_', 3, 60)
+        with patch('seahub.utils.rate_limit.time.time', return_value=600):
+            assert limiter.incr('foo') == 1
+            assert limiter.incr('foo') == 2
+            assert limiter.is_limited('foo') is False
+            assert limiter.incr('foo') == 3
+            assert limiter.is_limited('foo') is True
+
+        # half of previous window is counted
+        with patch('seahub.utils.rate_limit.time.time', return_value=690):
+            assert limiter.get('foo') == 1
+
+        with patch('seahub.utils.rate_limit.time.time', return_value=720):
+            assert limiter.get('foo') == 0
+
+    def test_max_keys(self):
+        limiter = MemoryRateLimiter('test_', 3, 60, max_keys=2)
+        limiter.incr('foo')
+        limiter.incr('bar')
+        limiter.get('foo')
+        limiter.incr('baz')
+
+        assert limiter.get('foo') == 1
+        assert limiter.get('bar') == 0
+        assert limiter.get('baz') == 1
+
+
+class CacheRateLimiterTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_incr_and_clear(self):
+        limiter = CacheRateLimiter('test_', 3, 60)
+        assert limiter.incr('foo') == 1
+        assert limiter.incr('foo') == 2
+        assert limiter.get('bar') == 0
+
+        limiter.clear('foo')
+        assert limiter.get('foo') == 0
@@ -0,0 +1,25 @@
+import time
+
+from django.test import TestCase
+
+from seahub.utils.rpc import RPCBatch
+
+
+class RPCBatchTest(TestCase):
+    def test_calls_run_concurrently(self):
+        batch = RPCBatch()
+        calls = [batch.submit('sleep_%d' % i, time.sleep, 0.2) for i in range(4)]
+
+        start = time.time()
+        for c in calls:
+            c.result()
+        assert time.time() - start < 0.6
+
+        self.assertEqual(4, len(batch.timings))
+        for name, elapsed in batch.timings:
+            assert elapsed >= 0.2
+
+    def test_exception_is_reraised(self):
+        batch = RPCBatch()
+        call = batch.submit('div', lambda x: 1 / x, 0)
+        self.assertRaises(ZeroDivisionError, call.result)
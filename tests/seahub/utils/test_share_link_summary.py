@@ -0,0 +1,40 @@
+from django.core.cache import cache
+
+from seahub.share.models import FileShare, UploadLinkShare
+from seahub.test_utils import BaseTestCase
+from seahub.utils.share_link_summary import get_link_summaries, \
+    refresh_link_summary
+
+
+class ShareLinkSummaryTest(BaseTestCase):
+    def setUp(self):
+        cache.clear()
+        self.file_link = FileShare.objects.create_file_link(
+            self.user.username, self.repo.id, self.file)
+        self.dir_link = FileShare.objects.create_dir_link(
+            self.user.username, self.repo.id, self.folder)
+        self.upload_link = UploadLinkShare.objects.create_upload_link_share(
+            self.user.username, self.repo.id, self.folder)
+
+    def tearDown(self):
+        self.remove_repo()
+
+    def test_refresh_and_get(self):
+        links = [self.file_link, self.dir_link, self.upload_link]
+        assert get_link_summaries(links) == {}
+
+        for link in links:
+            assert refresh_link_summary(link)['exists'] is True
+
+        summaries = get_link_summaries(links)
+        assert len(summaries) == 3
+        assert summaries[('d', self.file_link.token)]['size'] >= 0
+        assert summaries[('u', self.upload_link.token)]['size'] is None
+
+    def test_link_of_removed_repo(self):
+        self.remove_repo()
+
+        summary = refresh_link_summary(self.file_link)
+        assert summary['exists'] is False
+        assert summary['size'] is None
+        assert len(FileShare.objects.filter(token=self.file_link.token)) == 1
@@ -1,3 +1,5 @@
+import json
+
 from django.core.urlresolvers import reverse
 from django.http.cookie import parse_cookie
 
@@ -109,6 +111,55 @@ class UserRemoveTest(BaseTestCase):
         assert len(ccnet_threaded_rpc.search_emailusers('DB', username, -1, -1))  == 0
 
 
+class UserSearchTest(BaseTestCase):
+    def setUp(self):
+        self.login_as(self.admin)
+
+    def test_can_paginate(self):
+        resp = self.client.get(reverse('user_search') +
+                               '?email=%s&per_page=1' % self.user.username)
+        self.assertEqual(200, resp.status_code)
+        self.assertTemplateUsed('sysadmin/user_search.html')
+        assert len(resp.context['users']) == 1
+        assert resp.context['users'][0].email == self.user.username
+        assert resp.context['page_next'] is False
+
+
+class UsersQuotaUsageTest(BaseTestCase):
+    def setUp(self):
+        self.login_as(self.admin)
+
+    def test_can_get(self):
+        resp = self.client.get(
+            reverse('sys_users_quota_usage'),
+            {'email': [self.user.username, self.admin.username]},
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest'
+        )
+        self.assertEqual(200, resp.status_code)
+        json_resp = json.loads(resp.content)
+        assert [x['email'] for x in json_resp] == [self.user.username,
+                                                   self.admin.username]
+        assert '<p>' in json_resp[0]['quota_usage']
+
+    def test_too_many_users(self):
+        resp = self.client.get(
+            reverse('sys_users_quota_usage'),
+            {'email': ['%d@test.com' % i for i in range(101)]},
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest'
+        )
+        self.assertEqual(400, resp.status_code)
+
+    def test_normal_user_can_not_get(self):
+        self.client.logout()
+        self.login_as(self.user)
+        resp = self.client.get(
+            reverse('sys_users_quota_usage'),
+            {'email': [self.user.username]},
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest'
+        )
+        self.assertEqual(404, resp.status_code)
+
+
 class SudoModeTest(BaseTestCase):
     def test_normal_user_raise_404(self):
         self.login_as(self.user)
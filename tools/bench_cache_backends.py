@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Time set/get/get_many of the file based cache and the SQLite cache
+(``seahub.base.sqlite_cache.SQLiteCache``), in temporary directories.
+
+Run in the seahub directory, with the environment of a seahub instance (see
+setenv.sh.template):
+
+    python tools/bench_cache_backends.py [number of keys] [number of entries]
+
+Each backend is filled with ``number of entries`` entries first, then
+``number of keys`` keys are set, got one by one and got in batches of 100.
+The file based cache walks its directory on every set, so it gets slow with
+thousands of entries.
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'seahub.settings')
+
+BACKENDS = (
+    ('filebased', 'django.core.cache.backends.filebased.FileBasedCache'),
+    ('sqlite', 'seahub.base.sqlite_cache.SQLiteCache'),
+)
+
+def _timeit(func, count):
+    start = time.time()
+    func()
+    return (time.time() - start) / count * 1e6
+
+def bench(backend, keys, entries):
+    """Return us per op of set, get and get_many of ``backend``.
+    """
+    from django.core.cache import get_cache
+
+    location = tempfile.mkdtemp()
+    try:
+        cache = get_cache(backend, LOCATION=location,
+                          OPTIONS={'MAX_ENTRIES': 1000000})
+        value = {'space_usage': 1024, 'space_quota': 2048}
+        for i in range(entries):
+            cache.set('fill_%d' % i, value, 3600)
+
+        names = ['key_%d' % i for i in range(keys)]
+
+        def set_all():
+            for name in names:
+                cache.set(name, value, 3600)
+
+        def get_all():
+            for name in names:
+                cache.get(name)
+
+        def get_many_all():
+            for i in range(0, keys, 100):
+                cache.get_many(names[i:i + 100])
+
+        return (_timeit(set_all, keys), _timeit(get_all, keys),
+                _timeit(get_many_all, keys))
+    finally:
+        shutil.rmtree(location)
+
+if __name__ == '__main__':
+    keys = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    entries = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    print '%d keys, %d entries before (us per op):' % (keys, entries)
+    for name, backend in BACKENDS:
+        print '- %s: set %.0f, get %.1f, get_many %.1f/key' % (
+            (name, ) + bench(backend, keys, entries))
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Time ``CConvert.getIndex``, which converts a char to pinyin for nickname
+sorting, against the old lookup which searched the whole table with a regex
+for every char. Results of both are checked to be the same.
+
+Run in the seahub directory:
+
+    python tools/bench_cconvert.py [number of chars]
+"""
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from seahub.cconvert import CConvert
+
+TABLE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                     'seahub', 'convert-utf-8.txt')
+
+def old_get_index(data, char):
+    """Lookup of ``CConvert.getIndex`` before the table is indexed.
+    """
+    pos = re.search("^" + re.escape(char) + "([0-9a-zA-Z]+)", data, re.M)
+    return char if pos is None else pos.group(1)
+
+def bench(chars):
+    """Return seconds per char of the old lookup, of building the index and
+    of the new lookup.
+    """
+    data = open(TABLE).read().decode('utf-8')
+
+    start = time.time()
+    old = [old_get_index(data, c) for c in chars]
+    old_cost = (time.time() - start) / len(chars)
+
+    CConvert._index = None
+    start = time.time()
+    CConvert.loadIndex()
+    load_cost = time.time() - start
+
+    cc = CConvert()
+    start = time.time()
+    new = [cc.getIndex(c) for c in chars]
+    new_cost = (time.time() - start) / len(chars)
+
+    assert old == new, 'results differ'
+    return old_cost, load_cost, new_cost
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    # common CJK chars in the table, no punctuation
+    chars = [unichr(0x4e00 + i * 7 % 0x51a5) for i in range(count)]
+    old_cost, load_cost, new_cost = bench(chars)
+    print '%d chars: old %.2f us per char, new %.2f us per char, ' \
+        'index built in %.1f ms' % (count, old_cost * 1e6, new_cost * 1e6,
+                                    load_cost * 1e3)
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Time building the rows of a large dir listing, see
+``seahub.views._get_dirent_rows``.
+
+Run in the seahub directory, with the environment of a seahub instance (see
+setenv.sh.template):
+
+    python tools/bench_dirent_rows.py [number of files]
+
+Dirents are fake, so no seafile server is needed. Share links and starred
+files are read once from the configured database. Links of rows are not
+read, as in the first render of a dir page.
+"""
+import os
+import stat
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'seahub.settings')
+
+class FakeUser(object):
+    username = 'bench@example.com'
+
+class FakeRequest(object):
+    user = FakeUser()
+
+class FakeRepo(object):
+    id = '00000000-0000-0000-0000-000000000000'
+    store_id = id
+    version = 1
+
+class FakeDirent(object):
+    def __init__(self, i):
+        self.obj_name = u'file-%d.txt' % i
+        self.obj_id = '%040x' % i
+        self.mode = stat.S_IFREG | 0644
+        self.mtime = 1400000000 + i
+        self.size = i
+
+def bench(count, repeat=3):
+    """Return best seconds per dirent of ``repeat`` runs.
+    """
+    from seahub.views import _get_dirent_rows
+
+    dirents = [FakeDirent(i) for i in range(count)]
+    best = None
+    for i in range(repeat):
+        start = time.time()
+        _get_dirent_rows(FakeRequest(), FakeRepo(), '/', dirents)
+        cost = (time.time() - start) / count
+        best = cost if best is None else min(best, cost)
+    return best
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    print '%d files: %.2f us per dirent' % (count, bench(count) * 1e6)